@@ -1,17 +1,35 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import BackgroundTasks, FastAPI, Header, HTTPException, Query
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import mysql.connector
-from datetime import datetime, timedelta
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
 import os
 from dotenv import load_dotenv
 import json
 import math
-from typing import List
+from typing import List, Optional
+import numpy as np
 from pydantic import BaseModel
 from pv_calculator import PVCalculator
 from wind_calculator import WindCalculator
+from db_pool import ConnectionPool, PoolTimeoutError
+from weather_cache import WeatherSeries, WeatherSeriesCache
+from result_cache import ResultCache, make_cache_key
+import rollups
+from system_status import StatusMonitor
+from metadata_registry import MetadataRegistry
+from compression import CompressionMiddleware
+import forecast_engine
+import forecast_stream
+import downsample
+import columnar
+import forecast_store
+import job_queue
 
 # 加载环境变量
 load_dotenv()
@@ -27,6 +45,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 响应压缩（gzip/brotli），小于阈值的响应不压缩，流式响应逐块压缩
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_BYTES", 1024)),
+    gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+    brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4)),
+    encodings=[e.strip() for e in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if e.strip()]
+)
+
 # 数据库配置
 DB_CONFIG = {
     "host": os.getenv("DB_HOST", "127.0.0.1"),
@@ -37,10 +64,54 @@ DB_CONFIG = {
     "charset": "utf8mb4"
 }
 
+# 连接池配置
+DB_POOL_CONFIG = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+    "max_overflow": int(os.getenv("DB_POOL_MAX_OVERFLOW", 10)),
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+    "recycle": int(os.getenv("DB_POOL_RECYCLE", 3600))
+}
+
+db_pool = ConnectionPool(DB_CONFIG, **DB_POOL_CONFIG)
+
+@app.on_event("startup")
+def init_db_pool():
+    """启动时预先建立连接池中的常驻连接"""
+    try:
+        db_pool.prefill()
+    except mysql.connector.Error as e:
+        # 数据库暂不可用时不阻止启动，连接会在首次使用时建立
+        print(f"⚠️  连接池预热失败: {e}")
+
+# 数据库访问线程池：阻塞的 mysql.connector 调用在这里执行，不占用事件循环；
+# 默认与连接池上限相同，线程不会因为拿不到连接而空等
+DB_EXECUTOR_WORKERS = int(os.getenv(
+    "DB_EXECUTOR_WORKERS", DB_POOL_CONFIG["pool_size"] + DB_POOL_CONFIG["max_overflow"]
+))
+db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+
+# 场群预测进程池：多站点计算按省份分块在子进程中并行执行
+# （以 spawn 方式启动子进程，避免在已有线程的服务进程中 fork）
+FLEET_WORKERS = int(os.getenv("FLEET_WORKERS", os.cpu_count() or 1))
+FLEET_CHUNK_SITES = int(os.getenv("FLEET_CHUNK_SITES", 8))
+FLEET_MAX_SITES = int(os.getenv("FLEET_MAX_SITES", 500))
+fleet_executor = ProcessPoolExecutor(
+    max_workers=FLEET_WORKERS, mp_context=multiprocessing.get_context("spawn")
+)
+
+@app.on_event("shutdown")
+def close_db_pool():
+    """关闭连接池"""
+    db_executor.shutdown(wait=False)
+    fleet_executor.shutdown(wait=False, cancel_futures=True)
+    db_pool.close_all()
+
 def get_db_connection():
-    """获取数据库连接"""
+    """从连接池获取数据库连接（close() 归还连接池）"""
     try:
-        return mysql.connector.connect(**DB_CONFIG)
+        return db_pool.get_connection()
+    except PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=f"数据库连接池繁忙: {str(e)}")
     except mysql.connector.Error as e:
         raise HTTPException(status_code=500, detail=f"数据库连接失败: {str(e)}")
 
@@ -51,38 +122,470 @@ def execute_query(sql: str, params: tuple = ()):
         cursor = conn.cursor(dictionary=True)
         cursor.execute(sql, params)
         result = cursor.fetchall()
+        cursor.close()
         return result
     except mysql.connector.Error as e:
         raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
     finally:
         conn.close()
 
-def get_table_name_by_province(province: str) -> str:
-    """根据省份名称获取对应的天气观测表名"""
-    province_table_mapping = {
-        "北京": "weather_observation_beijing",
-        "上海": "weather_observation_shanghai", 
-        "天津": "weather_observation_tianjin",
-        "河北": "weather_observation_hebei",
-        "山西": "weather_observation_shanxi",
-        "内蒙古": "weather_observation_neimenggu",
-        "辽宁": "weather_observation_liaoning",
-        "吉林": "weather_observation_jilin",
-        "黑龙江": "weather_observation_heilongjiang"
-    }
-    return province_table_mapping.get(province, "weather_observation")
+def execute_write(sql: str, params: tuple = ()) -> int:
+    """执行写操作并提交，返回影响行数"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        conn.commit()
+        rowcount = cursor.rowcount
+        cursor.close()
+        return rowcount
+    except mysql.connector.Error as e:
+        raise HTTPException(status_code=500, detail=f"写入失败: {str(e)}")
+    finally:
+        conn.close()
+
+async def run_db(func, *args):
+    """在数据库线程池中执行阻塞的数据库访问函数"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args))
 
-def get_province_id_by_name(province: str) -> int:
+async def execute_query_async(sql: str, params: tuple = ()):
+    """异步执行查询（不阻塞事件循环）"""
+    return await run_db(execute_query, sql, params)
+
+async def execute_write_async(sql: str, params: tuple = ()) -> int:
+    """异步执行写操作"""
+    return await run_db(execute_write, sql, params)
+
+def format_timestamp(ts) -> str:
+    """时间戳序列化为字符串"""
+    return ts.isoformat() if isinstance(ts, datetime) else str(ts)
+
+def pv_columns_to_records(columns: dict) -> List[dict]:
+    """把按列的光伏计算结果一次性转换为逐行结果（同时格式化时间戳）"""
+    efficiency_factor = columns['efficiency_factor']
+    return [
+        {
+            'timestamp': format_timestamp(ts),
+            'solar_radiation_wm2': radiation,
+            'temperature_c': temperature,
+            'hourly_generation_kwh': generation,
+            'efficiency_factor': efficiency_factor
+        }
+        for ts, radiation, temperature, generation in zip(
+            columns['timestamp'],
+            columns['solar_radiation_wm2'].tolist(),
+            columns['temperature_c'].tolist(),
+            columns['hourly_generation_kwh'].tolist()
+        )
+    ]
+
+PV_RECORD_FIELDS = ['timestamp', 'solar_radiation_wm2', 'temperature_c', 'hourly_generation_kwh', 'efficiency_factor']
+WIND_RECORD_FIELDS = ['timestamp', 'wind_speed_10m_ms', 'wind_speed_hub_ms', 'hourly_generation_kwh']
+
+def wind_columns_to_records(timestamps: List[str], wind_10m, wind_hub, generation) -> List[dict]:
+    """把按列的风电计算结果转换为逐行结果"""
+    return [
+        {
+            'timestamp': ts,
+            'wind_speed_10m_ms': w10,
+            'wind_speed_hub_ms': round(wh, 3),
+            'hourly_generation_kwh': round(p, 4)
+        }
+        for ts, w10, wh, p in zip(timestamps, wind_10m.tolist(), wind_hub.tolist(), generation.tolist())
+    ]
+
+def pv_records_at(columns: dict, ts: np.ndarray, index) -> List[dict]:
+    """取出下标（切片或下标数组）处的光伏逐行结果"""
+    return pv_columns_to_records({
+        **{name: value[index] if isinstance(value, np.ndarray) else value for name, value in columns.items()},
+        'timestamp': np.datetime_as_string(ts[index], unit='s').tolist()
+    })
+
+def wind_records_at(ts: np.ndarray, wind_10m, wind_hub, generation, index) -> List[dict]:
+    """取出下标（切片或下标数组）处的风电逐行结果"""
+    return wind_columns_to_records(
+        np.datetime_as_string(ts[index], unit='s').tolist(),
+        wind_10m[index], wind_hub[index], generation[index]
+    )
+
+# 站点与省份元数据注册表：启动时加载，接口直接读取内存快照，
+# 站点表或省份表变化后重新加载（附近站点查询和站点搜索的索引也在快照中）
+METADATA_STATIONS_SQL = """
+SELECT s.id, s.name, s.province, s.province_id, p.name AS province_name, s.lng, s.lat
+FROM station s
+LEFT JOIN province p ON s.province_id = p.id
+"""
+
+METADATA_VERSION_SQL = """
+SELECT (SELECT COUNT(*) FROM station) AS stations,
+       (SELECT MAX(id) FROM station) AS max_station_id,
+       (SELECT MAX(updated_at) FROM station) AS station_updated_at,
+       (SELECT COUNT(*) FROM province) AS provinces,
+       (SELECT MAX(id) FROM province) AS max_province_id
+"""
+
+def load_metadata_stations(station_ids: Optional[List[int]] = None) -> List[dict]:
+    """加载站点信息（含省份名称），指定 station_ids 时只加载这些站点"""
+    if station_ids is None:
+        return execute_query(METADATA_STATIONS_SQL + "ORDER BY s.id")
+    placeholders = ", ".join(["%s"] * len(station_ids))
+    return execute_query(METADATA_STATIONS_SQL + f"WHERE s.id IN ({placeholders})", tuple(station_ids))
+
+def load_metadata_provinces() -> List[dict]:
+    """加载省份ID与名称"""
+    return execute_query("SELECT id, name FROM province")
+
+def load_metadata_version() -> tuple:
+    """站点表和省份表的版本：新增、删除或修改站点，新增或删除省份后变化"""
+    row = execute_query(METADATA_VERSION_SQL)[0]
+    return (row['stations'], row['max_station_id'], row['station_updated_at'],
+            row['provinces'], row['max_province_id'])
+
+metadata = MetadataRegistry(
+    stations_loader=load_metadata_stations,
+    provinces_loader=load_metadata_provinces,
+    version_loader=load_metadata_version,
+    check_interval=float(os.getenv("METADATA_CHECK_S", 10)),
+    cell_deg=float(os.getenv("STATION_INDEX_CELL_DEG", 1.0)),
+    max_missing=int(os.getenv("METADATA_MAX_MISSING", 10000))
+)
+
+@app.on_event("startup")
+def load_metadata():
+    """启动时加载站点与省份元数据"""
+    try:
+        metadata.get()
+    except Exception as e:
+        # 数据库暂不可用时不阻止启动，首次查询时再加载
+        print(f"⚠️  元数据加载失败: {getattr(e, 'detail', e)}")
+
+async def current_metadata():
+    """当前元数据快照（检查间隔内不访问数据库）"""
+    return metadata.peek() or await run_db(metadata.get)
+
+async def get_province_id_by_name(province: str) -> Optional[int]:
     """根据省份名称获取省份ID"""
-    sql = "SELECT id FROM province WHERE name = %s"
-    result = execute_query(sql, (province,))
-    return result[0]['id'] if result else None
+    return (await current_metadata()).province_ids.get(province)
 
-def get_province_name_by_id(province_id: int) -> str:
+async def get_province_name_by_id(province_id: int) -> Optional[str]:
     """根据省份ID获取省份名称"""
-    sql = "SELECT name FROM province WHERE id = %s"
-    result = execute_query(sql, (province_id,))
-    return result[0]['name'] if result else None
+    return (await current_metadata()).province_names.get(province_id)
+
+# 气象时间序列缓存：每个省份的整条小时序列只查询一次，按时间范围切片
+WEATHER_SERIES_SQL = """
+SELECT ts, surface_radiation_wm2, temp_c, wind_speed_ms, zonal_wind_ms, meridional_wind_ms
+FROM weather_observation
+WHERE province_id = %s
+ORDER BY ts
+"""
+
+def load_weather_series(province_id: int) -> List[dict]:
+    """加载某省份的整条气象序列"""
+    return execute_query(WEATHER_SERIES_SQL, (province_id,))
+
+def load_weather_versions() -> dict:
+    """以导入检查点作为各省份气象数据的版本，导入新数据后缓存自动失效"""
+    rows = execute_query("SELECT province_id, last_ts, rows_imported, updated_at FROM import_checkpoint")
+    return {
+        row['province_id']: (row['last_ts'], row['rows_imported'], row['updated_at'])
+        for row in rows
+    }
+
+weather_cache = WeatherSeriesCache(
+    loader=load_weather_series,
+    version_loader=load_weather_versions,
+    max_bytes=int(float(os.getenv("WEATHER_CACHE_MAX_MB", 64)) * 1024 * 1024),
+    version_check_interval=float(os.getenv("WEATHER_CACHE_VERSION_CHECK_S", 30))
+)
+
+def get_weather_series(province_id: int, start_date: str, end_date: str) -> WeatherSeries:
+    """从缓存获取指定时间范围的气象序列"""
+    try:
+        return weather_cache.get_range(province_id, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"日期格式错误: {str(e)}")
+
+# 预测结果缓存：相同请求直接返回已编码的响应，气象数据版本变化时失效
+result_cache = ResultCache(
+    ttl=float(os.getenv("RESULT_CACHE_TTL_S", 600)),
+    max_bytes=int(float(os.getenv("RESULT_CACHE_MAX_MB", 128)) * 1024 * 1024)
+)
+
+# 响应内容随 Accept 请求头变化（JSON 或 MessagePack）
+VARY_ACCEPT = {"Vary": "Accept"}
+
+def with_result_source(body: bytes, media_type: str, result_source: str) -> bytes:
+    """在已编码的响应末尾加上 result_source（结果来源只属于本次响应，不写入缓存）"""
+    if media_type == columnar.MSGPACK_MEDIA_TYPE:
+        return columnar.append_field(body, 'result_source', result_source)
+    return body[:-1] + b',"result_source":' + json.dumps(result_source).encode() + b'}'
+
+async def get_cached_result(cache_key: str, media_type: str = "application/json",
+                            result_source: bool = False):
+    """查找预测结果缓存，命中且气象数据未变化时返回响应，否则返回None
+
+    result_source 为 True 时响应中标记 result_source 为 cached。
+    """
+    entry = result_cache.lookup(cache_key)
+    if entry is None:
+        return None
+    if weather_cache.version_check_due():
+        version = await run_db(weather_cache.version, entry.data_key)
+    else:
+        version = weather_cache.version(entry.data_key, refresh=False)
+    body = result_cache.validate(cache_key, entry, version)
+    if body is None:
+        return None
+    if result_source:
+        body = with_result_source(body, media_type, 'cached')
+    return Response(content=body, media_type=media_type, headers=VARY_ACCEPT)
+
+def cache_result(cache_key: str, result: dict, province_id: int, weather_data: WeatherSeries,
+                 columns: dict = None) -> Response:
+    """编码预测结果并写入缓存（指定 columns 时编码为 MessagePack 列格式）
+
+    result 中的 result_source 不写入缓存，只加在本次响应中。
+    """
+    result = dict(result)
+    result_source = result.pop('result_source', None)
+    if columns is None:
+        body, media_type = JSONResponse(result).body, "application/json"
+    else:
+        body, media_type = columnar.encode_columns(result, columns), columnar.MSGPACK_MEDIA_TYPE
+    result_cache.put(cache_key, body, data_key=province_id, data_version=weather_data.version)
+    if result_source is not None:
+        body = with_result_source(body, media_type, result_source)
+    return Response(content=body, media_type=media_type, headers=VARY_ACCEPT)
+
+def get_base_year_weather_stats(province_id: int, year: int):
+    """不晚于 year 的最近一年的气象汇总（hours、radiation_sum、radiation_temp_sum、obs_year）"""
+    result = execute_query(rollups.BASE_YEAR_STATS_SQL, (province_id, year))
+    if result:
+        return result[0]
+    
+    # 月度汇总尚未生成时在观测表上按时间范围汇总
+    _, year_end = rollups.year_range(year)
+    latest = execute_query(rollups.LATEST_TS_BEFORE_SQL, (province_id, year_end))
+    if not latest or latest[0]['latest_ts'] is None:
+        return None
+    data_year = latest[0]['latest_ts'].year
+    result = execute_query(
+        rollups.RANGE_AGGREGATE_SQL.format(columns=rollups.MONTHLY_AGGREGATE_COLUMNS),
+        (province_id, *rollups.year_range(data_year))
+    )
+    return {**result[0], 'obs_year': data_year} if result else None
+
+def parse_date_range(start_date: str, end_date: str):
+    """把请求中的起止时间转换为日期（汇总查询包含结束日整天）"""
+    try:
+        return (datetime.fromisoformat(start_date.strip()).date(),
+                datetime.fromisoformat(end_date.strip()).date())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"日期格式错误: {str(e)}")
+
+def parse_time_range(start_date: str, end_date: str):
+    """把请求中的起止时间转换为datetime（与气象序列切片一致，包含结束时间）"""
+    try:
+        return datetime.fromisoformat(start_date.strip()), datetime.fromisoformat(end_date.strip())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"日期格式错误: {str(e)}")
+
+# 保存预测结果（persist=true）：这些字段不影响计算结果，不参与参数哈希
+PERSIST_EXCLUDE = {'station_id', 'start_date', 'end_date', 'resolution', 'max_points', 'downsample', 'persist'}
+
+def weather_version_tag(province_id: int) -> str:
+    """某省份当前气象数据版本的短哈希（导入新数据后变化）
+
+    只使用导入检查点：缓存的失效次数只在本进程内有效，重启后会重复。
+    手动使气象缓存失效时改为删除该省份站点的保存记录（见 purge_stored_runs）。
+    """
+    return forecast_store.weather_version_tag(weather_cache.version(province_id)[0])
+
+def purge_stored_runs(station_ids: Optional[List[int]] = None) -> int:
+    """删除已保存预测结果的保存记录，之后的请求重新计算"""
+    conn = get_db_connection()
+    try:
+        return forecast_store.purge_runs(conn, station_ids)
+    except mysql.connector.Error as e:
+        raise HTTPException(status_code=500, detail=f"写入失败: {str(e)}")
+    finally:
+        conn.close()
+
+def load_stored_hourly(kind: str, station_id: int, province_id: int, config_hash: str,
+                       start_date: str, end_date: str):
+    """读取已保存的小时结果，返回 (时间戳, {列名: 数组}, 气象数据版本)，没有可用的保存时返回None"""
+    start, end = parse_time_range(start_date, end_date)
+    version = weather_cache.version(province_id)
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        run = forecast_store.find_run(cursor, kind, station_id, config_hash, start, end,
+                                      forecast_store.weather_version_tag(version[0]))
+        if run is None:
+            cursor.close()
+            return None
+        ts, columns = forecast_store.load_hourly(cursor, kind, station_id, config_hash, start, end)
+        cursor.close()
+    except mysql.connector.Error as e:
+        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+    finally:
+        conn.close()
+    # 与保存时范围相同却行数不符说明结果表被修改过，重新计算
+    if not len(ts) or ((run['start_time'], run['end_time']) == (start, end) and len(ts) != run['data_points']):
+        return None
+    return ts, columns, version
+
+def save_stored_hourly(kind: str, station_id: int, config_hash: str, start_date: str, end_date: str,
+                       weather_version, ts: np.ndarray, columns: dict):
+    """保存小时结果（响应发送后在后台执行，失败不影响本次请求）"""
+    start, end = parse_time_range(start_date, end_date)
+    try:
+        conn = get_db_connection()
+    except HTTPException as e:
+        print(f"⚠️  保存预测结果失败: {e.detail}")
+        return
+    try:
+        forecast_store.save_hourly(conn, kind, station_id, config_hash, start, end,
+                                   forecast_store.weather_version_tag(weather_version), ts, columns)
+    except Exception as e:
+        print(f"⚠️  保存预测结果失败: {e}")
+    finally:
+        conn.close()
+
+def load_stored_yearly(station_id: int, config_hash: str, weather_version: str, first_year: int, last_year: int):
+    """读取已保存的多年预测，返回 (汇总信息, 逐年结果)，没有可用的保存时返回None"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        run = forecast_store.find_run(cursor, 'pv_yearly', station_id, config_hash,
+                                      datetime(first_year, 1, 1), datetime(last_year, 1, 1), weather_version)
+        forecasts = forecast_store.load_yearly(cursor, station_id, config_hash, first_year, last_year) if run else []
+        cursor.close()
+    except mysql.connector.Error as e:
+        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+    finally:
+        conn.close()
+    if run is None or len(forecasts) != last_year - first_year + 1:
+        return None
+    summary = run['summary']
+    return (json.loads(summary) if isinstance(summary, (str, bytes)) else summary), forecasts
+
+def save_stored_yearly(station_id: int, config_hash: str, weather_version: str, forecasts: List[dict], summary: dict):
+    """保存多年预测（响应发送后在后台执行，失败不影响本次请求）"""
+    try:
+        conn = get_db_connection()
+    except HTTPException as e:
+        print(f"⚠️  保存多年预测失败: {e.detail}")
+        return
+    try:
+        forecast_store.save_yearly(conn, station_id, config_hash, weather_version, forecasts, summary)
+    except Exception as e:
+        print(f"⚠️  保存多年预测失败: {e}")
+    finally:
+        conn.close()
+
+def get_period_weather_stats(province_id: int, resolution: str, start_date, end_date) -> List[dict]:
+    """从日汇总表按日/月汇总气象数据"""
+    sql = rollups.PERIOD_STATS_SQL.format(period=rollups.PERIOD_EXPRESSIONS[resolution])
+    return execute_query(sql, (province_id, start_date, end_date))
+
+def get_period_wind_histograms(province_id: int, resolution: str, start_date, end_date) -> dict:
+    """从风速直方图表按日/月汇总，返回 {period: (区间序号列表, 小时数列表)}"""
+    sql = rollups.PERIOD_WIND_HISTOGRAM_SQL.format(period=rollups.PERIOD_EXPRESSIONS[resolution])
+    histograms = {}
+    for row in execute_query(sql, (province_id, start_date, end_date)):
+        bins, hours = histograms.setdefault(row['period'], ([], []))
+        bins.append(int(row['bin_index']))
+        hours.append(int(row['hours']))
+    return histograms
+
+# 逐小时结果的输出格式：json 和 msgpack（按列的二进制格式）为完整文档，可缓存；
+# ndjson/csv 为分块流式输出
+CACHED_FORMATS = {'json': "application/json", 'msgpack': columnar.MSGPACK_MEDIA_TYPE}
+OUTPUT_FORMATS = tuple(CACHED_FORMATS) + tuple(forecast_stream.STREAM_MEDIA_TYPES)
+
+def resolve_output_format(output_format: Optional[str], accept: Optional[str]) -> str:
+    """?format= 优先；未指定时按 Accept 请求头协商 json 或 msgpack"""
+    if output_format is None:
+        return 'msgpack' if columnar.accepts_msgpack(accept) else 'json'
+    if output_format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"不支持的输出格式: {output_format}（可选 {'、'.join(OUTPUT_FORMATS)}）")
+    return output_format
+
+def forecast_cache_key(kind: str, output_format: str, request) -> str:
+    """JSON 沿用原有的缓存键，其他格式单独缓存"""
+    return make_cache_key(kind if output_format == 'json' else f"{kind}.{output_format}", request.dict())
+
+def stream_forecast(output_format: str, length: int, to_records, fields: List[str], summary: dict) -> StreamingResponse:
+    """流式输出逐小时结果，汇总信息作为最后一条记录"""
+    chunks = forecast_stream.iter_record_chunks(length, to_records)
+    return StreamingResponse(
+        forecast_stream.encode_stream(output_format, chunks, fields, summary),
+        media_type=forecast_stream.STREAM_MEDIA_TYPES[output_format]
+    )
+
+def check_series_options(request):
+    """检查逐小时预测接口的分辨率和降采样参数"""
+    if request.resolution not in downsample.RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"不支持的分辨率: {request.resolution}（可选 {'、'.join(downsample.RESOLUTIONS)}）")
+    if request.downsample not in downsample.DOWNSAMPLE_METHODS:
+        raise HTTPException(status_code=400, detail=f"不支持的降采样方法: {request.downsample}（可选 {'、'.join(downsample.DOWNSAMPLE_METHODS)}）")
+    if request.max_points is not None and request.max_points < 3:
+        raise HTTPException(status_code=400, detail="max_points 不能小于 3")
+
+def is_reduced(request) -> bool:
+    """结果是否按日/月聚合或降采样（否则为完整的小时序列）"""
+    return request.resolution != 'hourly' or request.max_points is not None
+
+def select_points(values: np.ndarray, request):
+    """需要降采样时返回保留点的下标数组，否则返回全部"""
+    if request.max_points is None or len(values) <= request.max_points:
+        return slice(None)
+    return downsample.downsample_indices(values, request.max_points, request.downsample)
+
+def period_records(labels: List[str], periods: dict, index) -> List[dict]:
+    """日/月聚合结果转换为逐行结果（hours 为整数，其余保留4位小数）"""
+    labels = np.array(labels, dtype=object)[index].tolist()
+    rows = [{'period': label} for label in labels]
+    for name, values in periods.items():
+        values = values[index].astype(int) if name == 'hours' else np.round(values[index], 4)
+        for row, value in zip(rows, values.tolist()):
+            row[name] = value
+    return rows
+
+def pv_result_rows(request, ts: np.ndarray, columns: dict) -> List[dict]:
+    """按请求的分辨率和点数上限生成光伏结果行（统计信息始终基于完整的小时序列）"""
+    generation = columns['hourly_generation_kwh']
+    if request.resolution == 'hourly':
+        return pv_records_at(columns, ts, select_points(generation, request))
+    labels, periods = downsample.reduce_series(ts, {
+        'hours': (generation, 'count'),
+        'solar_radiation_mean_wm2': (columns['solar_radiation_wm2'], 'mean'),
+        'temperature_mean_c': (columns['temperature_c'], 'mean'),
+        'generation_kwh': (generation, 'sum'),
+        'peak_generation_kwh': (generation, 'max'),
+    }, request.resolution)
+    return period_records(labels, periods, select_points(periods['generation_kwh'], request))
+
+def wind_result_rows(request, ts: np.ndarray, wind_10m, wind_hub, generation) -> List[dict]:
+    """按请求的分辨率和点数上限生成风电结果行（统计信息始终基于完整的小时序列）"""
+    if request.resolution == 'hourly':
+        return wind_records_at(ts, wind_10m, wind_hub, generation, select_points(generation, request))
+    # 与逐小时结果一致，先按小时保留4位小数再汇总
+    hourly_kwh = np.round(generation, 4)
+    labels, periods = downsample.reduce_series(ts, {
+        'hours': (hourly_kwh, 'count'),
+        'wind_speed_mean_10m_ms': (wind_10m, 'mean'),
+        'wind_speed_max_10m_ms': (wind_10m, 'max'),
+        'generation_kwh': (hourly_kwh, 'sum'),
+        'peak_generation_kwh': (hourly_kwh, 'max'),
+    }, request.resolution)
+    return period_records(labels, periods, select_points(periods['generation_kwh'], request))
+
+def check_resolution(resolution: str):
+    if resolution not in rollups.PERIOD_EXPRESSIONS:
+        raise HTTPException(status_code=400, detail=f"不支持的分辨率: {resolution}（可选 daily、monthly）")
 
 # Pydantic模型定义
 class PVForecastConfig(BaseModel):
@@ -106,6 +609,13 @@ class PVForecastRequest(BaseModel):
     degradation_rate: float = 0.005
     tilt_angle: float = 30.0
     azimuth_angle: float = 180.0
+    resolution: str = "hourly"
+    max_points: Optional[int] = None
+    downsample: str = "lttb"
+    persist: bool = False
+
+class PVSummaryRequest(PVForecastRequest):
+    resolution: str = "daily"
 
 # 创建光伏计算器实例
 pv_calculator = PVCalculator()
@@ -121,61 +631,452 @@ class WindForecastRequest(BaseModel):
     cut_out_wind_speed_ms: float
     tower_height_m: float = 80.0
     num_turbines: int = 1
+    resolution: str = "hourly"
+    max_points: Optional[int] = None
+    downsample: str = "lttb"
+    persist: bool = False
+
+class WindSummaryRequest(WindForecastRequest):
+    resolution: str = "daily"
 
-def get_wind_weather_data_by_station_and_time(station_id: int, start_date: str, end_date: str) -> List[dict]:
-    """根据站点与时间范围获取用于风电计算的气象数据（风速/分量）。"""
-    # 获取站点信息
-    station_sql = """
-    SELECT s.id, s.name, s.province, s.province_id, p.name as province_name
-    FROM station s 
-    LEFT JOIN province p ON s.province_id = p.id
-    WHERE s.id = %s
+async def get_stations_by_ids(station_ids: List[int]) -> dict:
+    """批量获取站点信息，返回 {站点ID: 站点}（不存在的站点不包含在内）
+
+    快照中没有的站点重新查询一次，可能是上次版本检查之后新建的站点；
+    确认不存在的站点在版本变化前不再查询。
     """
-    station_result = execute_query(station_sql, (station_id,))
-    if not station_result:
+    snapshot = await current_metadata()
+    missing = metadata.unresolved(snapshot, station_ids)
+    if missing:
+        snapshot = await run_db(metadata.load_stations, missing)
+    return {
+        station_id: snapshot.station(station_id)
+        for station_id in station_ids if snapshot.station(station_id) is not None
+    }
+
+async def get_station_by_id(station_id: int) -> dict:
+    """获取站点信息（包含省份），站点不存在时返回404"""
+    station = (await get_stations_by_ids([station_id])).get(station_id)
+    if station is None:
         raise HTTPException(status_code=404, detail="站点不存在")
-    station = station_result[0]
-    table_name = get_table_name_by_province(station['province'])
-
-    # 读取该省天气表中的风速信息
-    weather_sql = f"""
-    SELECT ts,
-           wind_speed_ms,
-           zonal_wind_ms,
-           meridional_wind_ms
-    FROM {table_name}
-    WHERE province_id = %s AND ts BETWEEN %s AND %s
-    ORDER BY ts
-    """
-    weather = execute_query(weather_sql, (station['province_id'], start_date, end_date))
-
-    # 归一为通用结构：ts, wind_speed（优先用风速，其次分量合成）
-    result: List[dict] = []
-    for row in weather:
-        ts = row.get('ts')
-        speed = row.get('wind_speed_ms')
-        if speed is None:
-            u = float(row.get('zonal_wind_ms') or 0)
-            v = float(row.get('meridional_wind_ms') or 0)
-            speed = (u ** 2 + v ** 2) ** 0.5
-        result.append({
-            'ts': ts,
-            'wind_speed': float(speed or 0)
-        })
-    return result
+    return station
 
-@app.post("/api/wind-forecast/calculate")
-async def calculate_wind_forecast(request: WindForecastRequest):
-    """计算风力发电预测（使用数据库风速）。"""
+async def get_province_id_by_station(station_id: int) -> int:
+    """站点所在省份的ID（气象序列按省份存储）"""
+    return (await get_station_by_id(station_id))['province_id']
+
+async def get_province_ids_by_stations(station_ids: List[int]) -> dict:
+    """批量获取站点所在省份的ID，返回 {站点ID: 省份ID}"""
+    stations = await get_stations_by_ids(station_ids)
+    return {station_id: station['province_id'] for station_id, station in stations.items()}
+
+class WindSiteConfig(BaseModel):
+    station_id: int
+    rated_capacity_kw: float
+    cut_in_wind_speed_ms: float
+    rated_wind_speed_ms: float
+    cut_out_wind_speed_ms: float
+    tower_height_m: float = 80.0
+    num_turbines: int = 1
+
+class PVSweepRequest(BaseModel):
+    station_id: int
+    start_date: str
+    end_date: str
+    installed_capacity_kw: float
+    panel_efficiency: List[float] = [0.20]
+    inverter_efficiency: List[float] = [0.95]
+    temperature_coefficient: List[float] = [-0.004]
+    degradation_rate: List[float] = [0.005]
+    years: int = 25
+
+class WindSweepRequest(BaseModel):
+    station_id: int
+    start_date: str
+    end_date: str
+    rated_capacity_kw: float
+    cut_in_wind_speed_ms: List[float]
+    rated_wind_speed_ms: List[float]
+    cut_out_wind_speed_ms: List[float]
+    tower_height_m: List[float] = [80.0]
+    num_turbines: List[int] = [1]
+
+# 参数扫描的场景数上限（各参数取值个数的乘积）
+SWEEP_MAX_SCENARIOS = int(os.getenv("SWEEP_MAX_SCENARIOS", 1000000))
+
+def check_sweep_axes(axes: dict) -> int:
+    """检查参数网格，返回场景数"""
+    empty = [name for name, values in axes.items() if not values]
+    if empty:
+        raise HTTPException(status_code=400, detail=f"参数取值不能为空: {', '.join(empty)}")
+    scenarios = math.prod(len(values) for values in axes.values())
+    if scenarios > SWEEP_MAX_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"场景数 {scenarios} 超过上限 {SWEEP_MAX_SCENARIOS}")
+    return scenarios
+
+def best_scenario(axes: dict, capacity_factor: np.ndarray) -> dict:
+    """容量因子最高的参数组合"""
+    position = np.unravel_index(int(np.argmax(capacity_factor)), capacity_factor.shape)
+    return {name: values[i] for (name, values), i in zip(axes.items(), position)}
+
+@app.post("/api/pv-forecast/sweep")
+async def sweep_pv_forecast(request: PVSweepRequest):
+    """光伏参数扫描：气象序列只加载一次，对参数网格批量计算总发电量和容量因子"""
     try:
-        weather_data = get_wind_weather_data_by_station_and_time(
-            request.station_id, request.start_date, request.end_date
+        axes = {
+            'panel_efficiency': request.panel_efficiency,
+            'inverter_efficiency': request.inverter_efficiency,
+            'temperature_coefficient': request.temperature_coefficient,
+        }
+        scenarios = check_sweep_axes({**axes, 'degradation_rate': request.degradation_rate})
+        province_id = await get_province_id_by_station(request.station_id)
+        weather_data = await run_db(get_weather_series, province_id, request.start_date, request.end_date)
+        hours = len(weather_data)
+        if not hours:
+            raise HTTPException(status_code=404, detail="未找到指定时间范围内的气象数据")
+        
+        solar_radiation, temperature = pv_calculator.fill_missing_weather(
+            weather_data.surface_radiation_wm2, weather_data.temp_c
         )
-        if not weather_data:
+        total = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            pv_calculator.sweep_generation, solar_radiation, temperature, request.installed_capacity_kw,
+            request.panel_efficiency, request.inverter_efficiency, request.temperature_coefficient
+        ))
+        capacity_factor = total / (request.installed_capacity_kw * hours) if request.installed_capacity_kw > 0 \
+            else np.zeros_like(total)
+        
+        # 多年累计发电量：第 y 年乘以衰减因子 (1-衰减率)^y，与多年预测接口一致
+        lifetime_factors = np.array([
+            sum(pv_calculator.calculate_degradation_factor(year, rate) for year in range(1, request.years + 1))
+            for rate in request.degradation_rate
+        ])
+        lifetime = total[..., None] * lifetime_factors
+        
+        return {
+            "station_id": request.station_id,
+            "start_date": request.start_date,
+            "end_date": request.end_date,
+            "installed_capacity_kw": request.installed_capacity_kw,
+            "years": request.years,
+            "axes": {**axes, 'degradation_rate': request.degradation_rate},
+            "scenarios": scenarios,
+            "data_points": hours,
+            "total_generation_kwh": np.round(total, 4).tolist(),
+            "capacity_factor": np.round(capacity_factor, 4).tolist(),
+            "lifetime_generation_kwh": np.round(lifetime, 2).tolist(),
+            "best": best_scenario(axes, capacity_factor)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"光伏参数扫描失败: {str(e)}")
+
+@app.post("/api/wind-forecast/sweep")
+async def sweep_wind_forecast(request: WindSweepRequest):
+    """风电参数扫描：气象序列只加载一次，对功率曲线参数网格批量计算发电量和容量因子。"""
+    try:
+        axes = {
+            'tower_height_m': request.tower_height_m,
+            'cut_in_wind_speed_ms': request.cut_in_wind_speed_ms,
+            'rated_wind_speed_ms': request.rated_wind_speed_ms,
+            'cut_out_wind_speed_ms': request.cut_out_wind_speed_ms,
+        }
+        scenarios = check_sweep_axes({**axes, 'num_turbines': request.num_turbines})
+        province_id = await get_province_id_by_station(request.station_id)
+        weather_data = await run_db(get_weather_series, province_id, request.start_date, request.end_date)
+        hours = len(weather_data)
+        if not hours:
             raise HTTPException(status_code=404, detail="未找到指定时间范围内的气象数据")
 
-        hourly = wind_calculator.calculate_hourly_generation(
-            weather_data=weather_data,
+        # 单台风机的发电量与台数成正比，台数作为最后一维直接相乘
+        energy = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            wind_calculator.sweep_energy_kwh, weather_data.wind_speed_ms, request.tower_height_m,
+            request.cut_in_wind_speed_ms, request.rated_wind_speed_ms, request.cut_out_wind_speed_ms,
+            request.rated_capacity_kw
+        ))
+        turbines = np.array([max(1, int(n or 1)) for n in request.num_turbines], dtype=float)
+        total = energy[..., None] * turbines
+        capacity_factor = energy / (request.rated_capacity_kw * hours) if request.rated_capacity_kw > 0 \
+            else np.zeros_like(energy)
+
+        return {
+            'station_id': request.station_id,
+            'start_date': request.start_date,
+            'end_date': request.end_date,
+            'rated_capacity_kw': request.rated_capacity_kw,
+            'axes': {**axes, 'num_turbines': request.num_turbines},
+            'scenarios': scenarios,
+            'data_points': hours,
+            'total_generation_kwh': np.round(total, 4).tolist(),
+            'capacity_factor': np.round(capacity_factor, 4).tolist(),
+            'best': best_scenario(axes, capacity_factor)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"风电参数扫描失败: {str(e)}")
+
+class FleetForecastRequest(BaseModel):
+    start_date: str
+    end_date: str
+    pv_sites: List[PVForecastConfig] = []
+    wind_sites: List[WindSiteConfig] = []
+    include_hourly: bool = False
+
+def fleet_hourly_profile(series: List[tuple]) -> List[dict]:
+    """把各站点的小时发电量按时间戳求和，series 为 [(时间戳数组, 发电量数组)]"""
+    ts = np.concatenate([item[0] for item in series])
+    generation = np.concatenate([item[1] for item in series])
+    unique_ts, inverse = np.unique(ts, return_inverse=True)
+    totals = np.bincount(inverse, weights=generation, minlength=len(unique_ts))
+    return [
+        {'timestamp': timestamp, 'generation_kwh': round(value, 4)}
+        for timestamp, value in zip(np.datetime_as_string(unique_ts, unit='s').tolist(), totals.tolist())
+    ]
+
+def fleet_sites(request: FleetForecastRequest) -> List[tuple]:
+    """场群请求中的站点列表 [(类型, 参数)]，检查站点数量"""
+    sites = ([('pv', site.dict()) for site in request.pv_sites]
+             + [('wind', site.dict()) for site in request.wind_sites])
+    if not sites:
+        raise HTTPException(status_code=400, detail="未指定站点")
+    if len(sites) > FLEET_MAX_SITES:
+        raise HTTPException(status_code=400, detail=f"站点数量超过上限 {FLEET_MAX_SITES}")
+    return sites
+
+async def run_fleet_forecast(request: FleetForecastRequest,
+                             chunk_sites: int = FLEET_CHUNK_SITES,
+                             on_progress=None) -> dict:
+    """场群预测计算，on_progress(已完成块数, 总块数) 在每块计算完成后调用"""
+    sites = fleet_sites(request)
+    station_ids = sorted({site['station_id'] for _, site in sites})
+    province_ids = await get_province_ids_by_stations(station_ids)
+    missing = [station_id for station_id in station_ids if station_id not in province_ids]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"站点不存在: {missing}")
+
+    # 每个省份的气象序列只获取一次，多个站点共用
+    weather = {}
+    for province_id in sorted(set(province_ids.values())):
+        weather[province_id] = await run_db(
+            get_weather_series, province_id, request.start_date, request.end_date
+        )
+
+    # 按省份分组、分块，每块把该省份的气象数组传给工作进程一次
+    groups = {}
+    for index, (kind, site) in enumerate(sites):
+        groups.setdefault(province_ids[site['station_id']], []).append((index, kind, site))
+    tasks = []
+    for province_id, group in groups.items():
+        series = weather[province_id]
+        arrays = {
+            'surface_radiation_wm2': series.surface_radiation_wm2,
+            'temp_c': series.temp_c,
+            'wind_speed_ms': series.wind_speed_ms,
+        }
+        for start in range(0, len(group), chunk_sites):
+            tasks.append((arrays, group[start:start + chunk_sites]))
+
+    # 只有一块时与单站点接口一样在默认线程池中计算：进程池需要把气象数组序列化后
+    # 传给子进程，单块计算没有可并行的部分，传输开销反而超过计算本身（NumPy
+    # 计算大部分时间释放 GIL，不会明显阻塞其他线程）
+    loop = asyncio.get_running_loop()
+    executor = fleet_executor if len(tasks) > 1 and FLEET_WORKERS > 1 else None
+    futures = [
+        loop.run_in_executor(executor, forecast_engine.evaluate_sites, arrays, chunk, request.include_hourly)
+        for arrays, chunk in tasks
+    ]
+    if on_progress is not None:
+        completed = [0]
+        def chunk_done(_):
+            completed[0] += 1
+            on_progress(completed[0], len(futures))
+        on_progress(0, len(futures))
+        for future in futures:
+            future.add_done_callback(chunk_done)
+    chunks = await asyncio.gather(*futures)
+    results = sorted((item for chunk in chunks for item in chunk), key=lambda item: item[0])
+
+    site_results = []
+    totals = {'pv': 0.0, 'wind': 0.0}
+    capacity_kw = 0.0
+    capacity_hours = 0.0
+    hourly = []
+    for index, summary, generation in results:
+        kind, site = sites[index]
+        province_id = province_ids[site['station_id']]
+        site_capacity = forecast_engine.site_capacity_kw(kind, site)
+        site_results.append({
+            'station_id': site['station_id'],
+            'type': kind,
+            'province_id': province_id,
+            'capacity_kw': site_capacity,
+            **summary
+        })
+        totals[kind] += summary['total_generation_kwh']
+        capacity_kw += site_capacity
+        capacity_hours += site_capacity * summary['data_points']
+        if generation is not None:
+            hourly.append((weather[province_id].ts, generation))
+
+    total_generation = totals['pv'] + totals['wind']
+    fleet = {
+        'site_count': len(sites),
+        'province_count': len(weather),
+        'installed_capacity_kw': round(capacity_kw, 4),
+        'pv_generation_kwh': round(totals['pv'], 4),
+        'wind_generation_kwh': round(totals['wind'], 4),
+        'total_generation_kwh': round(total_generation, 4),
+        'capacity_factor': round(total_generation / capacity_hours, 4) if capacity_hours else 0.0
+    }
+    if request.include_hourly:
+        fleet['hourly'] = fleet_hourly_profile(hourly)
+
+    return {
+        'start_date': request.start_date,
+        'end_date': request.end_date,
+        'sites': site_results,
+        'fleet': fleet
+    }
+
+@app.post("/api/fleet-forecast/calculate")
+async def calculate_fleet_forecast(request: FleetForecastRequest):
+    """计算多站点（场群）光伏/风电发电预测"""
+    try:
+        return await run_fleet_forecast(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"场群预测计算失败: {str(e)}")
+
+# ==================== 后台预测任务 ====================
+
+# 同时执行的任务数；每个任务的计算按 JOB_CHUNK_SITES 个站点分块交给场群进程池，
+# 块越小进度越细
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", 2))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", 100))
+JOB_RESULT_TTL_S = float(os.getenv("JOB_RESULT_TTL_S", 3600))
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", 200))
+JOB_CHUNK_SITES = int(os.getenv("JOB_CHUNK_SITES", 2))
+JOB_HEARTBEAT_S = float(os.getenv("JOB_HEARTBEAT_S", 15))
+
+class ForecastJobRequest(FleetForecastRequest):
+    """后台预测任务：参数与场群预测相同，单站点预测只需指定一个站点"""
+    priority: int = 0
+
+async def run_forecast_job(job: job_queue.Job) -> dict:
+    """执行场群预测任务，按块更新任务进度"""
+    return await run_fleet_forecast(job.params, chunk_sites=JOB_CHUNK_SITES, on_progress=job.set_progress)
+
+forecast_jobs = job_queue.JobQueue(
+    runner=run_forecast_job,
+    concurrency=JOB_CONCURRENCY,
+    max_queued=JOB_MAX_QUEUED,
+    result_ttl=JOB_RESULT_TTL_S,
+    max_finished=JOB_MAX_FINISHED
+)
+
+@app.on_event("startup")
+async def start_forecast_jobs():
+    """启动任务调度"""
+    forecast_jobs.start()
+
+@app.on_event("shutdown")
+async def stop_forecast_jobs():
+    """停止任务调度，取消执行中的任务"""
+    await forecast_jobs.stop()
+
+def get_job_or_404(job_id: str) -> job_queue.Job:
+    job = forecast_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return job
+
+def job_status(job: job_queue.Job) -> dict:
+    return {**job.snapshot(), 'queue_position': forecast_jobs.queue_position(job)}
+
+@app.post("/api/jobs", status_code=202)
+async def submit_forecast_job(request: ForecastJobRequest):
+    """提交后台预测任务，返回任务编号（priority 越大越先执行）"""
+    sites = fleet_sites(request)
+    kinds = {kind for kind, _ in sites}
+    kind = kinds.pop() if len(kinds) == 1 else 'fleet'
+    try:
+        job = forecast_jobs.submit(kind, request, request.priority)
+    except job_queue.JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return job_status(job)
+
+@app.get("/api/jobs")
+async def list_forecast_jobs(state: Optional[str] = Query(None, description="按状态过滤: " + "、".join(job_queue.JOB_STATES))):
+    """列出保留中的任务"""
+    if state is not None and state not in job_queue.JOB_STATES:
+        raise HTTPException(status_code=400, detail=f"不支持的任务状态: {state}")
+    return {
+        'jobs': [job_status(job) for job in forecast_jobs.list(state)],
+        'stats': forecast_jobs.stats()
+    }
+
+@app.get("/api/jobs/{job_id}")
+async def get_forecast_job(job_id: str):
+    """查询任务状态和进度"""
+    return job_status(get_job_or_404(job_id))
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_forecast_job(job_id: str, accept: Optional[str] = Header(None)):
+    """订阅任务状态变化，直到任务结束
+
+    默认输出 NDJSON（每行一个状态），Accept 为 text/event-stream 时输出 SSE。
+    """
+    job = get_job_or_404(job_id)
+    sse = 'text/event-stream' in (accept or '')
+
+    async def events():
+        async for snapshot in forecast_jobs.watch(job, heartbeat=JOB_HEARTBEAT_S):
+            data = json.dumps({**snapshot, 'queue_position': forecast_jobs.queue_position(job)}, ensure_ascii=False)
+            yield f"event: {snapshot['state']}\ndata: {data}\n\n" if sse else data + "\n"
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream' if sse else forecast_stream.STREAM_MEDIA_TYPES['ndjson'],
+        headers={'Cache-Control': 'no-cache'}
+    )
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_forecast_job_result(job_id: str):
+    """获取任务结果：未结束时返回 202 和任务状态，失败或已取消时返回 409"""
+    job = get_job_or_404(job_id)
+    if not job.finished:
+        return JSONResponse(status_code=202, content=job_status(job))
+    if job.state != 'succeeded':
+        detail = "任务已取消" if job.state == 'cancelled' else f"任务失败: {job.error}"
+        raise HTTPException(status_code=409, detail=detail)
+    return job.result
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_forecast_job(job_id: str):
+    """取消等待中或执行中的任务"""
+    job = get_job_or_404(job_id)
+    if job.finished:
+        raise HTTPException(status_code=409, detail=f"任务已结束: {job.state}")
+    forecast_jobs.cancel(job_id)
+    return job_status(job)
+
+def build_wind_forecast(request: WindForecastRequest, output_format: str, cache_key: str, province_id: int,
+                        weather_data: WeatherSeries, config_hash: Optional[str] = None,
+                        stored_columns: Optional[dict] = None):
+    """计算风电预测并编码响应（CPU 密集，在线程池中执行）
+
+    stored_columns 为已保存的结果时直接使用，不重新计算。返回 (响应, 需要保存的列)，
+    未开启 persist 或结果来自已保存的结果时需要保存的列为 None。
+    """
+    computed = None
+    if stored_columns is not None:
+        wind_hub, generation = stored_columns['wind_speed_hub_ms'], stored_columns['hourly_generation_kwh']
+    else:
+        wind_hub, generation = wind_calculator.hourly_generation_array(
+            weather_data.wind_speed_ms,
             hub_height_m=request.tower_height_m,
             rated_capacity_kw=request.rated_capacity_kw,
             cut_in_ms=request.cut_in_wind_speed_ms,
@@ -183,63 +1084,170 @@ async def calculate_wind_forecast(request: WindForecastRequest):
             cut_out_ms=request.cut_out_wind_speed_ms,
             num_turbines=request.num_turbines,
         )
+        if request.persist:
+            computed = {
+                'wind_speed_10m_ms': weather_data.wind_speed_ms,
+                'wind_speed_hub_ms': np.round(wind_hub, 3),
+                'hourly_generation_kwh': np.round(generation, 4)
+            }
+
+    result = {
+        'station_id': request.station_id,
+        'start_date': request.start_date,
+        'end_date': request.end_date,
+        'rated_capacity_kw': request.rated_capacity_kw,
+        'num_turbines': request.num_turbines,
+        **wind_calculator.summarize_array(generation),
+        'resolution': request.resolution
+    }
+    if request.persist:
+        result.update({'config_hash': config_hash,
+                       'result_source': 'stored' if stored_columns is not None else 'computed'})
 
-        # 时间戳序列化
-        for item in hourly:
-            if isinstance(item['timestamp'], datetime):
-                item['timestamp'] = item['timestamp'].isoformat()
-            else:
-                item['timestamp'] = str(item['timestamp'])
+    streaming = output_format in forecast_stream.STREAM_MEDIA_TYPES
+    if not is_reduced(request):
+        if streaming:
+            def to_records(lo, hi):
+                return wind_records_at(weather_data.ts, weather_data.wind_speed_ms, wind_hub, generation,
+                                       slice(lo, hi))
+            return stream_forecast(output_format, len(weather_data), to_records, WIND_RECORD_FIELDS,
+                                   {**result, 'result_points': len(weather_data)}), computed
+        if output_format == 'msgpack':
+            return cache_result(cache_key, {**result, 'result_points': len(weather_data)},
+                                province_id, weather_data, columns={
+                'timestamp': weather_data.ts,
+                'wind_speed_10m_ms': weather_data.wind_speed_ms,
+                'wind_speed_hub_ms': np.round(wind_hub, 3),
+                'hourly_generation_kwh': np.round(generation, 4)
+            }), computed
 
-        summary = wind_calculator.summarize(hourly)
+    rows = wind_result_rows(request, weather_data.ts, weather_data.wind_speed_ms, wind_hub, generation)
+    if streaming:
+        return stream_forecast(output_format, len(rows), lambda lo, hi: rows[lo:hi], list(rows[0]),
+                               {**result, 'result_points': len(rows)}), computed
+    if output_format == 'msgpack':
+        return cache_result(cache_key, {**result, 'result_points': len(rows)}, province_id, weather_data,
+                            columns=columnar.records_to_columns(rows, list(rows[0]))), computed
+    return cache_result(cache_key, {
+        **result,
+        'forecast_results': rows,
+        'result_points': len(rows),
+        'data_points': len(weather_data)
+    }, province_id, weather_data), computed
+
+@app.post("/api/wind-forecast/calculate")
+async def calculate_wind_forecast(
+    request: WindForecastRequest,
+    background_tasks: BackgroundTasks,
+    output_format: Optional[str] = Query(None, alias="format", description="输出格式: json、msgpack、ndjson、csv，未指定时按 Accept 请求头协商"),
+    accept: Optional[str] = Header(None)
+):
+    """计算风力发电预测（使用数据库风速）。"""
+    try:
+        output_format = resolve_output_format(output_format, accept)
+        check_series_options(request)
+        cache_key = forecast_cache_key("wind", output_format, request)
+        if output_format in CACHED_FORMATS:
+            cached = await get_cached_result(cache_key, CACHED_FORMATS[output_format], request.persist)
+            if cached is not None:
+                return cached
+
+        province_id = await get_province_id_by_station(request.station_id)
+        config_hash = stored = None
+        if request.persist:
+            config_hash = forecast_store.config_hash("wind", request.dict(exclude=PERSIST_EXCLUDE))
+            stored = await run_db(load_stored_hourly, "wind", request.station_id, province_id, config_hash,
+                                  request.start_date, request.end_date)
+
+        stored_columns = None
+        if stored is not None:
+            # 已保存的结果：10米风速放回气象序列，轮毂风速和发电量直接使用
+            ts, stored_columns, version = stored
+            missing = np.full(len(ts), np.nan)
+            weather_data = WeatherSeries(ts, missing, missing, stored_columns['wind_speed_10m_ms'], version)
+        else:
+            weather_data = await run_db(
+                get_weather_series, province_id, request.start_date, request.end_date
+            )
+            if not len(weather_data):
+                raise HTTPException(status_code=404, detail="未找到指定时间范围内的气象数据")
+
+        # 计算和编码在线程池中执行，整年的逐小时结果不阻塞事件循环
+        response, computed = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            build_wind_forecast, request, output_format, cache_key, province_id, weather_data,
+            config_hash, stored_columns
+        ))
+        if computed is not None:
+            background_tasks.add_task(
+                save_stored_hourly, "wind", request.station_id, config_hash,
+                request.start_date, request.end_date, weather_data.version[0], weather_data.ts, computed
+            )
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"风电预测计算失败: {str(e)}")
+
+@app.post("/api/wind-forecast/summary")
+async def calculate_wind_forecast_summary(request: WindSummaryRequest):
+    """按日/月汇总风力发电预测（使用日汇总表和风速直方图，不读取小时数据）。"""
+    try:
+        check_resolution(request.resolution)
+        start_date, end_date = parse_date_range(request.start_date, request.end_date)
+        province_id = await get_province_id_by_station(request.station_id)
+        rows = await run_db(get_period_weather_stats, province_id, request.resolution, start_date, end_date)
+        if not rows:
+            raise HTTPException(status_code=404, detail="未找到指定时间范围内的气象汇总数据")
+        histograms = await run_db(
+            get_period_wind_histograms, province_id, request.resolution, start_date, end_date
+        )
+
+        periods = []
+        for row in rows:
+            hours = int(row['hours'])
+            bins, bin_hours = histograms.get(row['period'], ([], []))
+            generation = wind_calculator.histogram_generation(
+                bins, bin_hours,
+                bin_width_ms=rollups.WIND_BIN_WIDTH,
+                hub_height_m=request.tower_height_m,
+                rated_capacity_kw=request.rated_capacity_kw,
+                cut_in_ms=request.cut_in_wind_speed_ms,
+                rated_ms=request.rated_wind_speed_ms,
+                cut_out_ms=request.cut_out_wind_speed_ms,
+                num_turbines=request.num_turbines,
+            )
+            histogram = [0] * (max(bins) + 1 if bins else 0)
+            for index, count in zip(bins, bin_hours):
+                histogram[index] = count
+            periods.append({
+                'period': rollups.format_period(request.resolution, row['period']),
+                'hours': hours,
+                'wind_speed_mean_10m_ms': round(float(row['wind_speed_sum'] or 0) / hours, 3) if hours else 0.0,
+                'wind_speed_max_10m_ms': round(float(row['wind_speed_max'] or 0), 3),
+                'wind_speed_histogram': histogram,
+                'generation_kwh': round(generation, 4),
+            })
+
+        total = sum(p['generation_kwh'] for p in periods)
+        total_hours = sum(p['hours'] for p in periods)
         return {
             'station_id': request.station_id,
             'start_date': request.start_date,
             'end_date': request.end_date,
+            'resolution': request.resolution,
             'rated_capacity_kw': request.rated_capacity_kw,
             'num_turbines': request.num_turbines,
-            **summary,
-            'forecast_results': hourly,
-            'data_points': len(hourly)
+            'wind_bin_width_ms': rollups.WIND_BIN_WIDTH,
+            'total_generation_kwh': round(total, 4),
+            'avg_hourly_generation_kwh': round(total / total_hours, 4) if total_hours else 0.0,
+            'hours': total_hours,
+            'forecast_results': periods,
+            'data_points': len(periods)
         }
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"风电预测计算失败: {str(e)}")
-
-def get_weather_data_by_station_and_time(station_id: int, start_date: str, end_date: str) -> List[dict]:
-    """根据站点ID和时间范围获取气象数据"""
-    try:
-        # 获取站点信息
-        station_sql = """
-        SELECT s.id, s.name, s.province, s.province_id, p.name as province_name
-        FROM station s 
-        LEFT JOIN province p ON s.province_id = p.id
-        WHERE s.id = %s
-        """
-        station_result = execute_query(station_sql, (station_id,))
-        
-        if not station_result:
-            raise HTTPException(status_code=404, detail="站点不存在")
-        
-        station = station_result[0]
-        table_name = get_table_name_by_province(station['province'])
-        
-        # 查询气象数据
-        weather_sql = f"""
-        SELECT ts, surface_radiation_wm2, temp_c, humidity, pressure_hpa
-        FROM {table_name} 
-        WHERE province_id = %s 
-        AND ts BETWEEN %s AND %s
-        ORDER BY ts
-        """
-        
-        weather_data = execute_query(weather_sql, (station['province_id'], start_date, end_date))
-        
-        return weather_data
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"获取气象数据失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"风电预测汇总失败: {str(e)}")
 
 # 计算函数现在使用pv_calculator模块
 
@@ -254,82 +1262,61 @@ async def read_index():
 # API路由
 @app.get("/api/stations/nearby")
 async def get_nearby_stations(
-    lng: float = Query(..., description="经度"),
-    lat: float = Query(..., description="纬度"),
-    limit: int = Query(5, description="返回站点数量")
+    lng: float = Query(..., ge=-180, le=180, description="经度"),
+    lat: float = Query(..., ge=-90, le=90, description="纬度"),
+    limit: int = Query(5, ge=1, description="返回站点数量"),
+    radius_km: Optional[float] = Query(None, gt=0, description="搜索半径（公里），未指定时不限距离")
 ):
-    """根据经纬度获取附近站点"""
-    sql = """
-    SELECT id, name, province, lng, lat,
-           ((lng-%s)*(lng-%s)+(lat-%s)*(lat-%s)) AS distance_squared
-    FROM station 
-    ORDER BY distance_squared 
-    LIMIT %s
-    """
-    stations = execute_query(sql, (lng, lng, lat, lat, limit))
-    
-    # 计算实际距离（公里）
-    for station in stations:
-        station['distance_km'] = math.sqrt(station['distance_squared']) * 111.32  # 粗略转换
-        del station['distance_squared']
-    
-    return {"stations": stations}
+    """根据经纬度获取附近站点（按球面距离由近到远）"""
+    index = (await current_metadata()).index
+    return {"stations": index.nearest(lng, lat, limit, radius_km)}
 
 @app.get("/api/stations/search")
 async def search_stations(
     keyword: str = Query(..., description="搜索关键词"),
-    limit: int = Query(10, description="返回数量")
+    limit: int = Query(10, ge=1, description="返回数量")
 ):
-    """搜索站点"""
-    sql = """
-    SELECT id, name, province, lng, lat
-    FROM station 
-    WHERE name LIKE %s OR province LIKE %s
-    ORDER BY 
-        CASE 
-            WHEN name = %s THEN 1
-            WHEN name LIKE %s THEN 2
-            ELSE 3
-        END
-    LIMIT %s
-    """
-    keyword_pattern = f"%{keyword}%"
-    exact_match = keyword
-    stations = execute_query(sql, (keyword_pattern, keyword_pattern, exact_match, keyword_pattern, limit))
-    return {"stations": stations}
+    """搜索站点（名称或省份包含关键词，名称完全匹配、前缀匹配的排在前面）"""
+    index = (await current_metadata()).index
+    return {"stations": index.search(keyword, limit)}
+
+STATION_SEARCH_MAX_BATCH = int(os.getenv("STATION_SEARCH_MAX_BATCH", 500))
+
+class StationSearchBatchRequest(BaseModel):
+    keywords: List[str]
+    limit: int = 1
+
+@app.post("/api/stations/search/batch")
+async def search_stations_batch(request: StationSearchBatchRequest):
+    """批量搜索站点：每个关键词返回排序后的前 limit 个站点"""
+    if len(request.keywords) > STATION_SEARCH_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"关键词数量超过上限 {STATION_SEARCH_MAX_BATCH}")
+    if request.limit < 1:
+        raise HTTPException(status_code=400, detail="limit 必须大于 0")
+    index = (await current_metadata()).index
+    return {"results": [
+        {"keyword": keyword, "stations": index.search(keyword, request.limit)}
+        for keyword in request.keywords
+    ]}
 
 @app.get("/api/weather/by-station/{station_id}")
 async def get_weather_by_station(station_id: int):
     """根据站点ID获取天气数据"""
     try:
-        # 1. 获取站点信息（包含province_id）
-        station_sql = """
-        SELECT s.id, s.name, s.province, s.lng, s.lat, s.province_id, p.name as province_name
-        FROM station s 
-        LEFT JOIN province p ON s.province_id = p.id
-        WHERE s.id = %s
-        """
-        station_result = execute_query(station_sql, (station_id,))
-        
-        if not station_result:
-            raise HTTPException(status_code=404, detail="站点不存在")
-        
-        station = station_result[0]
+        # 1. 获取站点信息（包含province_id，来自元数据快照）
+        station = await get_station_by_id(station_id)
         
         if not station['province_id']:
             raise HTTPException(status_code=404, detail="站点未关联省份")
         
-        # 2. 获取对应省份的天气表名
-        table_name = get_table_name_by_province(station['province'])
-        
-        # 3. 获取该省份的天气数据
-        weather_sql = f"""
-        SELECT * FROM {table_name} 
+        # 2. 获取该省份的天气数据
+        weather_sql = """
+        SELECT * FROM weather_observation
         WHERE province_id = %s
         ORDER BY ts DESC 
         LIMIT 100
         """
-        weather_data = execute_query(weather_sql, (station['province_id'],))
+        weather_data = await execute_query_async(weather_sql, (station['province_id'],))
         
         return {
             "station": {
@@ -343,7 +1330,7 @@ async def get_weather_by_station(station_id: int):
             },
             "weather_data": weather_data,
             "data_source": f"{station['province_name']}省天气数据",
-            "table_name": table_name
+            "table_name": "weather_observation"
         }
         
     except Exception as e:
@@ -353,18 +1340,15 @@ async def get_weather_by_station(station_id: int):
 async def get_weather_by_province(province: str):
     """根据省份获取天气数据"""
     try:
-        table_name = get_table_name_by_province(province)
-        
-        # 获取该省份的天气数据
-        weather_sql = f"""
-        SELECT * FROM {table_name} 
-        WHERE station_id = (
-            SELECT station_id FROM {table_name} LIMIT 1
-        )
+        # 获取该省份的天气数据（省份ID来自元数据快照）
+        province_id = await get_province_id_by_name(province)
+        weather_sql = """
+        SELECT * FROM weather_observation
+        WHERE province_id = %s
         ORDER BY ts DESC 
         LIMIT 100
         """
-        weather_data = execute_query(weather_sql)
+        weather_data = await execute_query_async(weather_sql, (province_id,)) if province_id is not None else []
         
         return {
             "province": province,
@@ -380,13 +1364,8 @@ async def get_weather_by_province(province: str):
 async def create_pv_config(config: PVForecastConfig):
     """创建光伏发电预测配置"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # 检查站点是否存在
-        station_check = execute_query("SELECT id FROM station WHERE id = %s", (config.station_id,))
-        if not station_check:
-            raise HTTPException(status_code=404, detail="站点不存在")
+        await get_station_by_id(config.station_id)
         
         # 插入或更新配置
         sql = """
@@ -405,16 +1384,12 @@ async def create_pv_config(config: PVForecastConfig):
         updated_at = CURRENT_TIMESTAMP
         """
         
-        cursor.execute(sql, (
+        await execute_write_async(sql, (
             config.station_id, config.installed_capacity_kw, config.panel_efficiency,
             config.inverter_efficiency, config.temperature_coefficient, config.degradation_rate,
             config.tilt_angle, config.azimuth_angle
         ))
         
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
         return {"message": "光伏发电配置保存成功", "station_id": config.station_id}
         
     except Exception as e:
@@ -427,7 +1402,7 @@ async def get_pv_config(station_id: int):
         sql = """
         SELECT * FROM pv_forecast_config WHERE station_id = %s
         """
-        result = execute_query(sql, (station_id,))
+        result = await execute_query_async(sql, (station_id,))
         
         if not result:
             raise HTTPException(status_code=404, detail="未找到光伏发电配置")
@@ -437,19 +1412,23 @@ async def get_pv_config(station_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取配置失败: {str(e)}")
 
-@app.post("/api/pv-forecast/calculate")
-async def calculate_pv_forecast(request: PVForecastRequest):
-    """计算光伏发电预测"""
-    try:
-        # 获取气象数据
-        weather_data = get_weather_data_by_station_and_time(
-            request.station_id, request.start_date, request.end_date
-        )
-        
-        if not weather_data:
-            raise HTTPException(status_code=404, detail="未找到指定时间范围内的气象数据")
-        
-        # 使用pv_calculator计算发电量
+def build_pv_forecast(request: PVForecastRequest, output_format: str, cache_key: str, province_id: int,
+                      weather_data: WeatherSeries, config_hash: Optional[str] = None,
+                      stored_columns: Optional[dict] = None):
+    """计算光伏预测并编码响应（CPU 密集，在线程池中执行）
+
+    stored_columns 为已保存的结果时直接使用，不重新计算。返回 (响应, 需要保存的列)，
+    未开启 persist 或结果来自已保存的结果时需要保存的列为 None。
+    """
+    computed = None
+    if stored_columns is not None:
+        columns = {
+            'timestamp': None,
+            **stored_columns,
+            'efficiency_factor': float(stored_columns['efficiency_factor'][0])
+        }
+    else:
+        # 使用pv_calculator按列计算发电量
         params = {
             'panel_efficiency': request.panel_efficiency,
             'inverter_efficiency': request.inverter_efficiency,
@@ -457,96 +1436,239 @@ async def calculate_pv_forecast(request: PVForecastRequest):
             'degradation_rate': request.degradation_rate
         }
         
-        forecast_results = pv_calculator.calculate_hourly_generation(
-            weather_data=weather_data,
+        solar_radiation, temperature = pv_calculator.fill_missing_weather(
+            weather_data.surface_radiation_wm2, weather_data.temp_c
+        )
+        columns = pv_calculator.calculate_hourly_generation_columns(
+            timestamps=None,
+            solar_radiation=solar_radiation,
+            temperature=temperature,
             installed_capacity=request.installed_capacity_kw,
             params=params
         )
+        if request.persist:
+            computed = {name: value for name, value in columns.items() if name != 'timestamp'}
+    
+    # 计算统计信息
+    stats = pv_calculator.calculate_statistics_columns(columns)
+    total_generation = stats['total_generation_kwh']
+    avg_daily_generation = stats['average_daily_generation_kwh']
+    capacity_factor = pv_calculator.calculate_capacity_factor(
+        total_generation, request.installed_capacity_kw, len(weather_data)
+    )
+    
+    result = {
+        "station_id": request.station_id,
+        "start_date": request.start_date,
+        "end_date": request.end_date,
+        "installed_capacity_kw": request.installed_capacity_kw,
+        "total_generation_kwh": round(total_generation, 4),
+        "average_daily_generation_kwh": round(avg_daily_generation, 4),
+        "capacity_factor": round(capacity_factor, 4),
+        "resolution": request.resolution
+    }
+    if request.persist:
+        result.update({"config_hash": config_hash,
+                       "result_source": "stored" if stored_columns is not None else "computed"})
+    
+    streaming = output_format in forecast_stream.STREAM_MEDIA_TYPES
+    if not is_reduced(request):
+        if streaming:
+            # 逐块切片列数据并格式化时间戳，不生成完整的逐行列表
+            def to_records(lo, hi):
+                return pv_records_at(columns, weather_data.ts, slice(lo, hi))
+            return stream_forecast(output_format, len(weather_data), to_records, PV_RECORD_FIELDS,
+                                   {**result, "result_points": len(weather_data),
+                                    "data_points": len(weather_data)}), computed
+        if output_format == 'msgpack':
+            return cache_result(cache_key, {
+                **result, "result_points": len(weather_data), "data_points": len(weather_data)
+            }, province_id, weather_data, columns={
+                "timestamp": weather_data.ts,
+                "solar_radiation_wm2": columns['solar_radiation_wm2'],
+                "temperature_c": columns['temperature_c'],
+                "hourly_generation_kwh": columns['hourly_generation_kwh'],
+                "efficiency_factor": np.full(len(weather_data), columns['efficiency_factor'])
+            }), computed
+    
+    # 聚合和降采样只影响返回的结果行，统计信息基于完整的小时序列
+    rows = pv_result_rows(request, weather_data.ts, columns)
+    if streaming:
+        return stream_forecast(output_format, len(rows), lambda lo, hi: rows[lo:hi], list(rows[0]),
+                               {**result, "result_points": len(rows), "data_points": len(weather_data)}), computed
+    if output_format == 'msgpack':
+        return cache_result(cache_key, {
+            **result, "result_points": len(rows), "data_points": len(weather_data)
+        }, province_id, weather_data, columns=columnar.records_to_columns(rows, list(rows[0]))), computed
+    return cache_result(cache_key, {
+        **result,
+        "forecast_results": rows,
+        "result_points": len(rows),
+        "data_points": len(weather_data)
+    }, province_id, weather_data), computed
+
+@app.post("/api/pv-forecast/calculate")
+async def calculate_pv_forecast(
+    request: PVForecastRequest,
+    background_tasks: BackgroundTasks,
+    output_format: Optional[str] = Query(None, alias="format", description="输出格式: json、msgpack、ndjson、csv，未指定时按 Accept 请求头协商"),
+    accept: Optional[str] = Header(None)
+):
+    """计算光伏发电预测"""
+    try:
+        output_format = resolve_output_format(output_format, accept)
+        check_series_options(request)
+        cache_key = forecast_cache_key("pv", output_format, request)
+        if output_format in CACHED_FORMATS:
+            cached = await get_cached_result(cache_key, CACHED_FORMATS[output_format], request.persist)
+            if cached is not None:
+                return cached
+
+        province_id = await get_province_id_by_station(request.station_id)
+        config_hash = stored = None
+        if request.persist:
+            config_hash = forecast_store.config_hash("pv", request.dict(exclude=PERSIST_EXCLUDE))
+            stored = await run_db(load_stored_hourly, "pv", request.station_id, province_id, config_hash,
+                                  request.start_date, request.end_date)
         
-        # 格式化时间戳
-        for result in forecast_results:
-            if isinstance(result['timestamp'], datetime):
-                result['timestamp'] = result['timestamp'].isoformat()
-            else:
-                result['timestamp'] = str(result['timestamp'])
-        
-        # 计算统计信息
-        stats = pv_calculator.calculate_statistics(forecast_results)
-        total_generation = stats['total_generation_kwh']
-        avg_daily_generation = stats['average_daily_generation_kwh']
+        stored_columns = None
+        if stored is not None:
+            # 已保存的结果：辐射和温度（已做缺测处理）放回气象序列，其余列直接使用
+            ts, stored_columns, version = stored
+            weather_data = WeatherSeries(ts, stored_columns['solar_radiation_wm2'], stored_columns['temperature_c'],
+                                         np.full(len(ts), np.nan), version)
+        else:
+            # 获取气象数据
+            weather_data = await run_db(
+                get_weather_series, province_id, request.start_date, request.end_date
+            )
+            
+            if not len(weather_data):
+                raise HTTPException(status_code=404, detail="未找到指定时间范围内的气象数据")
+        
+        # 计算和编码在线程池中执行，整年的逐小时结果不阻塞事件循环
+        response, computed = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            build_pv_forecast, request, output_format, cache_key, province_id, weather_data,
+            config_hash, stored_columns
+        ))
+        if computed is not None:
+            background_tasks.add_task(
+                save_stored_hourly, "pv", request.station_id, config_hash,
+                request.start_date, request.end_date, weather_data.version[0], weather_data.ts, computed
+            )
+        return response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"计算预测失败: {str(e)}")
+
+@app.post("/api/pv-forecast/summary")
+async def calculate_pv_forecast_summary(request: PVSummaryRequest):
+    """按日/月汇总光伏发电预测（使用日汇总表，不读取小时数据）"""
+    try:
+        check_resolution(request.resolution)
+        start_date, end_date = parse_date_range(request.start_date, request.end_date)
+        province_id = await get_province_id_by_station(request.station_id)
+        rows = await run_db(get_period_weather_stats, province_id, request.resolution, start_date, end_date)
+        
+        if not rows:
+            raise HTTPException(status_code=404, detail="未找到指定时间范围内的气象汇总数据")
+        
+        periods = []
+        for row in rows:
+            radiation_sum = float(row['radiation_sum'] or 0)
+            generation = pv_calculator.calculate_generation_from_sums(
+                radiation_sum=radiation_sum,
+                radiation_temp_sum=float(row['radiation_temp_sum'] or 0),
+                installed_capacity=request.installed_capacity_kw,
+                panel_efficiency=request.panel_efficiency,
+                inverter_efficiency=request.inverter_efficiency,
+                temperature_coefficient=request.temperature_coefficient
+            )
+            periods.append({
+                "period": rollups.format_period(request.resolution, row['period']),
+                "hours": int(row['hours']),
+                "solar_radiation_sum_whm2": round(radiation_sum, 2),
+                "generation_kwh": round(generation, 4)
+            })
+        
+        total_generation = sum(p['generation_kwh'] for p in periods)
+        total_hours = sum(p['hours'] for p in periods)
         capacity_factor = pv_calculator.calculate_capacity_factor(
-            total_generation, request.installed_capacity_kw, len(weather_data)
+            total_generation, request.installed_capacity_kw, total_hours
         )
         
         return {
             "station_id": request.station_id,
             "start_date": request.start_date,
             "end_date": request.end_date,
+            "resolution": request.resolution,
             "installed_capacity_kw": request.installed_capacity_kw,
             "total_generation_kwh": round(total_generation, 4),
-            "average_daily_generation_kwh": round(avg_daily_generation, 4),
+            "average_daily_generation_kwh": round(total_generation / total_hours * 24, 4) if total_hours else 0.0,
             "capacity_factor": round(capacity_factor, 4),
-            "forecast_results": forecast_results,
-            "data_points": len(weather_data)
+            "forecast_results": periods,
+            "data_points": len(periods)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"计算预测失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"计算预测汇总失败: {str(e)}")
 
 @app.get("/api/pv-forecast/yearly/{station_id}")
 async def get_yearly_pv_forecast(
     station_id: int,
+    background_tasks: BackgroundTasks,
     years: int = Query(5, description="预测年数"),
     installed_capacity_kw: float = Query(1000, description="装机容量(kW)"),
-    degradation_rate: float = Query(0.005, description="年衰减率")
+    degradation_rate: float = Query(0.005, description="年衰减率"),
+    persist: bool = Query(False, description="保存预测结果，参数相同时直接读取已保存的结果")
 ):
     """获取多年光伏发电预测"""
     try:
-        # 获取站点信息
-        station_sql = """
-        SELECT s.id, s.name, s.province, s.province_id, p.name as province_name
-        FROM station s 
-        LEFT JOIN province p ON s.province_id = p.id
-        WHERE s.id = %s
-        """
-        station_result = execute_query(station_sql, (station_id,))
-        
-        if not station_result:
-            raise HTTPException(status_code=404, detail="站点不存在")
+        station = await get_station_by_id(station_id)
         
-        station = station_result[0]
-        table_name = get_table_name_by_province(station['province'])
-        
-        # 获取历史气象数据（用于计算基准发电量）
+        # 基准年：不晚于今年的最近一个有气象数据的年份（使用月度汇总）
         current_year = datetime.now().year
-        weather_sql = f"""
-        SELECT surface_radiation_wm2, temp_c
-        FROM {table_name} 
-        WHERE province_id = %s 
-        AND YEAR(ts) = %s
-        AND surface_radiation_wm2 IS NOT NULL
-        AND temp_c IS NOT NULL
-        """
+        station_info = {
+            "station_id": station_id,
+            "station_name": station['name'],
+            "province": station['province'],
+            "installed_capacity_kw": installed_capacity_kw,
+            "degradation_rate": degradation_rate,
+        }
         
-        weather_data = execute_query(weather_sql, (station['province_id'], current_year))
+        if persist:
+            # 预测年数不参与哈希：保存的年份范围覆盖请求即可；逐年衰减相对于当年计算，
+            # 当年（决定基准年和各年的衰减）参与哈希，跨年后不再读取上一年保存的结果
+            config_hash = forecast_store.config_hash("pv_yearly", {
+                'installed_capacity_kw': installed_capacity_kw, 'degradation_rate': degradation_rate,
+                'current_year': current_year
+            })
+            weather_version = await run_db(weather_version_tag, station['province_id'])
+            stored = await run_db(
+                load_stored_yearly, station_id, config_hash, weather_version, current_year + 1, current_year + years
+            )
+            if stored is not None:
+                summary, yearly_forecasts = stored
+                return {**station_info, **summary, "yearly_forecasts": yearly_forecasts,
+                        "config_hash": config_hash, "result_source": "stored"}
+        base_year = await run_db(
+            get_base_year_weather_stats, station['province_id'], current_year
+        )
         
-        if not weather_data:
+        if not base_year or not base_year['hours']:
             raise HTTPException(status_code=404, detail="未找到气象数据")
         
-        # 使用pv_calculator计算基准年发电量
-        base_year_generation = 0
-        for weather in weather_data:
-            # 确保数据类型转换，处理 decimal.Decimal 类型
-            solar_radiation = float(weather.get('surface_radiation_wm2', 0) or 0)
-            temperature = float(weather.get('temp_c', 25) or 25)
-            
-            hourly_generation = pv_calculator.calculate_pv_generation(
-                solar_radiation=solar_radiation,
-                temperature=temperature,
-                installed_capacity=installed_capacity_kw,
-                degradation_factor=1.0
-            )
-            base_year_generation += hourly_generation
+        # 使用pv_calculator由汇总量计算基准年发电量
+        base_year_generation = pv_calculator.calculate_generation_from_sums(
+            radiation_sum=float(base_year['radiation_sum'] or 0),
+            radiation_temp_sum=float(base_year['radiation_temp_sum'] or 0),
+            installed_capacity=installed_capacity_kw,
+            degradation_factor=1.0
+        )
         
         # 使用pv_calculator计算多年预测
         yearly_forecasts = pv_calculator.calculate_yearly_forecast(
@@ -556,67 +1678,141 @@ async def get_yearly_pv_forecast(
             degradation_rate=degradation_rate
         )
         
-        return {
-            "station_id": station_id,
-            "station_name": station['name'],
-            "province": station['province'],
-            "installed_capacity_kw": installed_capacity_kw,
-            "degradation_rate": degradation_rate,
+        summary = {
             "base_year_generation_kwh": round(base_year_generation, 2),
-            "yearly_forecasts": yearly_forecasts
+            "data_year": int(base_year['obs_year']),
+            "data_points": int(base_year['hours'])
         }
+        result = {**station_info, **summary, "yearly_forecasts": yearly_forecasts}
+        if persist and yearly_forecasts:
+            background_tasks.add_task(save_stored_yearly, station_id, config_hash, weather_version,
+                                      yearly_forecasts, summary)
+            result.update({"config_hash": config_hash, "result_source": "computed"})
+        return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"计算多年预测失败: {str(e)}")
 
+@app.get("/api/system/db-pool")
+async def get_db_pool_status():
+    """获取数据库连接池状态"""
+    return db_pool.stats()
+
+@app.get("/api/cache/weather")
+async def get_weather_cache_status():
+    """获取气象序列缓存状态"""
+    return weather_cache.stats()
+
+@app.post("/api/cache/weather/invalidate")
+async def invalidate_weather_cache(
+    province: str = Query(None, description="省份名称，不指定时清空全部缓存")
+):
+    """使气象序列缓存失效（导入工具之外的途径修改了气象数据时使用）"""
+    # 已保存的预测结果按导入检查点判断是否可用，检查点不变时需要删除保存记录
+    if province is None:
+        count = weather_cache.invalidate()
+        purged = result_cache.purge()
+        runs_purged = await run_db(purge_stored_runs, None)
+    else:
+        province_id = await get_province_id_by_name(province)
+        if province_id is None:
+            raise HTTPException(status_code=404, detail="省份不存在")
+        count = weather_cache.invalidate(province_id)
+        purged = result_cache.purge(province_id)
+        station_ids = [station['id'] for station in (await current_metadata()).stations.values()
+                       if station['province_id'] == province_id]
+        runs_purged = await run_db(purge_stored_runs, station_ids)
+    return {"invalidated": count, "results_purged": purged, "stored_runs_purged": runs_purged,
+            **weather_cache.stats()}
+
+@app.get("/api/cache/metadata")
+async def get_metadata_status():
+    """获取站点与省份元数据快照状态"""
+    return metadata.stats()
+
+@app.post("/api/cache/metadata/reload")
+async def reload_metadata(
+    station_id: Optional[int] = Query(None, description="只重新读取该站点，不指定时重新加载全部元数据")
+):
+    """重新加载元数据（导入工具之外的途径修改了站点或省份时使用）"""
+    if station_id is None:
+        await run_db(metadata.reload)
+    else:
+        await run_db(metadata.load_stations, [station_id])
+    return metadata.stats()
+
+@app.get("/api/cache/results")
+async def get_result_cache_status():
+    """获取预测结果缓存状态"""
+    return result_cache.stats()
+
+@app.post("/api/cache/results/purge")
+async def purge_result_cache():
+    """清空预测结果缓存"""
+    return {"purged": result_cache.purge(), **result_cache.stats()}
+
+# 系统状态：数据统计来自导入工具维护的检查点（没有时使用 information_schema 估算），
+# 按 SYSTEM_STATUS_REFRESH_S 间隔在后台刷新，健康检查请求只读内存快照
+def load_status_counts() -> dict:
+    """查询站点数和观测数据量"""
+    station_count = execute_query("SELECT COUNT(*) as count FROM station")[0]['count']
+    
+    checkpoint = execute_query(
+        "SELECT COUNT(*) as provinces, SUM(row_count) as observations "
+        "FROM import_checkpoint WHERE row_count IS NOT NULL"
+    )[0]
+    if checkpoint['provinces']:
+        observations, source = int(checkpoint['observations'] or 0), "import_checkpoint"
+    else:
+        estimate = execute_query(
+            "SELECT TABLE_ROWS as observations FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'weather_observation'"
+        )
+        observations = int(estimate[0]['observations'] or 0) if estimate else 0
+        source = "information_schema"
+    
+    return {
+        "stations": station_count,
+        "observations": observations,
+        "observations_source": source
+    }
+
+status_monitor = StatusMonitor(
+    loader=load_status_counts,
+    refresh_interval=float(os.getenv("SYSTEM_STATUS_REFRESH_S", 30))
+)
+
 @app.get("/api/system/status")
 async def get_system_status():
-    """获取系统状态"""
-    try:
-        # 检查数据库连接
-        conn = get_db_connection()
-        conn.close()
-        
-        # 获取数据统计
-        station_count = execute_query("SELECT COUNT(*) as count FROM station")[0]['count']
-        
-        # 统计所有地区表的数据总量
-        province_tables = [
-            "weather_observation_beijing", "weather_observation_shanghai", "weather_observation_tianjin",
-            "weather_observation_hebei", "weather_observation_shanxi", "weather_observation_neimenggu",
-            "weather_observation_liaoning", "weather_observation_jilin", "weather_observation_heilongjiang",
-            "weather_observation_anhui", "weather_observation_shandong", "weather_observation_jiangxi",
-            "weather_observation_zhejiang", "weather_observation_fujian", "weather_observation_henan"
-        ]
-        
-        total_obs_count = 0
-        for table in province_tables:
-            try:
-                count_result = execute_query(f"SELECT COUNT(*) as count FROM {table}")
-                total_obs_count += count_result[0]['count']
-            except:
-                # 如果表不存在，跳过
-                continue
-        
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "stations": station_count,
-            "observations": total_obs_count,
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {
-            "status": "error",
-            "database": "disconnected",
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
-        }
+    """获取系统状态（读取缓存的统计快照，过期时在后台刷新）"""
+    if not status_monitor.ready:
+        await run_db(status_monitor.refresh)
+    elif status_monitor.begin_refresh():
+        asyncio.get_running_loop().run_in_executor(db_executor, status_monitor.refresh)
+    
+    counts = status_monitor.snapshot()
+    healthy = counts['error'] is None
+    return {
+        "status": "healthy" if healthy else "error",
+        "database": "connected" if healthy else "disconnected",
+        "stations": counts.get('stations'),
+        "observations": counts.get('observations'),
+        "counts": counts,
+        "db_pool": db_pool.stats(),
+        "caches": {
+            "weather": weather_cache.stats(),
+            "results": result_cache.stats(),
+            "metadata": metadata.stats()
+        },
+        "jobs": forecast_jobs.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
 
 if __name__ == "__main__":
     import uvicorn
     import signal
-    import sys
     
     # 忽略 Ctrl+C 信号，防止服务器被意外停止
     def signal_handler(sig, frame):
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试工具
+
+用法:
+    # 并发负载测试（需先启动 app.py）
+    python benchmark.py load --url http://127.0.0.1:8000/api/pv-forecast/calculate \\
+        --body '{"station_id": 1, "start_date": "2022-01-01", "end_date": "2022-12-31", "installed_capacity_kw": 1000}'
+
+    # CSV解析微基准（不需要数据库）
+    python benchmark.py parse --file ../data/北京.csv
+
+    # 响应压缩对比：不压缩 / gzip / br 的传输字节数和延迟（需先启动 app.py）
+    # 默认每个请求微调 installed_capacity_kw 以避开结果缓存；--vary '' 测量缓存命中
+    python benchmark.py compression --url http://127.0.0.1:8000/api/pv-forecast/calculate \\
+        --body '{"station_id": 1, "start_date": "2022-01-01", "end_date": "2022-12-31 23:00:00", "installed_capacity_kw": 1000}'
+
+对比阻塞与非阻塞数据库访问时，可用 DB_EXECUTOR_WORKERS=1 启动服务
+（数据库访问串行执行）作为对照组，再用默认配置启动服务重复测试。
+"""
+
+import argparse
+import csv
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import simple_import
+
+
+def send_request(url, body=None, headers=None):
+    """发送一次请求，返回 (状态码, 响应字节数, 耗时秒)"""
+    data = body.encode('utf-8') if body is not None else None
+    request = urllib.request.Request(url, data=data, method='POST' if data else 'GET')
+    request.add_header('Content-Type', 'application/json')
+    for key, value in (headers or {}).items():
+        request.add_header(key, value)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            size = len(response.read())
+            status = response.status
+    except urllib.error.HTTPError as e:
+        size = len(e.read())
+        status = e.code
+    return status, size, time.perf_counter() - start
+
+
+def run_load(url, body, concurrency, total):
+    """以指定并发度发送 total 个请求"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: send_request(url, body), range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(r[2] for r in results)
+    errors = sum(1 for r in results if r[0] >= 400)
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'throughput_rps': total / elapsed if elapsed else 0.0,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000,
+    }
+
+
+def cmd_load(args):
+    print("=" * 60)
+    print(f"🚀 并发负载测试: {args.url}")
+    print("=" * 60)
+    print(f"{'并发':>6} {'请求数':>8} {'错误':>6} {'吞吐(req/s)':>12} {'P50(ms)':>10} {'P95(ms)':>10}")
+    baseline = None
+    for concurrency in args.concurrency:
+        total = max(args.requests, concurrency)
+        result = run_load(args.url, args.body, concurrency, total)
+        baseline = baseline or result['throughput_rps']
+        print(f"{result['concurrency']:>6} {result['requests']:>8} {result['errors']:>6} "
+              f"{result['throughput_rps']:>12.1f} {result['p50_ms']:>10.1f} {result['p95_ms']:>10.1f}"
+              f"   x{result['throughput_rps'] / baseline:.2f}")
+
+
+def vary_body(body, field, sequence):
+    """请求体中的数值字段 field 加上 sequence × 1e-6，使每个请求的结果缓存键不同"""
+    data = json.loads(body)
+    data[field] = data[field] + sequence * 1e-6
+    return json.dumps(data)
+
+
+def cmd_compression(args):
+    vary = args.vary if args.vary and args.vary in json.loads(args.body) else None
+    print("=" * 60)
+    print(f"🗜️  响应压缩对比: {args.url}")
+    if vary:
+        print(f"   每个请求的 {vary} 加 序号×1e-6，结果缓存不命中：测量 计算 + 编码 + 压缩")
+    else:
+        print("   请求体相同：只有第一个请求计算结果，之后均为结果缓存命中，P50/P95 测量 缓存读取 + 压缩")
+    print("=" * 60)
+    print(f"{'编码':>10} {'传输字节':>12} {'压缩比':>8} {'首次(ms)':>10} {'P50(ms)':>10} {'P95(ms)':>10}")
+    baseline = None
+    sequence = 0
+    for encoding in args.encodings:
+        # urllib 不会自动解压，读取到的长度即传输的字节数
+        results = []
+        for _ in range(args.requests):
+            sequence += 1
+            body = vary_body(args.body, vary, sequence) if vary else args.body
+            results.append(send_request(args.url, body, headers={'Accept-Encoding': encoding}))
+        errors = sum(1 for r in results if r[0] >= 400)
+        size = results[-1][1]
+        baseline = baseline or size
+        # 首次请求单独列出（服务端缓存预热、未命中），其余请求统计 P50/P95
+        latencies = sorted(r[2] for r in results[1:]) or [results[0][2]]
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        print(f"{encoding:>10} {size:>12} {baseline / size if size else 0:>7.1f}x "
+              f"{results[0][2] * 1000:>10.1f} {statistics.median(latencies) * 1000:>10.1f} {p95 * 1000:>10.1f}"
+              + (f"   错误 {errors}" if errors else ""))
+
+
+def legacy_parse(csv_file, encoding):
+    """逐行 split/datetime/clean_numeric_value 的原解析方式（对照组）"""
+    with open(csv_file, 'r', encoding=encoding, errors='ignore') as f:
+        lines = f.readlines()
+    start = next(i for i, line in enumerate(lines) if '日期' in line and '时间' in line)
+    count = 0
+    for row in csv.DictReader(lines[start:]):
+        date_obj = datetime.strptime(row['日期'], '%Y-%m-%d')
+        hour, minute, second = (int(x) for x in row['时间'].split(':'))
+        datetime.combine(date_obj.date(), datetime.min.time().replace(hour=hour, minute=minute, second=second))
+        for name in simple_import.NUMERIC_COLUMNS:
+            simple_import.clean_numeric_value(row.get(name))
+        count += 1
+    return count
+
+
+def fast_parse(csv_file, encoding):
+    """WeatherCsvReader 流式快速解析"""
+    with simple_import.WeatherCsvReader(csv_file, encoding) as reader:
+        return sum(1 for _ in reader)
+
+
+def cmd_parse(args):
+    encoding = simple_import.detect_encoding(args.file)
+    print("=" * 60)
+    print(f"📄 CSV解析微基准: {args.file} ({encoding})")
+    print("=" * 60)
+    baseline = None
+    for name, func in [('逐行解析(原)', legacy_parse), ('快速解析', fast_parse)]:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            rows = func(args.file, encoding)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        baseline = baseline or best
+        print(f"{name:<10} {rows:>8} 行  {best * 1000:>9.1f} ms  {rows / best:>10.0f} 行/秒  x{baseline / best:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="交通能源融合系统平台性能基准测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    load = subparsers.add_parser('load', help='并发负载测试')
+    load.add_argument('--url', default='http://127.0.0.1:8000/api/weather/by-station/1')
+    load.add_argument('--body', default=None, help='POST 请求的 JSON 请求体')
+    load.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64])
+    load.add_argument('--requests', type=int, default=200, help='每个并发度发送的请求数')
+    load.set_defaults(func=cmd_load)
+
+    compression = subparsers.add_parser('compression', help='响应压缩对比')
+    compression.add_argument('--url', default='http://127.0.0.1:8000/api/pv-forecast/calculate')
+    compression.add_argument('--body', default=json.dumps({
+        'station_id': 1, 'start_date': '2022-01-01', 'end_date': '2022-12-31 23:00:00',
+        'installed_capacity_kw': 1000
+    }), help='POST 请求的 JSON 请求体（默认为一整年的光伏预测）')
+    compression.add_argument('--encodings', nargs='+', default=['identity', 'gzip', 'br'])
+    compression.add_argument('--requests', type=int, default=20, help='每种编码发送的请求数')
+    compression.add_argument('--vary', default='installed_capacity_kw',
+                             help='每个请求微调的数值字段，避开结果缓存以测量计算路径；'
+                                  '传空字符串则发送相同请求体（测量缓存命中）')
+    compression.set_defaults(func=cmd_compression)
+
+    parse = subparsers.add_parser('parse', help='CSV解析微基准')
+    parse.add_argument('--file', default='../data/北京.csv')
+    parse.add_argument('--repeat', type=int, default=5)
+    parse.set_defaults(func=cmd_parse)
+
+    args = parser.parse_args()
+    if getattr(args, 'body', None) is not None:
+        json.loads(args.body)  # 提前校验请求体
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+按列的二进制响应编码模块
+
+逐小时预测结果以 MessagePack 编码，每一列是一段连续的小端二进制数组，
+不再为每个小时重复字段名，也不需要把浮点数格式化为文本：
+
+    {
+        ...汇总字段...,
+        "columns": {
+            "timestamp": {"dtype": "<M8[s]", "data": <bin>},
+            "hourly_generation_kwh": {"dtype": "<f8", "data": <bin>},
+            "period": {"dtype": "str", "data": ["2022-01", ...]},
+            ...
+        }
+    }
+
+客户端解码后用 numpy.frombuffer(column["data"], dtype=column["dtype"])
+还原数值列；字符串列为普通数组。
+"""
+
+from typing import Dict, List
+
+import msgpack
+import numpy as np
+
+MSGPACK_MEDIA_TYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+MSGPACK_MEDIA_TYPE = MSGPACK_MEDIA_TYPES[0]
+
+
+def media_quality(params: List[str]) -> float:
+    """媒体类型参数中的 q 值（未指定为 1，无法解析时视为 0）"""
+    for param in params:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def accepts_msgpack(accept: str) -> bool:
+    """Accept 请求头中是否包含 MessagePack（忽略 q 值不大于 0 的类型）"""
+    for item in (accept or '').split(','):
+        media_type, *params = [part.strip() for part in item.split(';')]
+        if media_type.lower() in MSGPACK_MEDIA_TYPES and media_quality(params) > 0:
+            return True
+    return False
+
+
+def append_field(body: bytes, name: str, value) -> bytes:
+    """在已编码的文档（顶层为 map）末尾追加一个字段，其余内容不重新编码"""
+    head = body[0]
+    if head & 0xf0 == 0x80:
+        count, offset = head & 0x0f, 1
+    elif head == 0xde:
+        count, offset = int.from_bytes(body[1:3], 'big'), 3
+    elif head == 0xdf:
+        count, offset = int.from_bytes(body[1:5], 'big'), 5
+    else:
+        raise ValueError("顶层不是 MessagePack map")
+    count += 1
+    if count < 16:
+        header = bytes([0x80 | count])
+    elif count < 1 << 16:
+        header = b'\xde' + count.to_bytes(2, 'big')
+    else:
+        header = b'\xdf' + count.to_bytes(4, 'big')
+    return header + body[offset:] + msgpack.packb(name, use_bin_type=True) + msgpack.packb(value, use_bin_type=True)
+
+
+def records_to_columns(records: List[Dict], fields: List[str]) -> Dict[str, object]:
+    """逐行结果转换为列（timestamp 列转换为 datetime64）"""
+    columns = {}
+    for field in fields:
+        values = [record[field] for record in records]
+        if field == 'timestamp':
+            columns[field] = np.array(values, dtype='datetime64[s]')
+        elif values and isinstance(values[0], str):
+            columns[field] = values
+        else:
+            columns[field] = np.asarray(values, dtype=float if field != 'hours' else np.int64)
+    return columns
+
+
+def _encode_column(values) -> Dict:
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'fiuM':
+        values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder('<'))
+        return {'dtype': values.dtype.str, 'data': values.tobytes()}
+    return {'dtype': 'str', 'data': list(values)}
+
+
+def encode_columns(summary: Dict, columns: Dict[str, object]) -> bytes:
+    """汇总字段 + 按列的结果编码为 MessagePack"""
+    return msgpack.packb(
+        {**summary, 'columns': {name: _encode_column(values) for name, values in columns.items()}},
+        use_bin_type=True
+    )
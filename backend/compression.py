@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+响应压缩中间件
+
+按 Accept-Encoding 协商 br（brotli）或 gzip 压缩响应体：
+    - 小于 minimum_size 的完整响应不压缩
+    - 流式响应（NDJSON/CSV 等分块输出）逐块压缩并立即刷新，客户端不必
+      等到整个响应结束才收到数据
+    - 已设置 Content-Encoding 的响应原样发送
+较大的响应体在线程池中压缩（zlib 和 brotli 压缩时释放 GIL），不阻塞事件循环。
+未安装 brotli 时只使用 gzip。
+"""
+
+import zlib
+from typing import Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖
+    brotli = None
+
+# 超过该大小的数据块在线程池中压缩
+THREADPOOL_MIN_BYTES = 256 * 1024
+
+# 已压缩的内容类型，不再压缩
+UNCOMPRESSIBLE_TYPES = ('image/', 'video/', 'audio/', 'application/zip', 'application/gzip')
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        # wbits=31 输出 gzip 格式
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if finish else self._compressor.flush())
+
+
+def available_encodings(preferred: List[str]) -> List[str]:
+    """按优先顺序过滤出当前环境支持的编码"""
+    supported = {'gzip'} | ({'br'} if brotli is not None else set())
+    return [encoding for encoding in preferred if encoding in supported]
+
+
+def negotiate_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """从 Accept-Encoding 中选择编码：q 值最高者优先，q 值相同时按服务端优先顺序"""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, *params = [part.strip() for part in item.split(';')]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        accepted[name.lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """gzip/brotli 响应压缩（支持流式响应）"""
+
+    def __init__(self,
+                 app: ASGIApp,
+                 minimum_size: int = 1024,
+                 gzip_level: int = 6,
+                 brotli_quality: int = 4,
+                 encodings: List[str] = ('br', 'gzip')):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = available_encodings(list(encodings))
+
+    def make_encoder(self, encoding: str):
+        if encoding == 'br':
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self.encodings:
+            encoding = negotiate_encoding(Headers(scope=scope).get("Accept-Encoding", ""), self.encodings)
+            if encoding is not None:
+                responder = _CompressionResponder(self, encoding, send)
+                await self.app(scope, receive, responder.send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.encoder = None
+
+    async def _compress(self, body: bytes, finish: bool) -> bytes:
+        if len(body) >= THREADPOOL_MIN_BYTES:
+            return await run_in_threadpool(self.encoder.compress, body, finish)
+        return self.encoder.compress(body, finish)
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # 等到第一块响应体才能决定是否压缩
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = ("content-encoding" in headers
+                                or content_type.startswith(UNCOMPRESSIBLE_TYPES))
+            return
+        if message_type != "http.response.body":
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if self.passthrough or (not more_body and len(body) < self.middleware.minimum_size):
+                self.passthrough = True
+                await self.downstream(self.initial_message)
+                await self.downstream(message)
+                return
+
+            self.encoder = self.middleware.make_encoder(self.encoding)
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            compressed = await self._compress(body, finish=not more_body)
+            if more_body:
+                # 流式响应：长度未知，使用分块传输
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await self.downstream(self.initial_message)
+            await self.downstream({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        if self.passthrough:
+            await self.downstream(message)
+            return
+        compressed = await self._compress(body, finish=not more_body)
+        await self.downstream({"type": "http.response.body", "body": compressed, "more_body": more_body})
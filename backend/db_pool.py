@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+MySQL连接池模块
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import mysql.connector
+
+
+class PoolTimeoutError(Exception):
+    """等待空闲连接超时"""
+
+
+class PooledConnection:
+    """连接池中借出的连接，close() 时归还连接池而不是断开"""
+
+    def __init__(self, pool: 'ConnectionPool', conn, created_at: float):
+        self._pool = pool
+        self._conn = conn
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise mysql.connector.InterfaceError("连接已归还连接池")
+        return getattr(self._conn, name)
+
+    def close(self):
+        """归还连接"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool._release(conn, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """带溢出连接、等待超时和使用统计的连接池
+
+    常驻 pool_size 个连接；繁忙时最多再临时创建 max_overflow 个连接，
+    归还时空闲连接已满 pool_size 则直接断开；连接全部借出时最多等待 timeout 秒。
+    """
+
+    def __init__(self,
+                 db_config: Dict,
+                 pool_size: int = 5,
+                 max_overflow: int = 10,
+                 timeout: float = 30.0,
+                 recycle: int = 3600,
+                 ping_after: float = 30.0):
+        self.db_config = dict(db_config)
+        self.pool_size = max(1, pool_size)
+        self.max_overflow = max(0, max_overflow)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+
+        # 空闲连接: (conn, created_at, last_used)，后进先出以便闲置连接自然老化
+        # 归还连接或断开连接（空出连接数）时通知等待者
+        self._idle: List[Tuple] = []
+        self._lock = threading.Condition()
+        self._open = 0
+        self._checked_out = 0
+
+        self._checkouts = 0
+        self._connects = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def _connect(self):
+        conn = mysql.connector.connect(**self.db_config)
+        with self._lock:
+            self._connects += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._open -= 1
+            self._lock.notify()
+
+    def _is_usable(self, conn, created_at: float, last_used: float) -> bool:
+        now = time.monotonic()
+        if self.recycle and now - created_at > self.recycle:
+            return False
+        if now - last_used > self.ping_after:
+            try:
+                return conn.is_connected()
+            except Exception:
+                return False
+        return True
+
+    def prefill(self):
+        """预先建立 pool_size 个连接"""
+        while True:
+            with self._lock:
+                if self._open >= self.pool_size:
+                    return
+                self._open += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self._open -= 1
+                    self._lock.notify()
+                raise
+            now = time.monotonic()
+            with self._lock:
+                self._idle.append((conn, now, now))
+                self._lock.notify()
+
+    def get_connection(self) -> PooledConnection:
+        """借出一个连接，连接全部借出时等待其他请求归还"""
+        start = time.monotonic()
+        waited = False
+        while True:
+            idle: Optional[Tuple] = None
+            with self._lock:
+                while True:
+                    if self._idle:
+                        idle = self._idle.pop()
+                        break
+                    if self._open < self.pool_size + self.max_overflow:
+                        self._open += 1
+                        break
+                    remaining = self.timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(f"等待数据库连接超过 {self.timeout} 秒")
+                    waited = True
+                    self._lock.wait(remaining)
+
+            if idle is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                        self._lock.notify()
+                    raise
+                created_at = time.monotonic()
+                break
+
+            conn, created_at, last_used = idle
+            if self._is_usable(conn, created_at, last_used):
+                break
+            self._discard(conn)
+
+        wait_time = time.monotonic() - start
+        with self._lock:
+            self._checked_out += 1
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._wait_time_total += wait_time
+                self._wait_time_max = max(self._wait_time_max, wait_time)
+        return PooledConnection(self, conn, created_at)
+
+    def _release(self, conn, created_at: float):
+        with self._lock:
+            self._checked_out -= 1
+            keep = len(self._idle) < self.pool_size
+        if keep:
+            try:
+                # 结束未提交的事务，避免下一个使用者读到旧快照
+                conn.rollback()
+            except Exception:
+                keep = False
+        if keep:
+            with self._lock:
+                self._idle.append((conn, created_at, time.monotonic()))
+                self._lock.notify()
+        else:
+            self._discard(conn)
+
+    def close_all(self):
+        """断开所有空闲连接"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return
+                conn, _, _ = self._idle.pop()
+            self._discard(conn)
+
+    def stats(self) -> Dict:
+        """连接池使用统计"""
+        with self._lock:
+            return {
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'timeout_s': self.timeout,
+                'open': self._open,
+                'idle': len(self._idle),
+                'checked_out': self._checked_out,
+                'overflow': max(0, self._open - self.pool_size),
+                'checkouts': self._checkouts,
+                'connects': self._connects,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'wait_time_total_ms': round(self._wait_time_total * 1000, 3),
+                'wait_time_max_ms': round(self._wait_time_max * 1000, 3),
+                'avg_wait_ms': round(self._wait_time_total * 1000 / self._waits, 3) if self._waits else 0.0,
+            }
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+时间序列聚合与降采样模块
+
+预测计算始终在小时分辨率上进行，返回给前端之前再按需缩减点数：
+    - 按日/按月聚合：按时间戳所在的日、月分组求和、均值或最大值
+    - 降采样到不超过 max_points 个点，保留曲线形状：
+        lttb    Largest-Triangle-Three-Buckets，每个桶选与相邻桶构成最大三角形的点
+        minmax  每个桶保留最小值和最大值所在的点（峰谷不丢失）
+降采样只返回被选中点的下标，调用方用下标从原始列中取值，数值本身不做插值。
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+RESOLUTIONS = ('hourly', 'daily', 'monthly')
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+# 各分辨率对应的 datetime64 单位
+_PERIOD_UNITS = {'daily': 'D', 'monthly': 'M'}
+
+
+def period_starts(ts: np.ndarray, resolution: str) -> np.ndarray:
+    """按时间排序的序列中每个日/月第一个小时的下标"""
+    if not len(ts):
+        return np.zeros(0, dtype=np.int64)
+    periods = ts.astype(f'datetime64[{_PERIOD_UNITS[resolution]}]')
+    return np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+
+
+def period_labels(ts: np.ndarray, starts: np.ndarray, resolution: str) -> List[str]:
+    """周期标签 'YYYY-MM-DD' 或 'YYYY-MM'（与汇总接口的 period 一致）"""
+    return np.datetime_as_string(ts[starts].astype(f'datetime64[{_PERIOD_UNITS[resolution]}]')).tolist()
+
+
+def aggregate_periods(values: np.ndarray, starts: np.ndarray, how: str) -> np.ndarray:
+    """按周期聚合：how 为 sum、mean、max 或 count"""
+    values = np.asarray(values, dtype=float)
+    if not len(starts):
+        return np.zeros(0)
+    if how == 'max':
+        return np.maximum.reduceat(values, starts)
+    counts = np.diff(np.r_[starts, len(values)])
+    if how == 'count':
+        return counts
+    sums = np.add.reduceat(values, starts)
+    return sums / counts if how == 'mean' else sums
+
+
+def _bucket_edges(start: int, stop: int, buckets: int) -> np.ndarray:
+    return np.linspace(start, stop, buckets + 1).astype(np.int64)
+
+
+def lttb_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """LTTB 降采样，返回保留点的下标（包含首尾两点）
+
+    横坐标取下标：小时序列等间隔，周期序列按顺序排列。
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n) if n <= max_points else np.array([0, n - 1])
+
+    # 中间 n-2 个点分成 max_points-2 个桶，首尾两点固定保留
+    edges = _bucket_edges(1, n - 1, max_points - 2)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = (next_lo + next_hi - 1) / 2.0
+        avg_y = y[next_lo:next_hi].mean()
+        xs = np.arange(lo, hi)
+        area = np.abs((a - avg_x) * (y[lo:hi] - y[a]) - (a - xs) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """每个桶保留最小值和最大值所在的点，返回按时间排序的下标"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    edges = _bucket_edges(0, n, max(1, max_points // 2))
+    selected = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            segment = y[lo:hi]
+            selected.append(lo + int(np.argmin(segment)))
+            selected.append(lo + int(np.argmax(segment)))
+    return np.unique(selected)
+
+
+def downsample_indices(y: np.ndarray, max_points: int, method: str = 'lttb') -> np.ndarray:
+    """按指定方法降采样，返回保留点的下标"""
+    if method == 'minmax':
+        return minmax_indices(y, max_points)
+    return lttb_indices(y, max_points)
+
+
+def reduce_series(ts: np.ndarray,
+                  columns: Dict[str, Tuple[np.ndarray, str]],
+                  resolution: str) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """把小时序列按日/月聚合
+
+    columns 为 {输出列名: (小时数组, 聚合方式)}，返回 (周期标签, {列名: 聚合结果})。
+    """
+    starts = period_starts(ts, resolution)
+    return period_labels(ts, starts, resolution), {
+        name: aggregate_periods(values, starts, how) for name, (values, how) in columns.items()
+    }
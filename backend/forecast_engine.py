@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+批量预测计算模块
+
+多站点（场群）预测在进程池中并行计算：同一省份的气象数组只传给工作进程一次，
+在其中依次计算该省份下各站点的光伏或风电发电量。模块只依赖计算器和 NumPy，
+工作进程不需要数据库连接。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pv_calculator import PVCalculator
+from wind_calculator import WindCalculator
+
+pv_calculator = PVCalculator()
+wind_calculator = WindCalculator()
+
+
+def pv_site_generation(solar_radiation, temperature, site: Dict) -> np.ndarray:
+    """光伏站点的小时发电量（与单站点接口相同，保留4位小数）"""
+    columns = pv_calculator.calculate_hourly_generation_columns(
+        timestamps=None,
+        solar_radiation=solar_radiation,
+        temperature=temperature,
+        installed_capacity=site['installed_capacity_kw'],
+        params={
+            'panel_efficiency': site['panel_efficiency'],
+            'inverter_efficiency': site['inverter_efficiency'],
+            'temperature_coefficient': site['temperature_coefficient'],
+            'degradation_rate': site['degradation_rate'],
+        }
+    )
+    return columns['hourly_generation_kwh']
+
+
+def wind_site_generation(wind_speed, site: Dict) -> np.ndarray:
+    """风电站点的小时发电量（与单站点接口相同，保留4位小数）"""
+    _, generation = wind_calculator.hourly_generation_array(
+        wind_speed,
+        hub_height_m=site['tower_height_m'],
+        rated_capacity_kw=site['rated_capacity_kw'],
+        cut_in_ms=site['cut_in_wind_speed_ms'],
+        rated_ms=site['rated_wind_speed_ms'],
+        cut_out_ms=site['cut_out_wind_speed_ms'],
+        num_turbines=site['num_turbines'],
+    )
+    return np.round(generation, 4)
+
+
+def site_capacity_kw(kind: str, site: Dict) -> float:
+    """站点装机容量（风电为单机容量乘以台数）"""
+    if kind == 'pv':
+        return float(site['installed_capacity_kw'])
+    return float(site['rated_capacity_kw']) * max(1, int(site['num_turbines'] or 1))
+
+
+def summarize_generation(kind: str, generation: np.ndarray, capacity_kw: float) -> Dict:
+    """小时发电量序列的统计信息
+
+    合计方式与单站点接口相同（光伏用 calculate_statistics_columns，风电用 summarize_array
+    逐小时保留4位小数后按顺序累加），同一站点在两个接口中的发电量一致。
+    """
+    data_points = len(generation)
+    if not data_points:
+        return {'total_generation_kwh': 0.0, 'average_daily_generation_kwh': 0.0,
+                'avg_hourly_generation_kwh': 0.0, 'peak_generation_kwh': 0.0,
+                'capacity_factor': 0.0, 'data_points': 0}
+    if kind == 'pv':
+        stats = pv_calculator.calculate_statistics_columns({'hourly_generation_kwh': generation})
+    else:
+        stats = wind_calculator.summarize_array(generation)
+        stats['average_daily_generation_kwh'] = round(stats['total_generation_kwh'] / data_points * 24, 4)
+    total = stats['total_generation_kwh']
+    return {
+        'total_generation_kwh': total,
+        'average_daily_generation_kwh': stats['average_daily_generation_kwh'],
+        'avg_hourly_generation_kwh': stats['avg_hourly_generation_kwh'],
+        'peak_generation_kwh': round(float(generation.max()), 4),
+        'capacity_factor': round(pv_calculator.calculate_capacity_factor(total, capacity_kw, data_points), 4),
+        'data_points': data_points,
+    }
+
+
+def evaluate_sites(weather: Dict[str, np.ndarray],
+                   sites: List[Tuple[int, str, Dict]],
+                   keep_hourly: bool = False) -> List[Tuple[int, Dict, Optional[np.ndarray]]]:
+    """计算同一段气象序列下的多个站点
+
+    weather 包含 surface_radiation_wm2、temp_c、wind_speed_ms 三个数组；
+    sites 为 [(序号, 'pv' 或 'wind', 参数)]。返回 [(序号, 统计信息, 小时发电量或None)]。
+    """
+    solar_radiation, temperature = pv_calculator.fill_missing_weather(
+        weather['surface_radiation_wm2'], weather['temp_c']
+    )
+    results = []
+    for index, kind, site in sites:
+        if kind == 'pv':
+            generation = pv_site_generation(solar_radiation, temperature, site)
+        else:
+            generation = wind_site_generation(weather['wind_speed_ms'], site)
+        summary = summarize_generation(kind, generation, site_capacity_kw(kind, site))
+        results.append((index, summary, generation if keep_hourly else None))
+    return results
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+预测结果存储模块
+
+请求中指定 persist=true 时，计算得到的预测结果批量写入结果表，以预测参数的
+哈希区分同一站点的不同参数：
+    pv_forecast_result    光伏小时结果
+    wind_forecast_result  风电小时结果
+    pv_yearly_forecast    光伏多年预测
+forecast_result_run 记录每次保存的参数哈希、时间范围和所用气象数据的版本。
+之后参数相同、时间范围被某次保存覆盖且气象数据未变化的请求直接读取结果表。
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 每批写入的行数（executemany 会合并为多行 INSERT）
+BATCH_SIZE = 2000
+
+# 小时结果表及其数值列（与逐小时结果的字段同名）
+HOURLY_TABLES = {
+    'pv': ('pv_forecast_result',
+           ('solar_radiation_wm2', 'temperature_c', 'hourly_generation_kwh', 'efficiency_factor')),
+    'wind': ('wind_forecast_result',
+             ('wind_speed_10m_ms', 'wind_speed_hub_ms', 'hourly_generation_kwh')),
+}
+
+YEARLY_COLUMNS = ('total_generation_kwh', 'degradation_factor', 'average_daily_generation_kwh', 'capacity_factor')
+
+FIND_RUN_SQL = """
+SELECT start_time, end_time, data_points, summary
+FROM forecast_result_run
+WHERE kind = %s AND station_id = %s AND config_hash = %s
+AND start_time <= %s AND end_time >= %s AND weather_version = %s
+ORDER BY updated_at DESC
+LIMIT 1
+"""
+
+SAVE_RUN_SQL = """
+INSERT INTO forecast_result_run
+(kind, station_id, config_hash, start_time, end_time, data_points, weather_version, summary)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+data_points = VALUES(data_points),
+weather_version = VALUES(weather_version),
+summary = VALUES(summary)
+"""
+
+LOAD_YEARLY_SQL = """
+SELECT forecast_year, {columns}
+FROM pv_yearly_forecast
+WHERE station_id = %s AND config_hash = %s AND forecast_year BETWEEN %s AND %s
+ORDER BY forecast_year
+""".format(columns=', '.join(YEARLY_COLUMNS))
+
+SAVE_YEARLY_SQL = """
+INSERT INTO pv_yearly_forecast (station_id, config_hash, forecast_year, {columns})
+VALUES (%s, %s, %s, {placeholders})
+ON DUPLICATE KEY UPDATE {updates}
+""".format(
+    columns=', '.join(YEARLY_COLUMNS),
+    placeholders=', '.join(['%s'] * len(YEARLY_COLUMNS)),
+    updates=', '.join(f"{name} = VALUES({name})" for name in YEARLY_COLUMNS)
+)
+
+
+def config_hash(kind: str, config: Dict) -> str:
+    """预测参数的哈希（键按字母排序，与字段顺序无关）"""
+    normalized = json.dumps({'kind': kind, 'config': config}, sort_keys=True, default=str)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]
+
+
+def weather_version_tag(version) -> str:
+    """气象数据版本（导入检查点）的短哈希"""
+    return hashlib.sha256(repr(version).encode('utf-8')).hexdigest()[:16]
+
+
+def _hourly_sql(kind: str) -> Tuple[str, str]:
+    table, columns = HOURLY_TABLES[kind]
+    select_sql = f"""
+    SELECT forecast_time, {', '.join(columns)}
+    FROM {table}
+    WHERE station_id = %s AND config_hash = %s AND forecast_time BETWEEN %s AND %s
+    ORDER BY forecast_time
+    """
+    insert_sql = f"""
+    INSERT INTO {table} (station_id, config_hash, forecast_time, {', '.join(columns)})
+    VALUES (%s, %s, %s, {', '.join(['%s'] * len(columns))})
+    ON DUPLICATE KEY UPDATE {', '.join(f"{name} = VALUES({name})" for name in columns)}
+    """
+    return select_sql, insert_sql
+
+
+def find_run(cursor, kind: str, station_id: int, config_hash: str,
+             start: datetime, end: datetime, weather_version: str) -> Optional[Dict]:
+    """覆盖 [start, end] 且气象数据版本一致的最近一次保存（cursor 需为 dictionary=True）"""
+    cursor.execute(FIND_RUN_SQL, (kind, station_id, config_hash, start, end, weather_version))
+    return cursor.fetchone()
+
+
+def load_hourly(cursor, kind: str, station_id: int, config_hash: str,
+                start: datetime, end: datetime) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """读取 [start, end] 内的小时结果，返回 (时间戳数组, {列名: 数组})"""
+    select_sql, _ = _hourly_sql(kind)
+    cursor.execute(select_sql, (station_id, config_hash, start, end))
+    rows = cursor.fetchall()
+    _, columns = HOURLY_TABLES[kind]
+    ts = np.array([row['forecast_time'] for row in rows], dtype='datetime64[s]')
+    return ts, {
+        name: np.fromiter((np.nan if row[name] is None else float(row[name]) for row in rows),
+                          dtype=float, count=len(rows))
+        for name in columns
+    }
+
+
+def save_hourly(conn, kind: str, station_id: int, config_hash: str,
+                start: datetime, end: datetime, weather_version: str,
+                ts: np.ndarray, columns: Dict[str, np.ndarray],
+                batch_size: int = BATCH_SIZE) -> int:
+    """分批写入小时结果并记录本次保存，全部写入后一次提交"""
+    _, insert_sql = _hourly_sql(kind)
+    _, names = HOURLY_TABLES[kind]
+    # 标量列（如光伏效率因子）按行展开
+    values = [np.broadcast_to(np.asarray(columns[name], dtype=float), ts.shape).tolist() for name in names]
+    rows = [
+        (station_id, config_hash, timestamp, *(None if v != v else v for v in row))
+        for timestamp, *row in zip(ts.astype('datetime64[s]').tolist(), *values)
+    ]
+    cursor = conn.cursor()
+    try:
+        for lo in range(0, len(rows), batch_size):
+            cursor.executemany(insert_sql, rows[lo:lo + batch_size])
+        cursor.execute(SAVE_RUN_SQL, (kind, station_id, config_hash, start, end,
+                                      len(rows), weather_version, None))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def purge_runs(conn, station_ids: Optional[List[int]] = None) -> int:
+    """删除保存记录（station_ids 为空时删除全部），返回删除的记录数
+
+    结果行保留在结果表中，但没有保存记录的结果不会再被读取，下次保存时覆盖。
+    """
+    if station_ids is not None and not station_ids:
+        return 0
+    cursor = conn.cursor()
+    try:
+        if station_ids is None:
+            cursor.execute("DELETE FROM forecast_result_run")
+        else:
+            placeholders = ', '.join(['%s'] * len(station_ids))
+            cursor.execute(f"DELETE FROM forecast_result_run WHERE station_id IN ({placeholders})",
+                           tuple(station_ids))
+        conn.commit()
+        return cursor.rowcount
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def load_yearly(cursor, station_id: int, config_hash: str, first_year: int, last_year: int) -> List[Dict]:
+    """读取多年预测结果（与 calculate_yearly_forecast 的返回格式相同）"""
+    cursor.execute(LOAD_YEARLY_SQL, (station_id, config_hash, first_year, last_year))
+    return [
+        {'year': int(row['forecast_year']), **{name: float(row[name]) for name in YEARLY_COLUMNS}}
+        for row in cursor.fetchall()
+    ]
+
+
+def save_yearly(conn, station_id: int, config_hash: str, weather_version: str,
+                forecasts: List[Dict], summary: Dict) -> int:
+    """写入多年预测结果，连同汇总信息一起记录本次保存"""
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(SAVE_YEARLY_SQL, [
+            (station_id, config_hash, item['year'], *(item[name] for name in YEARLY_COLUMNS))
+            for item in forecasts
+        ])
+        cursor.execute(SAVE_RUN_SQL, (
+            'pv_yearly', station_id, config_hash,
+            datetime(forecasts[0]['year'], 1, 1), datetime(forecasts[-1]['year'], 1, 1),
+            len(forecasts), weather_version, json.dumps(summary, ensure_ascii=False)
+        ))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return len(forecasts)
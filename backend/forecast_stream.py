@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+预测结果流式输出模块
+
+逐小时预测结果按块生成并编码为 NDJSON 或 CSV，边生成边发送，最后输出一条
+汇总记录（trailer）。服务端不需要在内存中保存完整的逐行结果列表和 JSON 文档，
+客户端收到第一块数据即可开始处理。
+
+    NDJSON: 每行一个 JSON 对象，最后一行为 {"summary": {...}}
+    CSV:    表头 + 数据行，最后是以 "#" 开头的汇总行 "# 字段,值"
+"""
+
+import csv
+import io
+import json
+from typing import Callable, Dict, Iterable, Iterator, List
+
+# 每块的小时数
+STREAM_CHUNK_ROWS = 2000
+
+STREAM_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _dumps(obj) -> str:
+    # 与 JSONResponse 的编码参数一致
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def iter_record_chunks(length: int,
+                       to_records: Callable[[int, int], List[Dict]],
+                       chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[List[Dict]]:
+    """把 [0, length) 分块，依次调用 to_records(lo, hi) 生成逐行结果"""
+    for lo in range(0, length, chunk_rows):
+        yield to_records(lo, min(lo + chunk_rows, length))
+
+
+def encode_ndjson(chunks: Iterable[List[Dict]], summary: Dict) -> Iterator[bytes]:
+    """逐块编码为 NDJSON，最后输出汇总记录"""
+    for records in chunks:
+        yield ''.join(_dumps(record) + '\n' for record in records).encode('utf-8')
+    yield (_dumps({'summary': summary}) + '\n').encode('utf-8')
+
+
+def encode_csv(chunks: Iterable[List[Dict]], fields: List[str], summary: Dict) -> Iterator[bytes]:
+    """逐块编码为 CSV，最后输出以 "#" 开头的汇总行"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(fields)
+    for records in chunks:
+        writer.writerows([record[field] for field in fields] for record in records)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    for key, value in summary.items():
+        buffer.write(f"# {key},{value}\n")
+    yield buffer.getvalue().encode('utf-8')
+
+
+def encode_stream(output_format: str,
+                  chunks: Iterable[List[Dict]],
+                  fields: List[str],
+                  summary: Dict) -> Iterator[bytes]:
+    """按输出格式选择编码方式"""
+    if output_format == 'csv':
+        return encode_csv(chunks, fields, summary)
+    return encode_ndjson(chunks, summary)
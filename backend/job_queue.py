@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+后台预测任务队列模块
+
+耗时较长的多年、多站点预测以任务方式提交，接口立即返回任务编号，计算在后台执行：
+    - 等待中的任务按优先级（数值越大越先执行）和提交顺序排队，队列长度有上限
+    - 同时执行的任务数有上限，每个任务的计算再分块交给进程池
+    - 执行过程中记录进度，客户端可以轮询状态或订阅状态变化
+    - 结束的任务保留一段时间供获取结果，超时或超过保留数量后清除
+队列保存在服务进程内存中，不依赖外部消息中间件；服务重启后未完成的任务丢失。
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+JOB_STATES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+FINISHED_STATES = ('succeeded', 'failed', 'cancelled')
+
+
+class JobQueueFull(Exception):
+    """等待中的任务数已达上限"""
+
+
+class Job:
+    """一个后台任务的状态、进度和结果"""
+
+    def __init__(self, job_id: str, kind: str, params: Any, priority: int):
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.priority = priority
+        self.state = 'queued'
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._sequence = 0
+        self._task: Optional[asyncio.Task] = None
+        self._cancel_requested = False
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def _notify(self):
+        # 唤醒当前等待者，之后的等待者使用新的事件
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def set_state(self, state: str):
+        self.state = state
+        if state == 'running':
+            self.started_at = time.time()
+        elif state in FINISHED_STATES:
+            self.finished_at = time.time()
+        self._notify()
+
+    def set_progress(self, done: int, total: int):
+        """更新进度（已完成块数 / 总块数）"""
+        self.done, self.total = done, total
+        self._notify()
+
+    def snapshot(self) -> Dict:
+        percent = 100.0 if self.state == 'succeeded' else (
+            round(self.done * 100.0 / self.total, 1) if self.total else 0.0
+        )
+        return {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'priority': self.priority,
+            'state': self.state,
+            'progress': {'done': self.done, 'total': self.total, 'percent': percent},
+            'error': self.error,
+            'created_at': _isoformat(self.created_at),
+            'started_at': _isoformat(self.started_at),
+            'finished_at': _isoformat(self.finished_at),
+        }
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(timestamp))
+
+
+class JobQueue:
+    """进程内的优先级任务队列
+
+    runner(job) 是执行任务的协程，返回值保存为任务结果；抛出的异常记为任务失败。
+    start() 启动 concurrency 个调度协程，每个协程每次执行一个任务。
+    """
+
+    def __init__(self,
+                 runner: Callable[[Job], Awaitable[Any]],
+                 concurrency: int = 2,
+                 max_queued: int = 100,
+                 result_ttl: float = 3600,
+                 max_finished: int = 200):
+        self.runner = runner
+        self.concurrency = max(1, concurrency)
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Job] = {}
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+        self._available = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._submitted = 0
+        self._completed = {state: 0 for state in FINISHED_STATES}
+
+    def start(self):
+        """启动调度协程（需在事件循环中调用）"""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """停止调度并取消执行中的任务"""
+        for job in self._jobs.values():
+            if job._task is not None and not job._task.done():
+                job._task.cancel()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, kind: str, params: Any, priority: int = 0) -> Job:
+        """提交任务，返回任务对象；等待中的任务已满时抛出 JobQueueFull"""
+        self._purge()
+        if self.queued_count() >= self.max_queued:
+            raise JobQueueFull(f"等待中的任务已达上限 {self.max_queued}")
+        job = Job(uuid.uuid4().hex, kind, params, priority)
+        job._sequence = next(self._sequence)
+        self._jobs[job.job_id] = job
+        heapq.heappush(self._heap, (-priority, job._sequence, job))
+        self._submitted += 1
+        self._available.set()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    def list(self, state: Optional[str] = None) -> List[Job]:
+        """按提交时间倒序列出任务"""
+        self._purge()
+        jobs = [job for job in self._jobs.values() if state is None or job.state == state]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """取消等待中或执行中的任务（已分派到进程池的计算块会执行完，但结果被丢弃）"""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job._task is not None:
+            job._cancel_requested = True
+            job._task.cancel()
+        else:
+            # 等待中的任务留在堆中，出队时跳过
+            self._finish(job, 'cancelled')
+        return job
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """等待中的任务前面还有几个任务"""
+        if job.state != 'queued':
+            return None
+        key = (-job.priority, job._sequence)
+        return sum(1 for priority, sequence, other in self._heap
+                   if other.state == 'queued' and (priority, sequence) < key)
+
+    def queued_count(self) -> int:
+        return sum(1 for _, _, job in self._heap if job.state == 'queued')
+
+    def stats(self) -> Dict:
+        running = sum(1 for job in self._jobs.values() if job.state == 'running')
+        return {
+            'concurrency': self.concurrency,
+            'queued': self.queued_count(),
+            'running': running,
+            'retained': len(self._jobs),
+            'submitted': self._submitted,
+            **self._completed,
+        }
+
+    async def watch(self, job: Job, heartbeat: float = 15.0) -> AsyncIterator[Dict]:
+        """依次产生任务状态快照：状态或进度变化时产生一次，
+        超过 heartbeat 秒没有变化时重复上一次状态，任务结束后停止"""
+        while True:
+            changed = job._changed
+            yield job.snapshot()
+            if job.finished:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                pass
+
+    def _finish(self, job: Job, state: str):
+        job._task = None
+        self._completed[state] += 1
+        job.set_state(state)
+
+    def _purge(self):
+        """清除超过保留时间或超过保留数量的已结束任务"""
+        now = time.time()
+        finished = sorted((job for job in self._jobs.values() if job.finished),
+                          key=lambda job: job.finished_at)
+        excess = len(finished) - self.max_finished
+        for index, job in enumerate(finished):
+            if index < excess or now - job.finished_at > self.result_ttl:
+                del self._jobs[job.job_id]
+        # 堆中已取消的等待任务
+        if len(self._heap) > 2 * self.queued_count() + 16:
+            self._heap = [item for item in self._heap if item[2].state == 'queued']
+            heapq.heapify(self._heap)
+
+    async def _next_job(self) -> Job:
+        while True:
+            while self._heap:
+                _, _, job = heapq.heappop(self._heap)
+                if job.state == 'queued':
+                    return job
+            self._available.clear()
+            await self._available.wait()
+
+    async def _worker(self):
+        while True:
+            job = await self._next_job()
+            job._task = asyncio.create_task(self.runner(job))
+            job.set_state('running')
+            try:
+                job.result = await job._task
+            except asyncio.CancelledError:
+                self._finish(job, 'cancelled')
+                if not job._cancel_requested:
+                    # 调度协程本身被取消（服务关闭）
+                    raise
+            except Exception as e:
+                job.error = getattr(e, 'detail', None) or str(e) or type(e).__name__
+                self._finish(job, 'failed')
+            else:
+                self._finish(job, 'succeeded')
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+站点与省份元数据注册表
+
+站点（含所属省份名称）和省份的对应关系几乎不变，启动时一次加载到内存，
+各接口查询站点、省份时直接读取快照，不再每次执行 station LEFT JOIN province：
+    - 快照包含站点信息、省份ID与名称的双向对应，以及站点空间与名称索引
+    - 超过检查间隔后比对站点表和省份表的版本（行数、最大ID、最近更新时间），
+      变化后整体重新加载
+    - 查询的站点不在快照中时只重新读取这些站点（导入工具刚创建的站点无需
+      等到下一次版本检查）；重新读取后仍不存在的站点记为缺失，版本变化前
+      不再查询数据库
+快照构建后只读，刷新时整体替换，读取不需要加锁。
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from station_index import StationIndex
+
+
+class MetadataSnapshot:
+    """某一版本的站点与省份元数据（只读）"""
+
+    def __init__(self, stations: List[Dict], provinces: List[Dict], version=None, cell_deg: float = 1.0):
+        self.version = version
+        self.loaded_at = time.time()
+        self.stations: Dict[int, Dict] = {
+            row['id']: {
+                'id': row['id'],
+                'name': row['name'],
+                'province': row['province'],
+                'province_id': row['province_id'],
+                'province_name': row['province_name'],
+                'lng': float(row['lng']),
+                'lat': float(row['lat']),
+            }
+            for row in stations
+        }
+        self.province_names: Dict[int, str] = {row['id']: row['name'] for row in provinces}
+        self.province_ids: Dict[str, int] = {row['name']: row['id'] for row in provinces}
+        self.index = StationIndex(list(self.stations.values()), version=version, cell_deg=cell_deg)
+
+    def station(self, station_id: int) -> Optional[Dict]:
+        return self.stations.get(station_id)
+
+    def with_stations(self, station_ids: List[int], rows: List[Dict]) -> 'MetadataSnapshot':
+        """用重新读取的站点行替换 station_ids 后的新快照（已删除的站点移除），版本不变"""
+        stations = {station_id: station for station_id, station in self.stations.items()
+                    if station_id not in station_ids}
+        stations.update({row['id']: row for row in rows})
+        provinces = [{'id': province_id, 'name': name} for province_id, name in self.province_names.items()]
+        return MetadataSnapshot(list(stations.values()), provinces, self.version, self.index.cell_deg)
+
+
+class MetadataRegistry:
+    """持有当前元数据快照，定期检查版本，变化后重新加载
+
+    stations_loader(station_ids=None) 返回站点行（指定 station_ids 时只返回这些站点），
+    provinces_loader() 返回省份行，version_loader() 返回站点表和省份表的版本；
+    三者都是阻塞的数据库访问，get()、load_stations() 应在数据库线程池中调用。
+    """
+
+    def __init__(self,
+                 stations_loader: Callable[[Optional[List[int]]], List[Dict]],
+                 provinces_loader: Callable[[], List[Dict]],
+                 version_loader: Callable[[], object],
+                 check_interval: float = 10.0,
+                 cell_deg: float = 1.0,
+                 max_missing: int = 10000):
+        self.stations_loader = stations_loader
+        self.provinces_loader = provinces_loader
+        self.version_loader = version_loader
+        self.check_interval = check_interval
+        self.cell_deg = cell_deg
+        self.max_missing = max_missing
+
+        self._lock = threading.Lock()
+        self._snapshot: Optional[MetadataSnapshot] = None
+        # 确认不存在的站点ID，只对当前版本有效，重新加载时清空
+        self._missing: Set[int] = set()
+        self._checked_at: Optional[float] = None
+        self._checks = 0
+        self._loads = 0
+        self._station_reloads = 0
+        self._missing_hits = 0
+        self._load_time = 0.0
+
+    def peek(self) -> Optional[MetadataSnapshot]:
+        """检查间隔内的当前快照，不访问数据库；需要检查版本时返回 None"""
+        snapshot, checked_at = self._snapshot, self._checked_at
+        if snapshot is None or checked_at is None or time.monotonic() - checked_at >= self.check_interval:
+            return None
+        return snapshot
+
+    def get(self) -> MetadataSnapshot:
+        """返回当前快照，超过检查间隔时比对版本，变化后重新加载"""
+        snapshot = self.peek()
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            snapshot = self.peek()
+            if snapshot is not None:
+                return snapshot
+            version = self.version_loader()
+            self._checks += 1
+            if self._snapshot is None or self._snapshot.version != version:
+                start = time.perf_counter()
+                self._snapshot = MetadataSnapshot(
+                    self.stations_loader(None), self.provinces_loader(), version, self.cell_deg
+                )
+                self._missing = set()
+                self._load_time += time.perf_counter() - start
+                self._loads += 1
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def unresolved(self, snapshot: MetadataSnapshot, station_ids: Iterable[int]) -> List[int]:
+        """快照中没有、也未确认不存在的站点（需要重新读取）"""
+        missing = self._missing
+        unresolved, known = [], 0
+        for station_id in station_ids:
+            if snapshot.station(station_id) is None:
+                if station_id in missing:
+                    known += 1
+                else:
+                    unresolved.append(station_id)
+        if known:
+            with self._lock:
+                self._missing_hits += known
+        return unresolved
+
+    def load_stations(self, station_ids: Iterable[int]) -> MetadataSnapshot:
+        """重新读取指定站点并加入快照（快照中没有的站点可能是刚创建的）
+
+        已确认不存在的站点不再读取；读取后仍不存在的站点记为缺失，直到版本变化。
+        """
+        snapshot = self.get()
+        station_ids = sorted(set(station_ids) - self._missing)
+        rows = self.stations_loader(station_ids) if station_ids else []
+        with self._lock:
+            self._station_reloads += 1
+            current = self._snapshot or snapshot
+            if current.version == snapshot.version:
+                found = {row['id'] for row in rows}
+                if len(self._missing) >= self.max_missing:
+                    self._missing = set()
+                self._missing.update(station_id for station_id in station_ids if station_id not in found)
+            if rows or any(current.station(station_id) is not None for station_id in station_ids):
+                current = self._snapshot = current.with_stations(station_ids, rows)
+            return current
+
+    def reload(self) -> MetadataSnapshot:
+        """立即重新加载全部元数据（不比对版本）"""
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = None
+            self._missing = set()
+        return self.get()
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        index = snapshot.index if snapshot is not None else None
+        return {
+            'stations': len(snapshot.stations) if snapshot is not None else 0,
+            'provinces': len(snapshot.province_names) if snapshot is not None else 0,
+            'grid_cells': len(index._cells) if index is not None else 0,
+            'search_grams': len(index._grams) if index is not None else 0,
+            'cell_deg': self.cell_deg,
+            'check_interval_s': self.check_interval,
+            'checks': self._checks,
+            'loads': self._loads,
+            'station_reloads': self._station_reloads,
+            'missing_cached': len(self._missing),
+            'missing_hits': self._missing_hits,
+            'avg_load_ms': round(self._load_time / self._loads * 1000, 3) if self._loads else 0.0,
+        }
@@ -0,0 +1,79 @@
+-- 已有数据库升级：支持幂等的增量导入
+-- 1. 删除重复导入产生的 (province_id, ts) 重复行，保留最早的一行
+-- 2. 为每个天气观测表添加 (province_id, ts) 唯一键
+-- 3. 创建导入检查点表
+USE energy_platform;
+
+-- weather_observation_beijing
+DELETE t1 FROM weather_observation_beijing t1
+JOIN weather_observation_beijing t2
+  ON t1.province_id = t2.province_id AND t1.ts = t2.ts AND t1.id > t2.id;
+ALTER TABLE weather_observation_beijing
+  ADD UNIQUE KEY uk_weather_beijing_province_ts (province_id, ts);
+
+-- weather_observation_shanghai
+DELETE t1 FROM weather_observation_shanghai t1
+JOIN weather_observation_shanghai t2
+  ON t1.province_id = t2.province_id AND t1.ts = t2.ts AND t1.id > t2.id;
+ALTER TABLE weather_observation_shanghai
+  ADD UNIQUE KEY uk_weather_shanghai_province_ts (province_id, ts);
+
+-- weather_observation_tianjin
+DELETE t1 FROM weather_observation_tianjin t1
+JOIN weather_observation_tianjin t2
+  ON t1.province_id = t2.province_id AND t1.ts = t2.ts AND t1.id > t2.id;
+ALTER TABLE weather_observation_tianjin
+  ADD UNIQUE KEY uk_weather_tianjin_province_ts (province_id, ts);
+
+-- weather_observation_hebei
+DELETE t1 FROM weather_observation_hebei t1
+JOIN weather_observation_hebei t2
+  ON t1.province_id = t2.province_id AND t1.ts = t2.ts AND t1.id > t2.id;
+ALTER TABLE weather_observation_hebei
+  ADD UNIQUE KEY uk_weather_hebei_province_ts (province_id, ts);
+
+-- weather_observation_shanxi
+DELETE t1 FROM weather_observation_shanxi t1
+JOIN weather_observation_shanxi t2
+  ON t1.province_id = t2.province_id AND t1.ts = t2.ts AND t1.id > t2.id;
+ALTER TABLE weather_observation_shanxi
+  ADD UNIQUE KEY uk_weather_shanxi_province_ts (province_id, ts);
+
+-- weather_observation_neimenggu
+DELETE t1 FROM weather_observation_neimenggu t1
+JOIN weather_observation_neimenggu t2
+  ON t1.province_id = t2.province_id AND t1.ts = t2.ts AND t1.id > t2.id;
+ALTER TABLE weather_observation_neimenggu
+  ADD UNIQUE KEY uk_weather_neimenggu_province_ts (province_id, ts);
+
+-- weather_observation_liaoning
+DELETE t1 FROM weather_observation_liaoning t1
+JOIN weather_observation_liaoning t2
+  ON t1.province_id = t2.province_id AND t1.ts = t2.ts AND t1.id > t2.id;
+ALTER TABLE weather_observation_liaoning
+  ADD UNIQUE KEY uk_weather_liaoning_province_ts (province_id, ts);
+
+-- weather_observation_jilin
+DELETE t1 FROM weather_observation_jilin t1
+JOIN weather_observation_jilin t2
+  ON t1.province_id = t2.province_id AND t1.ts = t2.ts AND t1.id > t2.id;
+ALTER TABLE weather_observation_jilin
+  ADD UNIQUE KEY uk_weather_jilin_province_ts (province_id, ts);
+
+-- weather_observation_heilongjiang
+DELETE t1 FROM weather_observation_heilongjiang t1
+JOIN weather_observation_heilongjiang t2
+  ON t1.province_id = t2.province_id AND t1.ts = t2.ts AND t1.id > t2.id;
+ALTER TABLE weather_observation_heilongjiang
+  ADD UNIQUE KEY uk_weather_heilongjiang_province_ts (province_id, ts);
+
+CREATE TABLE IF NOT EXISTS import_checkpoint (
+  table_name VARCHAR(64) NOT NULL COMMENT '天气观测表名',
+  province_id BIGINT NOT NULL COMMENT '省份ID',
+  source_file VARCHAR(255) NULL COMMENT '最近导入的文件',
+  last_ts DATETIME NULL COMMENT '已导入的最新观测时间',
+  rows_imported BIGINT NOT NULL DEFAULT 0 COMMENT '累计导入行数',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (table_name, province_id),
+  CONSTRAINT fk_import_checkpoint_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='气象数据导入检查点表';
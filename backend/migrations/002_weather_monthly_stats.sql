@@ -0,0 +1,98 @@
+-- 已有数据库升级：气象数据月度汇总表
+-- 1. 创建 weather_monthly_stats
+-- 2. 由各天气观测表回填汇总数据（之后由导入工具按月刷新）
+USE energy_platform;
+
+CREATE TABLE IF NOT EXISTS weather_monthly_stats (
+  province_id BIGINT NOT NULL COMMENT '省份ID',
+  obs_year SMALLINT NOT NULL COMMENT '年份',
+  obs_month TINYINT NOT NULL COMMENT '月份',
+  hours INT NOT NULL DEFAULT 0 COMMENT '有效小时数（辐射和温度均不为空）',
+  radiation_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '地表辐射总量(W/m²·h)',
+  radiation_temp_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '温度加权辐射总量 sum(辐射*温度)',
+  temp_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '温度总量(℃·h)',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (province_id, obs_year, obs_month),
+  CONSTRAINT fk_weather_monthly_stats_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='气象数据月度汇总表';
+
+-- weather_observation_beijing
+REPLACE INTO weather_monthly_stats
+  (province_id, obs_year, obs_month, hours, radiation_sum, radiation_temp_sum, temp_sum)
+SELECT province_id, YEAR(ts), MONTH(ts), COUNT(*), SUM(surface_radiation_wm2),
+       SUM(surface_radiation_wm2 * CASE WHEN temp_c = 0 THEN 25 ELSE temp_c END), SUM(temp_c)
+FROM weather_observation_beijing
+WHERE surface_radiation_wm2 IS NOT NULL AND temp_c IS NOT NULL
+GROUP BY province_id, YEAR(ts), MONTH(ts);
+
+-- weather_observation_shanghai
+REPLACE INTO weather_monthly_stats
+  (province_id, obs_year, obs_month, hours, radiation_sum, radiation_temp_sum, temp_sum)
+SELECT province_id, YEAR(ts), MONTH(ts), COUNT(*), SUM(surface_radiation_wm2),
+       SUM(surface_radiation_wm2 * CASE WHEN temp_c = 0 THEN 25 ELSE temp_c END), SUM(temp_c)
+FROM weather_observation_shanghai
+WHERE surface_radiation_wm2 IS NOT NULL AND temp_c IS NOT NULL
+GROUP BY province_id, YEAR(ts), MONTH(ts);
+
+-- weather_observation_tianjin
+REPLACE INTO weather_monthly_stats
+  (province_id, obs_year, obs_month, hours, radiation_sum, radiation_temp_sum, temp_sum)
+SELECT province_id, YEAR(ts), MONTH(ts), COUNT(*), SUM(surface_radiation_wm2),
+       SUM(surface_radiation_wm2 * CASE WHEN temp_c = 0 THEN 25 ELSE temp_c END), SUM(temp_c)
+FROM weather_observation_tianjin
+WHERE surface_radiation_wm2 IS NOT NULL AND temp_c IS NOT NULL
+GROUP BY province_id, YEAR(ts), MONTH(ts);
+
+-- weather_observation_hebei
+REPLACE INTO weather_monthly_stats
+  (province_id, obs_year, obs_month, hours, radiation_sum, radiation_temp_sum, temp_sum)
+SELECT province_id, YEAR(ts), MONTH(ts), COUNT(*), SUM(surface_radiation_wm2),
+       SUM(surface_radiation_wm2 * CASE WHEN temp_c = 0 THEN 25 ELSE temp_c END), SUM(temp_c)
+FROM weather_observation_hebei
+WHERE surface_radiation_wm2 IS NOT NULL AND temp_c IS NOT NULL
+GROUP BY province_id, YEAR(ts), MONTH(ts);
+
+-- weather_observation_shanxi
+REPLACE INTO weather_monthly_stats
+  (province_id, obs_year, obs_month, hours, radiation_sum, radiation_temp_sum, temp_sum)
+SELECT province_id, YEAR(ts), MONTH(ts), COUNT(*), SUM(surface_radiation_wm2),
+       SUM(surface_radiation_wm2 * CASE WHEN temp_c = 0 THEN 25 ELSE temp_c END), SUM(temp_c)
+FROM weather_observation_shanxi
+WHERE surface_radiation_wm2 IS NOT NULL AND temp_c IS NOT NULL
+GROUP BY province_id, YEAR(ts), MONTH(ts);
+
+-- weather_observation_neimenggu
+REPLACE INTO weather_monthly_stats
+  (province_id, obs_year, obs_month, hours, radiation_sum, radiation_temp_sum, temp_sum)
+SELECT province_id, YEAR(ts), MONTH(ts), COUNT(*), SUM(surface_radiation_wm2),
+       SUM(surface_radiation_wm2 * CASE WHEN temp_c = 0 THEN 25 ELSE temp_c END), SUM(temp_c)
+FROM weather_observation_neimenggu
+WHERE surface_radiation_wm2 IS NOT NULL AND temp_c IS NOT NULL
+GROUP BY province_id, YEAR(ts), MONTH(ts);
+
+-- weather_observation_liaoning
+REPLACE INTO weather_monthly_stats
+  (province_id, obs_year, obs_month, hours, radiation_sum, radiation_temp_sum, temp_sum)
+SELECT province_id, YEAR(ts), MONTH(ts), COUNT(*), SUM(surface_radiation_wm2),
+       SUM(surface_radiation_wm2 * CASE WHEN temp_c = 0 THEN 25 ELSE temp_c END), SUM(temp_c)
+FROM weather_observation_liaoning
+WHERE surface_radiation_wm2 IS NOT NULL AND temp_c IS NOT NULL
+GROUP BY province_id, YEAR(ts), MONTH(ts);
+
+-- weather_observation_jilin
+REPLACE INTO weather_monthly_stats
+  (province_id, obs_year, obs_month, hours, radiation_sum, radiation_temp_sum, temp_sum)
+SELECT province_id, YEAR(ts), MONTH(ts), COUNT(*), SUM(surface_radiation_wm2),
+       SUM(surface_radiation_wm2 * CASE WHEN temp_c = 0 THEN 25 ELSE temp_c END), SUM(temp_c)
+FROM weather_observation_jilin
+WHERE surface_radiation_wm2 IS NOT NULL AND temp_c IS NOT NULL
+GROUP BY province_id, YEAR(ts), MONTH(ts);
+
+-- weather_observation_heilongjiang
+REPLACE INTO weather_monthly_stats
+  (province_id, obs_year, obs_month, hours, radiation_sum, radiation_temp_sum, temp_sum)
+SELECT province_id, YEAR(ts), MONTH(ts), COUNT(*), SUM(surface_radiation_wm2),
+       SUM(surface_radiation_wm2 * CASE WHEN temp_c = 0 THEN 25 ELSE temp_c END), SUM(temp_c)
+FROM weather_observation_heilongjiang
+WHERE surface_radiation_wm2 IS NOT NULL AND temp_c IS NOT NULL
+GROUP BY province_id, YEAR(ts), MONTH(ts);
@@ -0,0 +1,261 @@
+-- 已有数据库升级：气象数据日汇总表与风速直方图
+-- 1. 创建 weather_daily_stats、weather_wind_histogram
+-- 2. 由各天气观测表回填汇总数据（之后由导入工具按月刷新）
+USE energy_platform;
+
+CREATE TABLE IF NOT EXISTS weather_daily_stats (
+  province_id BIGINT NOT NULL COMMENT '省份ID',
+  obs_date DATE NOT NULL COMMENT '日期',
+  hours INT NOT NULL DEFAULT 0 COMMENT '小时数',
+  radiation_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '地表辐射总量(W/m²·h，缺测记0)',
+  radiation_temp_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '温度加权辐射总量 sum(辐射*温度，温度缺测按25℃)',
+  wind_speed_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '地面风速总量(m/s·h)',
+  wind_speed_max DOUBLE NULL COMMENT '最大地面风速(m/s)',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (province_id, obs_date),
+  CONSTRAINT fk_weather_daily_stats_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='气象数据日汇总表';
+
+-- 地面风速日直方图（区间宽度 0.5 m/s，第 bin_index 个区间为 [bin_index*0.5, (bin_index+1)*0.5)）
+CREATE TABLE IF NOT EXISTS weather_wind_histogram (
+  province_id BIGINT NOT NULL COMMENT '省份ID',
+  obs_date DATE NOT NULL COMMENT '日期',
+  bin_index SMALLINT NOT NULL COMMENT '风速区间序号',
+  hours INT NOT NULL DEFAULT 0 COMMENT '小时数',
+  PRIMARY KEY (province_id, obs_date, bin_index),
+  CONSTRAINT fk_weather_wind_histogram_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='地面风速日直方图';
+
+-- weather_observation_beijing
+REPLACE INTO weather_daily_stats
+  (province_id, obs_date, hours, radiation_sum, radiation_temp_sum, wind_speed_sum, wind_speed_max)
+SELECT province_id, obs_date, COUNT(*), SUM(radiation), SUM(radiation * temp), SUM(wind_speed), MAX(wind_speed)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_beijing
+) hourly
+GROUP BY province_id, obs_date;
+
+REPLACE INTO weather_wind_histogram (province_id, obs_date, bin_index, hours)
+SELECT province_id, obs_date, FLOOR(wind_speed / 0.5), COUNT(*)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_beijing
+) hourly
+GROUP BY province_id, obs_date, FLOOR(wind_speed / 0.5);
+
+-- weather_observation_shanghai
+REPLACE INTO weather_daily_stats
+  (province_id, obs_date, hours, radiation_sum, radiation_temp_sum, wind_speed_sum, wind_speed_max)
+SELECT province_id, obs_date, COUNT(*), SUM(radiation), SUM(radiation * temp), SUM(wind_speed), MAX(wind_speed)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_shanghai
+) hourly
+GROUP BY province_id, obs_date;
+
+REPLACE INTO weather_wind_histogram (province_id, obs_date, bin_index, hours)
+SELECT province_id, obs_date, FLOOR(wind_speed / 0.5), COUNT(*)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_shanghai
+) hourly
+GROUP BY province_id, obs_date, FLOOR(wind_speed / 0.5);
+
+-- weather_observation_tianjin
+REPLACE INTO weather_daily_stats
+  (province_id, obs_date, hours, radiation_sum, radiation_temp_sum, wind_speed_sum, wind_speed_max)
+SELECT province_id, obs_date, COUNT(*), SUM(radiation), SUM(radiation * temp), SUM(wind_speed), MAX(wind_speed)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_tianjin
+) hourly
+GROUP BY province_id, obs_date;
+
+REPLACE INTO weather_wind_histogram (province_id, obs_date, bin_index, hours)
+SELECT province_id, obs_date, FLOOR(wind_speed / 0.5), COUNT(*)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_tianjin
+) hourly
+GROUP BY province_id, obs_date, FLOOR(wind_speed / 0.5);
+
+-- weather_observation_hebei
+REPLACE INTO weather_daily_stats
+  (province_id, obs_date, hours, radiation_sum, radiation_temp_sum, wind_speed_sum, wind_speed_max)
+SELECT province_id, obs_date, COUNT(*), SUM(radiation), SUM(radiation * temp), SUM(wind_speed), MAX(wind_speed)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_hebei
+) hourly
+GROUP BY province_id, obs_date;
+
+REPLACE INTO weather_wind_histogram (province_id, obs_date, bin_index, hours)
+SELECT province_id, obs_date, FLOOR(wind_speed / 0.5), COUNT(*)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_hebei
+) hourly
+GROUP BY province_id, obs_date, FLOOR(wind_speed / 0.5);
+
+-- weather_observation_shanxi
+REPLACE INTO weather_daily_stats
+  (province_id, obs_date, hours, radiation_sum, radiation_temp_sum, wind_speed_sum, wind_speed_max)
+SELECT province_id, obs_date, COUNT(*), SUM(radiation), SUM(radiation * temp), SUM(wind_speed), MAX(wind_speed)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_shanxi
+) hourly
+GROUP BY province_id, obs_date;
+
+REPLACE INTO weather_wind_histogram (province_id, obs_date, bin_index, hours)
+SELECT province_id, obs_date, FLOOR(wind_speed / 0.5), COUNT(*)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_shanxi
+) hourly
+GROUP BY province_id, obs_date, FLOOR(wind_speed / 0.5);
+
+-- weather_observation_neimenggu
+REPLACE INTO weather_daily_stats
+  (province_id, obs_date, hours, radiation_sum, radiation_temp_sum, wind_speed_sum, wind_speed_max)
+SELECT province_id, obs_date, COUNT(*), SUM(radiation), SUM(radiation * temp), SUM(wind_speed), MAX(wind_speed)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_neimenggu
+) hourly
+GROUP BY province_id, obs_date;
+
+REPLACE INTO weather_wind_histogram (province_id, obs_date, bin_index, hours)
+SELECT province_id, obs_date, FLOOR(wind_speed / 0.5), COUNT(*)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_neimenggu
+) hourly
+GROUP BY province_id, obs_date, FLOOR(wind_speed / 0.5);
+
+-- weather_observation_liaoning
+REPLACE INTO weather_daily_stats
+  (province_id, obs_date, hours, radiation_sum, radiation_temp_sum, wind_speed_sum, wind_speed_max)
+SELECT province_id, obs_date, COUNT(*), SUM(radiation), SUM(radiation * temp), SUM(wind_speed), MAX(wind_speed)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_liaoning
+) hourly
+GROUP BY province_id, obs_date;
+
+REPLACE INTO weather_wind_histogram (province_id, obs_date, bin_index, hours)
+SELECT province_id, obs_date, FLOOR(wind_speed / 0.5), COUNT(*)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_liaoning
+) hourly
+GROUP BY province_id, obs_date, FLOOR(wind_speed / 0.5);
+
+-- weather_observation_jilin
+REPLACE INTO weather_daily_stats
+  (province_id, obs_date, hours, radiation_sum, radiation_temp_sum, wind_speed_sum, wind_speed_max)
+SELECT province_id, obs_date, COUNT(*), SUM(radiation), SUM(radiation * temp), SUM(wind_speed), MAX(wind_speed)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_jilin
+) hourly
+GROUP BY province_id, obs_date;
+
+REPLACE INTO weather_wind_histogram (province_id, obs_date, bin_index, hours)
+SELECT province_id, obs_date, FLOOR(wind_speed / 0.5), COUNT(*)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_jilin
+) hourly
+GROUP BY province_id, obs_date, FLOOR(wind_speed / 0.5);
+
+-- weather_observation_heilongjiang
+REPLACE INTO weather_daily_stats
+  (province_id, obs_date, hours, radiation_sum, radiation_temp_sum, wind_speed_sum, wind_speed_max)
+SELECT province_id, obs_date, COUNT(*), SUM(radiation), SUM(radiation * temp), SUM(wind_speed), MAX(wind_speed)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_heilongjiang
+) hourly
+GROUP BY province_id, obs_date;
+
+REPLACE INTO weather_wind_histogram (province_id, obs_date, bin_index, hours)
+SELECT province_id, obs_date, FLOOR(wind_speed / 0.5), COUNT(*)
+FROM (
+  SELECT province_id, DATE(ts) AS obs_date,
+         COALESCE(surface_radiation_wm2, 0) AS radiation,
+         CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+         COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                      + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+  FROM weather_observation_heilongjiang
+) hourly
+GROUP BY province_id, obs_date, FLOOR(wind_speed / 0.5);
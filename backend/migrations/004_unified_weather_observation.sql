@@ -0,0 +1,122 @@
+-- 已有数据库升级：九张省份天气观测表合并为一张分区表
+-- 1. 创建 weather_observation（主键 (province_id, ts)，按年份分区、按省份子分区）
+-- 2. 逐表复制数据（001 已保证每张表内 (province_id, ts) 唯一）
+-- 3. 导入检查点改为按省份记录
+-- 4. 旧表重命名为 *_legacy，核对数据后可删除
+USE energy_platform;
+
+CREATE TABLE IF NOT EXISTS weather_observation (
+  province_id BIGINT NOT NULL COMMENT '省份ID',
+  ts DATETIME NOT NULL COMMENT '观测时间',
+  temp_c DECIMAL(5,2) NULL COMMENT '气温℃',
+  humidity DECIMAL(5,2) NULL COMMENT '湿度%',
+  pressure_hpa DECIMAL(8,2) NULL COMMENT '气压hPa',
+  precip_mm DECIMAL(6,2) NULL COMMENT '降水量mm/h',
+  meridional_wind_ms DECIMAL(6,2) NULL COMMENT '经向风m/s',
+  zonal_wind_ms DECIMAL(6,2) NULL COMMENT '纬向风m/s',
+  wind_speed_ms DECIMAL(6,2) NULL COMMENT '地面风速m/s',
+  wind_dir_deg DECIMAL(6,2) NULL COMMENT '风向°',
+  surface_radiation_wm2 DECIMAL(8,2) NULL COMMENT '地表水平辐射W/m^2',
+  normal_direct_radiation_wm2 DECIMAL(8,2) NULL COMMENT '法向直接辐射W/m^2',
+  scattered_radiation_wm2 DECIMAL(8,2) NULL COMMENT '散射辐射W/m^2',
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (province_id, ts),
+  INDEX idx_weather_ts (ts)
+) ENGINE=InnoDB COMMENT='天气观测数据表'
+PARTITION BY RANGE (YEAR(ts))
+SUBPARTITION BY HASH (province_id) SUBPARTITIONS 16 (
+  PARTITION p2020 VALUES LESS THAN (2021),
+  PARTITION p2021 VALUES LESS THAN (2022),
+  PARTITION p2022 VALUES LESS THAN (2023),
+  PARTITION p2023 VALUES LESS THAN (2024),
+  PARTITION p2024 VALUES LESS THAN (2025),
+  PARTITION p2025 VALUES LESS THAN (2026),
+  PARTITION p2026 VALUES LESS THAN (2027),
+  PARTITION p2027 VALUES LESS THAN (2028),
+  PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- weather_observation_beijing
+INSERT IGNORE INTO weather_observation
+  (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at)
+SELECT province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at
+FROM weather_observation_beijing;
+
+-- weather_observation_shanghai
+INSERT IGNORE INTO weather_observation
+  (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at)
+SELECT province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at
+FROM weather_observation_shanghai;
+
+-- weather_observation_tianjin
+INSERT IGNORE INTO weather_observation
+  (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at)
+SELECT province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at
+FROM weather_observation_tianjin;
+
+-- weather_observation_hebei
+INSERT IGNORE INTO weather_observation
+  (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at)
+SELECT province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at
+FROM weather_observation_hebei;
+
+-- weather_observation_shanxi
+INSERT IGNORE INTO weather_observation
+  (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at)
+SELECT province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at
+FROM weather_observation_shanxi;
+
+-- weather_observation_neimenggu
+INSERT IGNORE INTO weather_observation
+  (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at)
+SELECT province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at
+FROM weather_observation_neimenggu;
+
+-- weather_observation_liaoning
+INSERT IGNORE INTO weather_observation
+  (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at)
+SELECT province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at
+FROM weather_observation_liaoning;
+
+-- weather_observation_jilin
+INSERT IGNORE INTO weather_observation
+  (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at)
+SELECT province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at
+FROM weather_observation_jilin;
+
+-- weather_observation_heilongjiang
+INSERT IGNORE INTO weather_observation
+  (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at)
+SELECT province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2, created_at
+FROM weather_observation_heilongjiang;
+
+-- 导入检查点：每个省份原本只对应一张表，去掉表名后主键仍然唯一
+ALTER TABLE import_checkpoint
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (province_id),
+  DROP COLUMN table_name;
+
+-- 核对：各省份行数应与旧表一致
+SELECT province_id, COUNT(*) AS row_count FROM weather_observation GROUP BY province_id;
+
+RENAME TABLE
+  weather_observation_beijing TO weather_observation_beijing_legacy,
+  weather_observation_shanghai TO weather_observation_shanghai_legacy,
+  weather_observation_tianjin TO weather_observation_tianjin_legacy,
+  weather_observation_hebei TO weather_observation_hebei_legacy,
+  weather_observation_shanxi TO weather_observation_shanxi_legacy,
+  weather_observation_neimenggu TO weather_observation_neimenggu_legacy,
+  weather_observation_liaoning TO weather_observation_liaoning_legacy,
+  weather_observation_jilin TO weather_observation_jilin_legacy,
+  weather_observation_heilongjiang TO weather_observation_heilongjiang_legacy;
+
+-- 核对无误后删除旧表：
+-- DROP TABLE weather_observation_beijing_legacy;
+-- DROP TABLE weather_observation_shanghai_legacy;
+-- DROP TABLE weather_observation_tianjin_legacy;
+-- DROP TABLE weather_observation_hebei_legacy;
+-- DROP TABLE weather_observation_shanxi_legacy;
+-- DROP TABLE weather_observation_neimenggu_legacy;
+-- DROP TABLE weather_observation_liaoning_legacy;
+-- DROP TABLE weather_observation_jilin_legacy;
+-- DROP TABLE weather_observation_heilongjiang_legacy;
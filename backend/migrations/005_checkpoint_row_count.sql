@@ -0,0 +1,13 @@
+-- 已有数据库升级：导入检查点记录各省份的观测行数
+-- 1. import_checkpoint 增加 row_count
+-- 2. 按现有数据回填（没有检查点的省份同时补建检查点）
+USE energy_platform;
+
+ALTER TABLE import_checkpoint
+  ADD COLUMN row_count BIGINT NULL COMMENT '该省份当前观测行数（导入后更新，供系统状态使用）' AFTER rows_imported;
+
+INSERT INTO import_checkpoint (province_id, last_ts, rows_imported, row_count)
+SELECT province_id, MAX(ts), COUNT(*), COUNT(*)
+FROM weather_observation
+GROUP BY province_id
+ON DUPLICATE KEY UPDATE row_count = VALUES(row_count);
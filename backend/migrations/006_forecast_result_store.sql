@@ -0,0 +1,45 @@
+-- 已有数据库升级：保存预测结果
+-- 1. pv_forecast_result、pv_yearly_forecast 增加预测参数哈希，唯一键包含参数哈希
+-- 2. 小时发电量扩大到 DECIMAL(14,4)、年发电量扩大到 DECIMAL(16,4)（大装机容量不溢出）
+-- 3. 新建 wind_forecast_result 和 forecast_result_run
+USE energy_platform;
+
+ALTER TABLE pv_forecast_result
+  ADD COLUMN config_hash CHAR(32) NOT NULL DEFAULT '' COMMENT '预测参数哈希' AFTER station_id,
+  MODIFY COLUMN hourly_generation_kwh DECIMAL(14,4) NOT NULL COMMENT '小时发电量(kWh)',
+  ADD UNIQUE KEY uk_pv_result_station_config_time (station_id, config_hash, forecast_time);
+
+ALTER TABLE pv_yearly_forecast
+  ADD COLUMN config_hash CHAR(32) NOT NULL DEFAULT '' COMMENT '预测参数哈希' AFTER station_id,
+  MODIFY COLUMN total_generation_kwh DECIMAL(16,4) NOT NULL COMMENT '年总发电量(kWh)',
+  DROP INDEX uk_pv_yearly_station_year,
+  ADD UNIQUE KEY uk_pv_yearly_station_config_year (station_id, config_hash, forecast_year);
+
+CREATE TABLE IF NOT EXISTS wind_forecast_result (
+  id BIGINT PRIMARY KEY AUTO_INCREMENT,
+  station_id BIGINT NOT NULL COMMENT '站点ID',
+  config_hash CHAR(32) NOT NULL COMMENT '预测参数哈希',
+  forecast_time DATETIME NOT NULL COMMENT '预测时间',
+  wind_speed_10m_ms DOUBLE NULL COMMENT '10米风速(m/s)',
+  wind_speed_hub_ms DECIMAL(7,3) NULL COMMENT '轮毂高度风速(m/s)',
+  hourly_generation_kwh DECIMAL(14,4) NOT NULL COMMENT '小时发电量(kWh)',
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uk_wind_result_station_config_time (station_id, config_hash, forecast_time),
+  INDEX idx_wind_result_station_time (station_id, forecast_time),
+  CONSTRAINT fk_wind_result_station FOREIGN KEY (station_id) REFERENCES station(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='风电预测结果表';
+
+CREATE TABLE IF NOT EXISTS forecast_result_run (
+  id BIGINT PRIMARY KEY AUTO_INCREMENT,
+  kind VARCHAR(16) NOT NULL COMMENT '结果类型 pv/wind/pv_yearly',
+  station_id BIGINT NOT NULL COMMENT '站点ID',
+  config_hash CHAR(32) NOT NULL COMMENT '预测参数哈希',
+  start_time DATETIME NOT NULL COMMENT '开始时间',
+  end_time DATETIME NOT NULL COMMENT '结束时间',
+  data_points INT NOT NULL COMMENT '结果行数',
+  weather_version CHAR(16) NOT NULL COMMENT '气象数据版本',
+  summary JSON NULL COMMENT '汇总信息',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  UNIQUE KEY uk_forecast_run (kind, station_id, config_hash, start_time, end_time),
+  CONSTRAINT fk_forecast_run_station FOREIGN KEY (station_id) REFERENCES station(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='已保存的预测结果';
@@ -0,0 +1,10 @@
+-- 已有数据库升级：导入检查点记录汇总水位线
+-- 1. import_checkpoint 增加 rollup_ts（汇总表已覆盖的最新观测时间）
+-- 2. 已有检查点按当前 last_ts 回填（此前的导入在成功结束时已刷新汇总表；
+--    怀疑汇总表不完整的省份可将 rollup_ts 置为 NULL，下次导入时全部重新汇总）
+USE energy_platform;
+
+ALTER TABLE import_checkpoint
+  ADD COLUMN rollup_ts DATETIME NULL COMMENT '汇总表已覆盖的最新观测时间（汇总水位线）' AFTER row_count;
+
+UPDATE import_checkpoint SET rollup_ts = last_ts;
@@ -7,6 +7,8 @@ import math
 from datetime import datetime
 from typing import List, Dict
 
+import numpy as np
+
 
 class PVCalculator:
     """光伏发电计算器类"""
@@ -39,6 +41,55 @@ class PVCalculator:
         
         return max(0, generation)
     
+    def calculate_generation_from_sums(self,
+                                       radiation_sum: float,
+                                       radiation_temp_sum: float,
+                                       installed_capacity: float,
+                                       panel_efficiency: float = None,
+                                       inverter_efficiency: float = None,
+                                       temperature_coefficient: float = None,
+                                       degradation_factor: float = 1.0) -> float:
+        """由辐射总量和温度加权辐射总量 sum(辐射*温度) 计算总发电量
+        
+        等于逐小时 calculate_pv_generation 之和（温度系数修正后效率为正时）。
+        """
+        panel_efficiency = panel_efficiency or self.default_params['panel_efficiency']
+        inverter_efficiency = inverter_efficiency or self.default_params['inverter_efficiency']
+        temperature_coefficient = temperature_coefficient or self.default_params['temperature_coefficient']
+        
+        weighted_radiation = radiation_sum + temperature_coefficient * (
+            radiation_temp_sum - self.STC_TEMPERATURE * radiation_sum
+        )
+        generation = (weighted_radiation / 1000) * installed_capacity * \
+            panel_efficiency * inverter_efficiency * degradation_factor
+        
+        return max(0, generation)
+    
+    def sweep_generation(self,
+                         solar_radiation,
+                         temperature,
+                         installed_capacity: float,
+                         panel_efficiencies: List[float],
+                         inverter_efficiencies: List[float],
+                         temperature_coefficients: List[float]):
+        """参数网格上的总发电量（不逐小时取整）
+        
+        返回形状为 (光伏板效率, 逆变器效率, 温度系数) 的数组。效率只是比例系数，
+        每个温度系数只需对小时序列做一次点积。
+        """
+        panel = np.array([v or self.default_params['panel_efficiency'] for v in panel_efficiencies])
+        inverter = np.array([v or self.default_params['inverter_efficiency'] for v in inverter_efficiencies])
+        coefficients = [v or self.default_params['temperature_coefficient'] for v in temperature_coefficients]
+        
+        solar_radiation = np.asarray(solar_radiation, dtype=float)
+        temperature = np.asarray(temperature, dtype=float)
+        weighted = np.array([
+            np.dot(solar_radiation, np.maximum(0, 1 + k * (temperature - self.STC_TEMPERATURE)))
+            for k in coefficients
+        ])
+        
+        return (installed_capacity / 1000) * panel[:, None, None] * inverter[None, :, None] * weighted[None, None, :]
+    
     def calculate_degradation_factor(self, years: int, degradation_rate: float = None) -> float:
         """计算设备衰减因子"""
         degradation_rate = degradation_rate or self.default_params['degradation_rate']
@@ -48,33 +99,86 @@ class PVCalculator:
                                   weather_data: List[Dict],
                                   installed_capacity: float,
                                   params: Dict = None) -> List[Dict]:
-        """计算小时级发电量"""
+        """计算小时级发电量（逐行字典形式，由 calculate_hourly_generation_columns 计算）"""
+        count = len(weather_data)
+        solar_radiation = np.fromiter(
+            (float(weather.get('surface_radiation_wm2', 0) or 0) for weather in weather_data),
+            dtype=float, count=count)
+        temperature = np.fromiter(
+            (float(weather.get('temp_c', self.STC_TEMPERATURE) or self.STC_TEMPERATURE)
+             for weather in weather_data),
+            dtype=float, count=count)
+        columns = self.calculate_hourly_generation_columns(
+            timestamps=[weather.get('ts') for weather in weather_data],
+            solar_radiation=solar_radiation,
+            temperature=temperature,
+            installed_capacity=installed_capacity,
+            params=params
+        )
+        return [
+            {
+                'timestamp': timestamp,
+                'solar_radiation_wm2': radiation,
+                'temperature_c': temp,
+                'hourly_generation_kwh': generation,
+                'efficiency_factor': columns['efficiency_factor']
+            }
+            for timestamp, radiation, temp, generation in zip(
+                columns['timestamp'], solar_radiation.tolist(), temperature.tolist(),
+                columns['hourly_generation_kwh'].tolist()
+            )
+        ]
+    
+    def fill_missing_weather(self, solar_radiation, temperature):
+        """数组形式的缺测处理（与逐行计算一致：辐射缺测记0，温度缺测或为0记STC温度）"""
+        solar_radiation = np.nan_to_num(np.asarray(solar_radiation, dtype=float), nan=0.0)
+        temperature = np.asarray(temperature, dtype=float)
+        temperature = np.where(np.isnan(temperature) | (temperature == 0), self.STC_TEMPERATURE, temperature)
+        return solar_radiation, temperature
+    
+    def calculate_hourly_generation_columns(self,
+                                            timestamps: List,
+                                            solar_radiation,
+                                            temperature,
+                                            installed_capacity: float,
+                                            params: Dict = None) -> Dict:
+        """按列计算小时级发电量（数组运算，返回列而不是逐行字典）"""
         params = params or self.default_params
-        results = []
+        panel_efficiency = params['panel_efficiency'] or self.default_params['panel_efficiency']
+        inverter_efficiency = params['inverter_efficiency'] or self.default_params['inverter_efficiency']
+        temperature_coefficient = (params['temperature_coefficient']
+                                   or self.default_params['temperature_coefficient'])
         
-        for weather in weather_data:
-            solar_radiation = float(weather.get('surface_radiation_wm2', 0) or 0)
-            temperature = float(weather.get('temp_c', self.STC_TEMPERATURE) or self.STC_TEMPERATURE)
-            
-            hourly_generation = self.calculate_pv_generation(
-                solar_radiation=solar_radiation,
-                temperature=temperature,
-                installed_capacity=installed_capacity,
-                panel_efficiency=params['panel_efficiency'],
-                inverter_efficiency=params['inverter_efficiency'],
-                temperature_coefficient=params['temperature_coefficient'],
-                degradation_factor=1.0
-            )
-            
-            results.append({
-                'timestamp': weather.get('ts'),
-                'solar_radiation_wm2': solar_radiation,
-                'temperature_c': temperature,
-                'hourly_generation_kwh': round(hourly_generation, 4),
-                'efficiency_factor': round(params['panel_efficiency'] * params['inverter_efficiency'], 4)
-            })
+        solar_radiation = np.asarray(solar_radiation, dtype=float)
+        temperature = np.asarray(temperature, dtype=float)
+        
+        temp_factor = 1 + temperature_coefficient * (temperature - self.STC_TEMPERATURE)
+        system_efficiency = panel_efficiency * inverter_efficiency * temp_factor
+        generation = np.maximum(0, (solar_radiation / 1000) * installed_capacity * system_efficiency)
         
-        return results
+        return {
+            'timestamp': timestamps,
+            'solar_radiation_wm2': solar_radiation,
+            'temperature_c': temperature,
+            'hourly_generation_kwh': np.round(generation, 4),
+            'efficiency_factor': round(params['panel_efficiency'] * params['inverter_efficiency'], 4)
+        }
+    
+    def calculate_statistics_columns(self, columns: Dict) -> Dict:
+        """按列计算发电量统计信息"""
+        generation = columns['hourly_generation_kwh']
+        data_points = len(generation)
+        if not data_points:
+            return {}
+        
+        total_generation = float(generation.sum())
+        
+        return {
+            'total_generation_kwh': round(total_generation, 4),
+            'average_daily_generation_kwh': round(total_generation / data_points * 24, 4),
+            'data_points': data_points,
+            'avg_hourly_generation_kwh': round(total_generation / data_points, 4)
+        }
     
     def calculate_yearly_forecast(self,
                                  base_year_generation: float,
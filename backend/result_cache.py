@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+预测结果缓存模块
+
+以规范化后的请求内容的哈希为键缓存已编码的响应体，条目带有生成时的
+气象数据版本，数据版本变化、超过有效期或超出内存上限时失效。
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+def make_cache_key(endpoint: str, payload: Dict) -> str:
+    """请求内容的哈希（键按字母排序，与字段顺序无关）"""
+    normalized = json.dumps({'endpoint': endpoint, 'payload': payload},
+                            sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class _Entry:
+    __slots__ = ('body', 'data_key', 'data_version', 'expires_at')
+
+    def __init__(self, body: bytes, data_key: Hashable, data_version, expires_at: float):
+        self.body = body
+        self.data_key = data_key
+        self.data_version = data_version
+        self.expires_at = expires_at
+
+
+class ResultCache:
+    """带有效期和内存上限的 LRU 结果缓存"""
+
+    def __init__(self, ttl: float = 600.0, max_bytes: int = 128 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._stale = 0
+        self._evictions = 0
+        self._purges = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def lookup(self, key: str) -> Optional[_Entry]:
+        """取出未过期的条目（不检查数据版本），没有时返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._expired += 1
+                self._misses += 1
+                return None
+            return entry
+
+    def validate(self, key: str, entry: _Entry, data_version) -> Optional[bytes]:
+        """条目的数据版本与当前版本一致时返回响应体，否则删除条目"""
+        with self._lock:
+            if entry.data_version != data_version:
+                if self._entries.get(key) is entry:
+                    self._remove(key)
+                self._stale += 1
+                self._misses += 1
+                return None
+            if self._entries.get(key) is entry:
+                self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.body
+
+    def put(self, key: str, body: bytes, data_key: Hashable = None, data_version=None):
+        """写入响应体；单个响应超过内存上限时不缓存"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(body, data_key, data_version, time.monotonic() + self.ttl)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def purge(self, data_key: Hashable = None) -> int:
+        """清除全部条目，或只清除依赖某份气象数据的条目"""
+        with self._lock:
+            if data_key is None:
+                keys = list(self._entries)
+            else:
+                keys = [k for k, e in self._entries.items() if e.data_key == data_key]
+            for key in keys:
+                self._remove(key)
+            self._purges += len(keys)
+            return len(keys)
+
+    def stats(self) -> Dict:
+        """缓存统计"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_s': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'expired': self._expired,
+                'stale': self._stale,
+                'evictions': self._evictions,
+                'purged': self._purges,
+            }
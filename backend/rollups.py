@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+气象数据汇总模块
+
+预先按月、按日汇总小时级气象数据，供多年发电量预测、日/月分辨率的
+发电量汇总等只需要总量的查询使用，避免每次请求扫描整张观测表。汇总表
+由导入工具在每次导入后按受影响的月份刷新：
+    weather_monthly_stats   (省份, 年, 月) 辐射与温度加权辐射总量
+    weather_daily_stats     (省份, 日) 辐射总量、平均/最大风速
+    weather_wind_histogram  (省份, 日, 风速区间) 小时数
+
+光伏发电量对辐射是线性的：
+    sum(R * (1 + k*(T - 25))) = sum(R) + k * (sum(R*T) - 25 * sum(R))
+因此只需保存辐射总量和温度加权辐射总量即可得到任意参数下的年发电量。
+"""
+
+from datetime import datetime
+
+# 与逐行计算一致：只统计辐射和温度都不为空的小时，温度为0时按25℃（STC）计算
+MONTHLY_AGGREGATE_COLUMNS = """
+    COUNT(*) AS hours,
+    SUM(surface_radiation_wm2) AS radiation_sum,
+    SUM(surface_radiation_wm2 * CASE WHEN temp_c = 0 THEN 25 ELSE temp_c END) AS radiation_temp_sum,
+    SUM(temp_c) AS temp_sum
+"""
+
+REFRESH_MONTHLY_STATS_SQL = """
+INSERT INTO weather_monthly_stats
+(province_id, obs_year, obs_month, hours, radiation_sum, radiation_temp_sum, temp_sum)
+SELECT province_id, YEAR(ts), MONTH(ts), {columns}
+FROM weather_observation
+WHERE province_id = %s AND ts >= %s
+AND surface_radiation_wm2 IS NOT NULL
+AND temp_c IS NOT NULL
+GROUP BY province_id, YEAR(ts), MONTH(ts)
+ON DUPLICATE KEY UPDATE
+hours = VALUES(hours),
+radiation_sum = VALUES(radiation_sum),
+radiation_temp_sum = VALUES(radiation_temp_sum),
+temp_sum = VALUES(temp_sum)
+"""
+
+# 风速直方图区间宽度(m/s)，第 i 个区间为 [i*宽度, (i+1)*宽度)
+WIND_BIN_WIDTH = 0.5
+
+# 与小时级计算一致：辐射缺测记0，温度缺测或为0按25℃，地面风速缺测时由风分量合成
+DAILY_SOURCE_SQL = """
+SELECT province_id, DATE(ts) AS obs_date,
+       COALESCE(surface_radiation_wm2, 0) AS radiation,
+       CASE WHEN temp_c IS NULL OR temp_c = 0 THEN 25 ELSE temp_c END AS temp,
+       COALESCE(wind_speed_ms, SQRT(COALESCE(zonal_wind_ms, 0) * COALESCE(zonal_wind_ms, 0)
+                                    + COALESCE(meridional_wind_ms, 0) * COALESCE(meridional_wind_ms, 0))) AS wind_speed
+FROM weather_observation
+WHERE province_id = %s AND ts >= %s
+"""
+
+REFRESH_DAILY_STATS_SQL = """
+INSERT INTO weather_daily_stats
+(province_id, obs_date, hours, radiation_sum, radiation_temp_sum, wind_speed_sum, wind_speed_max)
+SELECT province_id, obs_date, COUNT(*), SUM(radiation), SUM(radiation * temp),
+       SUM(wind_speed), MAX(wind_speed)
+FROM ({source}) hourly
+GROUP BY province_id, obs_date
+ON DUPLICATE KEY UPDATE
+hours = VALUES(hours),
+radiation_sum = VALUES(radiation_sum),
+radiation_temp_sum = VALUES(radiation_temp_sum),
+wind_speed_sum = VALUES(wind_speed_sum),
+wind_speed_max = VALUES(wind_speed_max)
+"""
+
+REFRESH_WIND_HISTOGRAM_SQL = """
+INSERT INTO weather_wind_histogram (province_id, obs_date, bin_index, hours)
+SELECT province_id, obs_date, FLOOR(wind_speed / {bin_width}) AS bin_index, COUNT(*)
+FROM ({source}) hourly
+GROUP BY province_id, obs_date, FLOOR(wind_speed / {bin_width})
+"""
+
+# 日/月分辨率的汇总查询，period 为日期或 年*100+月，由 format_period 转换为字符串
+PERIOD_EXPRESSIONS = {
+    'daily': "obs_date",
+    'monthly': "YEAR(obs_date) * 100 + MONTH(obs_date)",
+}
+
+PERIOD_STATS_SQL = """
+SELECT {period} AS period, COUNT(*) AS days, SUM(hours) AS hours,
+       SUM(radiation_sum) AS radiation_sum, SUM(radiation_temp_sum) AS radiation_temp_sum,
+       SUM(wind_speed_sum) AS wind_speed_sum, MAX(wind_speed_max) AS wind_speed_max
+FROM weather_daily_stats
+WHERE province_id = %s AND obs_date >= %s AND obs_date <= %s
+GROUP BY period
+ORDER BY period
+"""
+
+PERIOD_WIND_HISTOGRAM_SQL = """
+SELECT {period} AS period, bin_index, SUM(hours) AS hours
+FROM weather_wind_histogram
+WHERE province_id = %s AND obs_date >= %s AND obs_date <= %s
+GROUP BY period, bin_index
+ORDER BY period, bin_index
+"""
+
+# 不晚于指定年份的最近一个有数据的年度汇总
+BASE_YEAR_STATS_SQL = """
+SELECT obs_year, SUM(hours) AS hours, SUM(radiation_sum) AS radiation_sum,
+       SUM(radiation_temp_sum) AS radiation_temp_sum
+FROM weather_monthly_stats
+WHERE province_id = %s AND obs_year <= %s
+GROUP BY obs_year
+ORDER BY obs_year DESC
+LIMIT 1
+"""
+
+# 汇总表缺失时直接在观测表上按时间范围汇总（主键范围扫描，只访问对应年份的分区）
+RANGE_AGGREGATE_SQL = """
+SELECT {columns}
+FROM weather_observation
+WHERE province_id = %s AND ts >= %s AND ts < %s
+AND surface_radiation_wm2 IS NOT NULL
+AND temp_c IS NOT NULL
+"""
+
+LATEST_TS_BEFORE_SQL = """
+SELECT MAX(ts) AS latest_ts FROM weather_observation WHERE province_id = %s AND ts < %s
+"""
+
+
+def month_start(ts: datetime) -> datetime:
+    """所在月份的第一天零点"""
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def year_range(year: int):
+    """[year-01-01, (year+1)-01-01) 时间范围"""
+    return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+
+def format_period(resolution: str, value) -> str:
+    """汇总查询的 period 转换为 'YYYY-MM-DD' 或 'YYYY-MM'"""
+    if resolution == 'monthly':
+        value = int(value)
+        return f"{value // 100:04d}-{value % 100:02d}"
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def refresh_monthly_stats(cursor, province_id: int, since: datetime = None) -> int:
+    """重新汇总 since 所在月份及之后各月的数据（since 为空时汇总全部），不提交事务"""
+    start = month_start(since) if since is not None else datetime(1900, 1, 1)
+    cursor.execute(
+        REFRESH_MONTHLY_STATS_SQL.format(columns=MONTHLY_AGGREGATE_COLUMNS),
+        (province_id, start)
+    )
+    return cursor.rowcount
+
+
+def refresh_daily_stats(cursor, province_id: int, since: datetime = None) -> int:
+    """重新汇总 since 所在月份及之后各日的数据和风速直方图，不提交事务"""
+    start = month_start(since) if since is not None else datetime(1900, 1, 1)
+    cursor.execute(REFRESH_DAILY_STATS_SQL.format(source=DAILY_SOURCE_SQL), (province_id, start))
+    rowcount = cursor.rowcount
+    
+    # 直方图先删除再重建，避免重新导入后残留不再出现的区间
+    cursor.execute(
+        "DELETE FROM weather_wind_histogram WHERE province_id = %s AND obs_date >= %s",
+        (province_id, start.date())
+    )
+    cursor.execute(
+        REFRESH_WIND_HISTOGRAM_SQL.format(source=DAILY_SOURCE_SQL, bin_width=WIND_BIN_WIDTH),
+        (province_id, start)
+    )
+    return rowcount
+
+
+def refresh_rollups(cursor, province_id: int, since: datetime = None):
+    """刷新某省份的全部汇总表，不提交事务"""
+    refresh_monthly_stats(cursor, province_id, since)
+    refresh_daily_stats(cursor, province_id, since)
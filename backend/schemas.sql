@@ -26,158 +26,12 @@ CREATE TABLE IF NOT EXISTS station (
   CONSTRAINT fk_station_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
 ) ENGINE=InnoDB COMMENT='站点信息表';
 
--- 为每个省份创建独立的天气观测表（支持13列完整数据）
--- 北京天气观测表
-CREATE TABLE IF NOT EXISTS weather_observation_beijing (
-  id BIGINT PRIMARY KEY AUTO_INCREMENT,
-  province_id BIGINT NOT NULL DEFAULT 1 COMMENT '省份ID',
-  ts DATETIME NOT NULL COMMENT '观测时间',
-  temp_c DECIMAL(5,2) NULL COMMENT '气温℃',
-  humidity DECIMAL(5,2) NULL COMMENT '湿度%',
-  pressure_hpa DECIMAL(8,2) NULL COMMENT '气压hPa',
-  precip_mm DECIMAL(6,2) NULL COMMENT '降水量mm/h',
-  meridional_wind_ms DECIMAL(6,2) NULL COMMENT '经向风m/s',
-  zonal_wind_ms DECIMAL(6,2) NULL COMMENT '纬向风m/s',
-  wind_speed_ms DECIMAL(6,2) NULL COMMENT '地面风速m/s',
-  wind_dir_deg DECIMAL(6,2) NULL COMMENT '风向°',
-  surface_radiation_wm2 DECIMAL(8,2) NULL COMMENT '地表水平辐射W/m^2',
-  normal_direct_radiation_wm2 DECIMAL(8,2) NULL COMMENT '法向直接辐射W/m^2',
-  scattered_radiation_wm2 DECIMAL(8,2) NULL COMMENT '散射辐射W/m^2',
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_weather_beijing_ts (ts),
-  CONSTRAINT fk_weather_beijing_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
-) ENGINE=InnoDB COMMENT='北京天气观测数据表';
-
--- 上海天气观测表
-CREATE TABLE IF NOT EXISTS weather_observation_shanghai (
-  id BIGINT PRIMARY KEY AUTO_INCREMENT,
-  province_id BIGINT NOT NULL DEFAULT 2 COMMENT '省份ID',
-  ts DATETIME NOT NULL COMMENT '观测时间',
-  temp_c DECIMAL(5,2) NULL COMMENT '气温℃',
-  humidity DECIMAL(5,2) NULL COMMENT '湿度%',
-  pressure_hpa DECIMAL(8,2) NULL COMMENT '气压hPa',
-  precip_mm DECIMAL(6,2) NULL COMMENT '降水量mm/h',
-  meridional_wind_ms DECIMAL(6,2) NULL COMMENT '经向风m/s',
-  zonal_wind_ms DECIMAL(6,2) NULL COMMENT '纬向风m/s',
-  wind_speed_ms DECIMAL(6,2) NULL COMMENT '地面风速m/s',
-  wind_dir_deg DECIMAL(6,2) NULL COMMENT '风向°',
-  surface_radiation_wm2 DECIMAL(8,2) NULL COMMENT '地表水平辐射W/m^2',
-  normal_direct_radiation_wm2 DECIMAL(8,2) NULL COMMENT '法向直接辐射W/m^2',
-  scattered_radiation_wm2 DECIMAL(8,2) NULL COMMENT '散射辐射W/m^2',
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_weather_shanghai_ts (ts),
-  CONSTRAINT fk_weather_shanghai_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
-) ENGINE=InnoDB COMMENT='上海天气观测数据表';
-
--- 天津天气观测表
-CREATE TABLE IF NOT EXISTS weather_observation_tianjin (
-  id BIGINT PRIMARY KEY AUTO_INCREMENT,
-  province_id BIGINT NOT NULL DEFAULT 3 COMMENT '省份ID',
-  ts DATETIME NOT NULL COMMENT '观测时间',
-  temp_c DECIMAL(5,2) NULL COMMENT '气温℃',
-  humidity DECIMAL(5,2) NULL COMMENT '湿度%',
-  pressure_hpa DECIMAL(8,2) NULL COMMENT '气压hPa',
-  precip_mm DECIMAL(6,2) NULL COMMENT '降水量mm/h',
-  meridional_wind_ms DECIMAL(6,2) NULL COMMENT '经向风m/s',
-  zonal_wind_ms DECIMAL(6,2) NULL COMMENT '纬向风m/s',
-  wind_speed_ms DECIMAL(6,2) NULL COMMENT '地面风速m/s',
-  wind_dir_deg DECIMAL(6,2) NULL COMMENT '风向°',
-  surface_radiation_wm2 DECIMAL(8,2) NULL COMMENT '地表水平辐射W/m^2',
-  normal_direct_radiation_wm2 DECIMAL(8,2) NULL COMMENT '法向直接辐射W/m^2',
-  scattered_radiation_wm2 DECIMAL(8,2) NULL COMMENT '散射辐射W/m^2',
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_weather_tianjin_ts (ts),
-  CONSTRAINT fk_weather_tianjin_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
-) ENGINE=InnoDB COMMENT='天津天气观测数据表';
-
--- 河北天气观测表
-CREATE TABLE IF NOT EXISTS weather_observation_hebei (
-  id BIGINT PRIMARY KEY AUTO_INCREMENT,
-  province_id BIGINT NOT NULL DEFAULT 4 COMMENT '省份ID',
-  ts DATETIME NOT NULL COMMENT '观测时间',
-  temp_c DECIMAL(5,2) NULL COMMENT '气温℃',
-  humidity DECIMAL(5,2) NULL COMMENT '湿度%',
-  pressure_hpa DECIMAL(8,2) NULL COMMENT '气压hPa',
-  precip_mm DECIMAL(6,2) NULL COMMENT '降水量mm/h',
-  meridional_wind_ms DECIMAL(6,2) NULL COMMENT '经向风m/s',
-  zonal_wind_ms DECIMAL(6,2) NULL COMMENT '纬向风m/s',
-  wind_speed_ms DECIMAL(6,2) NULL COMMENT '地面风速m/s',
-  wind_dir_deg DECIMAL(6,2) NULL COMMENT '风向°',
-  surface_radiation_wm2 DECIMAL(8,2) NULL COMMENT '地表水平辐射W/m^2',
-  normal_direct_radiation_wm2 DECIMAL(8,2) NULL COMMENT '法向直接辐射W/m^2',
-  scattered_radiation_wm2 DECIMAL(8,2) NULL COMMENT '散射辐射W/m^2',
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_weather_hebei_ts (ts),
-  CONSTRAINT fk_weather_hebei_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
-) ENGINE=InnoDB COMMENT='河北天气观测数据表';
-
--- 山西天气观测表
-CREATE TABLE IF NOT EXISTS weather_observation_shanxi (
-  id BIGINT PRIMARY KEY AUTO_INCREMENT,
-  province_id BIGINT NOT NULL DEFAULT 5 COMMENT '省份ID',
-  ts DATETIME NOT NULL COMMENT '观测时间',
-  temp_c DECIMAL(5,2) NULL COMMENT '气温℃',
-  humidity DECIMAL(5,2) NULL COMMENT '湿度%',
-  pressure_hpa DECIMAL(8,2) NULL COMMENT '气压hPa',
-  precip_mm DECIMAL(6,2) NULL COMMENT '降水量mm/h',
-  meridional_wind_ms DECIMAL(6,2) NULL COMMENT '经向风m/s',
-  zonal_wind_ms DECIMAL(6,2) NULL COMMENT '纬向风m/s',
-  wind_speed_ms DECIMAL(6,2) NULL COMMENT '地面风速m/s',
-  wind_dir_deg DECIMAL(6,2) NULL COMMENT '风向°',
-  surface_radiation_wm2 DECIMAL(8,2) NULL COMMENT '地表水平辐射W/m^2',
-  normal_direct_radiation_wm2 DECIMAL(8,2) NULL COMMENT '法向直接辐射W/m^2',
-  scattered_radiation_wm2 DECIMAL(8,2) NULL COMMENT '散射辐射W/m^2',
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_weather_shanxi_ts (ts),
-  CONSTRAINT fk_weather_shanxi_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
-) ENGINE=InnoDB COMMENT='山西天气观测数据表';
-
--- 内蒙古天气观测表
-CREATE TABLE IF NOT EXISTS weather_observation_neimenggu (
-  id BIGINT PRIMARY KEY AUTO_INCREMENT,
-  province_id BIGINT NOT NULL DEFAULT 6 COMMENT '省份ID',
-  ts DATETIME NOT NULL COMMENT '观测时间',
-  temp_c DECIMAL(5,2) NULL COMMENT '气温℃',
-  humidity DECIMAL(5,2) NULL COMMENT '湿度%',
-  pressure_hpa DECIMAL(8,2) NULL COMMENT '气压hPa',
-  precip_mm DECIMAL(6,2) NULL COMMENT '降水量mm/h',
-  meridional_wind_ms DECIMAL(6,2) NULL COMMENT '经向风m/s',
-  zonal_wind_ms DECIMAL(6,2) NULL COMMENT '纬向风m/s',
-  wind_speed_ms DECIMAL(6,2) NULL COMMENT '地面风速m/s',
-  wind_dir_deg DECIMAL(6,2) NULL COMMENT '风向°',
-  surface_radiation_wm2 DECIMAL(8,2) NULL COMMENT '地表水平辐射W/m^2',
-  normal_direct_radiation_wm2 DECIMAL(8,2) NULL COMMENT '法向直接辐射W/m^2',
-  scattered_radiation_wm2 DECIMAL(8,2) NULL COMMENT '散射辐射W/m^2',
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_weather_neimenggu_ts (ts),
-  CONSTRAINT fk_weather_neimenggu_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
-) ENGINE=InnoDB COMMENT='内蒙古天气观测数据表';
-
--- 辽宁天气观测表
-CREATE TABLE IF NOT EXISTS weather_observation_liaoning (
-  id BIGINT PRIMARY KEY AUTO_INCREMENT,
-  province_id BIGINT NOT NULL DEFAULT 7 COMMENT '省份ID',
-  ts DATETIME NOT NULL COMMENT '观测时间',
-  temp_c DECIMAL(5,2) NULL COMMENT '气温℃',
-  humidity DECIMAL(5,2) NULL COMMENT '湿度%',
-  pressure_hpa DECIMAL(8,2) NULL COMMENT '气压hPa',
-  precip_mm DECIMAL(6,2) NULL COMMENT '降水量mm/h',
-  meridional_wind_ms DECIMAL(6,2) NULL COMMENT '经向风m/s',
-  zonal_wind_ms DECIMAL(6,2) NULL COMMENT '纬向风m/s',
-  wind_speed_ms DECIMAL(6,2) NULL COMMENT '地面风速m/s',
-  wind_dir_deg DECIMAL(6,2) NULL COMMENT '风向°',
-  surface_radiation_wm2 DECIMAL(8,2) NULL COMMENT '地表水平辐射W/m^2',
-  normal_direct_radiation_wm2 DECIMAL(8,2) NULL COMMENT '法向直接辐射W/m^2',
-  scattered_radiation_wm2 DECIMAL(8,2) NULL COMMENT '散射辐射W/m^2',
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_weather_liaoning_ts (ts),
-  CONSTRAINT fk_weather_liaoning_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
-) ENGINE=InnoDB COMMENT='辽宁天气观测数据表';
-
--- 吉林天气观测表
-CREATE TABLE IF NOT EXISTS weather_observation_jilin (
-  id BIGINT PRIMARY KEY AUTO_INCREMENT,
-  province_id BIGINT NOT NULL DEFAULT 8 COMMENT '省份ID',
+-- 天气观测表（所有省份共用一张表，支持13列完整数据）
+-- 按年份 RANGE 分区、按省份 HASH 子分区：按省份和时间范围的查询只访问对应分区。
+-- 分区表不支持外键，province_id 的有效性由导入工具保证；
+-- 分区键必须包含在主键中，因此以 (province_id, ts) 作为主键。
+CREATE TABLE IF NOT EXISTS weather_observation (
+  province_id BIGINT NOT NULL COMMENT '省份ID',
   ts DATETIME NOT NULL COMMENT '观测时间',
   temp_c DECIMAL(5,2) NULL COMMENT '气温℃',
   humidity DECIMAL(5,2) NULL COMMENT '湿度%',
@@ -191,32 +45,73 @@ CREATE TABLE IF NOT EXISTS weather_observation_jilin (
   normal_direct_radiation_wm2 DECIMAL(8,2) NULL COMMENT '法向直接辐射W/m^2',
   scattered_radiation_wm2 DECIMAL(8,2) NULL COMMENT '散射辐射W/m^2',
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_weather_jilin_ts (ts),
-  CONSTRAINT fk_weather_jilin_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
-) ENGINE=InnoDB COMMENT='吉林天气观测数据表';
+  PRIMARY KEY (province_id, ts),
+  INDEX idx_weather_ts (ts)
+) ENGINE=InnoDB COMMENT='天气观测数据表'
+PARTITION BY RANGE (YEAR(ts))
+SUBPARTITION BY HASH (province_id) SUBPARTITIONS 16 (
+  PARTITION p2020 VALUES LESS THAN (2021),
+  PARTITION p2021 VALUES LESS THAN (2022),
+  PARTITION p2022 VALUES LESS THAN (2023),
+  PARTITION p2023 VALUES LESS THAN (2024),
+  PARTITION p2024 VALUES LESS THAN (2025),
+  PARTITION p2025 VALUES LESS THAN (2026),
+  PARTITION p2026 VALUES LESS THAN (2027),
+  PARTITION p2027 VALUES LESS THAN (2028),
+  PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+
+-- 气象数据导入检查点表（增量导入的高水位线，中断后从此处继续）
+CREATE TABLE IF NOT EXISTS import_checkpoint (
+  province_id BIGINT NOT NULL COMMENT '省份ID',
+  source_file VARCHAR(255) NULL COMMENT '最近导入的文件',
+  last_ts DATETIME NULL COMMENT '已导入的最新观测时间',
+  rows_imported BIGINT NOT NULL DEFAULT 0 COMMENT '累计导入行数',
+  row_count BIGINT NULL COMMENT '该省份当前观测行数（导入后更新，供系统状态使用）',
+  rollup_ts DATETIME NULL COMMENT '汇总表已覆盖的最新观测时间（汇总水位线）',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (province_id),
+  CONSTRAINT fk_import_checkpoint_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='气象数据导入检查点表';
 
--- 黑龙江天气观测表
-CREATE TABLE IF NOT EXISTS weather_observation_heilongjiang (
-  id BIGINT PRIMARY KEY AUTO_INCREMENT,
-  province_id BIGINT NOT NULL DEFAULT 9 COMMENT '省份ID',
-  ts DATETIME NOT NULL COMMENT '观测时间',
-  temp_c DECIMAL(5,2) NULL COMMENT '气温℃',
-  humidity DECIMAL(5,2) NULL COMMENT '湿度%',
-  pressure_hpa DECIMAL(8,2) NULL COMMENT '气压hPa',
-  precip_mm DECIMAL(6,2) NULL COMMENT '降水量mm/h',
-  meridional_wind_ms DECIMAL(6,2) NULL COMMENT '经向风m/s',
-  zonal_wind_ms DECIMAL(6,2) NULL COMMENT '纬向风m/s',
-  wind_speed_ms DECIMAL(6,2) NULL COMMENT '地面风速m/s',
-  wind_dir_deg DECIMAL(6,2) NULL COMMENT '风向°',
-  surface_radiation_wm2 DECIMAL(8,2) NULL COMMENT '地表水平辐射W/m^2',
-  normal_direct_radiation_wm2 DECIMAL(8,2) NULL COMMENT '法向直接辐射W/m^2',
-  scattered_radiation_wm2 DECIMAL(8,2) NULL COMMENT '散射辐射W/m^2',
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_weather_heilongjiang_ts (ts),
-  CONSTRAINT fk_weather_heilongjiang_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
-) ENGINE=InnoDB COMMENT='黑龙江天气观测数据表';
+-- 气象数据月度汇总表（由导入工具维护，供多年发电量预测等汇总查询使用）
+CREATE TABLE IF NOT EXISTS weather_monthly_stats (
+  province_id BIGINT NOT NULL COMMENT '省份ID',
+  obs_year SMALLINT NOT NULL COMMENT '年份',
+  obs_month TINYINT NOT NULL COMMENT '月份',
+  hours INT NOT NULL DEFAULT 0 COMMENT '有效小时数（辐射和温度均不为空）',
+  radiation_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '地表辐射总量(W/m²·h)',
+  radiation_temp_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '温度加权辐射总量 sum(辐射*温度)',
+  temp_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '温度总量(℃·h)',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (province_id, obs_year, obs_month),
+  CONSTRAINT fk_weather_monthly_stats_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='气象数据月度汇总表';
 
+-- 气象数据日汇总表（由导入工具维护，供日/月分辨率的发电量汇总使用）
+CREATE TABLE IF NOT EXISTS weather_daily_stats (
+  province_id BIGINT NOT NULL COMMENT '省份ID',
+  obs_date DATE NOT NULL COMMENT '日期',
+  hours INT NOT NULL DEFAULT 0 COMMENT '小时数',
+  radiation_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '地表辐射总量(W/m²·h，缺测记0)',
+  radiation_temp_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '温度加权辐射总量 sum(辐射*温度，温度缺测按25℃)',
+  wind_speed_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '地面风速总量(m/s·h)',
+  wind_speed_max DOUBLE NULL COMMENT '最大地面风速(m/s)',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (province_id, obs_date),
+  CONSTRAINT fk_weather_daily_stats_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='气象数据日汇总表';
 
+-- 地面风速日直方图（区间宽度 0.5 m/s，第 bin_index 个区间为 [bin_index*0.5, (bin_index+1)*0.5)）
+CREATE TABLE IF NOT EXISTS weather_wind_histogram (
+  province_id BIGINT NOT NULL COMMENT '省份ID',
+  obs_date DATE NOT NULL COMMENT '日期',
+  bin_index SMALLINT NOT NULL COMMENT '风速区间序号',
+  hours INT NOT NULL DEFAULT 0 COMMENT '小时数',
+  PRIMARY KEY (province_id, obs_date, bin_index),
+  CONSTRAINT fk_weather_wind_histogram_province FOREIGN KEY (province_id) REFERENCES province(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='地面风速日直方图';
 
 -- 插入省份数据（只包含9个省市）
 INSERT IGNORE INTO province (name, code) VALUES
@@ -265,8 +160,9 @@ CREATE TABLE IF NOT EXISTS pv_forecast_config (
 CREATE TABLE IF NOT EXISTS pv_forecast_result (
   id BIGINT PRIMARY KEY AUTO_INCREMENT,
   station_id BIGINT NOT NULL COMMENT '站点ID',
+  config_hash CHAR(32) NOT NULL DEFAULT '' COMMENT '预测参数哈希',
   forecast_time DATETIME NOT NULL COMMENT '预测时间',
-  hourly_generation_kwh DECIMAL(10,4) NOT NULL COMMENT '小时发电量(kWh)',
+  hourly_generation_kwh DECIMAL(14,4) NOT NULL COMMENT '小时发电量(kWh)',
   daily_generation_kwh DECIMAL(10,4) NULL COMMENT '日发电量(kWh)',
   monthly_generation_kwh DECIMAL(10,4) NULL COMMENT '月发电量(kWh)',
   yearly_generation_kwh DECIMAL(10,4) NULL COMMENT '年发电量(kWh)',
@@ -275,6 +171,7 @@ CREATE TABLE IF NOT EXISTS pv_forecast_result (
   efficiency_factor DECIMAL(6,4) NULL COMMENT '效率因子',
   degradation_factor DECIMAL(6,4) NULL COMMENT '衰减因子',
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uk_pv_result_station_config_time (station_id, config_hash, forecast_time),
   INDEX idx_pv_result_station_time (station_id, forecast_time),
   INDEX idx_pv_result_time (forecast_time),
   CONSTRAINT fk_pv_result_station FOREIGN KEY (station_id) REFERENCES station(id) ON DELETE CASCADE
@@ -284,20 +181,53 @@ CREATE TABLE IF NOT EXISTS pv_forecast_result (
 CREATE TABLE IF NOT EXISTS pv_yearly_forecast (
   id BIGINT PRIMARY KEY AUTO_INCREMENT,
   station_id BIGINT NOT NULL COMMENT '站点ID',
+  config_hash CHAR(32) NOT NULL DEFAULT '' COMMENT '预测参数哈希',
   forecast_year INT NOT NULL COMMENT '预测年份',
-  total_generation_kwh DECIMAL(12,4) NOT NULL COMMENT '年总发电量(kWh)',
+  total_generation_kwh DECIMAL(16,4) NOT NULL COMMENT '年总发电量(kWh)',
   peak_generation_month INT NULL COMMENT '发电量最高月份',
   peak_generation_kwh DECIMAL(10,4) NULL COMMENT '最高月发电量(kWh)',
   average_daily_generation_kwh DECIMAL(10,4) NULL COMMENT '平均日发电量(kWh)',
   capacity_factor DECIMAL(6,4) NULL COMMENT '容量因子',
   degradation_factor DECIMAL(6,4) NULL COMMENT '衰减因子',
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  UNIQUE KEY uk_pv_yearly_station_year (station_id, forecast_year),
+  UNIQUE KEY uk_pv_yearly_station_config_year (station_id, config_hash, forecast_year),
   INDEX idx_pv_yearly_station (station_id),
   INDEX idx_pv_yearly_year (forecast_year),
   CONSTRAINT fk_pv_yearly_station FOREIGN KEY (station_id) REFERENCES station(id) ON DELETE CASCADE
 ) ENGINE=InnoDB COMMENT='光伏发电年度预测表';
 
+-- 风电预测结果表
+CREATE TABLE IF NOT EXISTS wind_forecast_result (
+  id BIGINT PRIMARY KEY AUTO_INCREMENT,
+  station_id BIGINT NOT NULL COMMENT '站点ID',
+  config_hash CHAR(32) NOT NULL COMMENT '预测参数哈希',
+  forecast_time DATETIME NOT NULL COMMENT '预测时间',
+  wind_speed_10m_ms DOUBLE NULL COMMENT '10米风速(m/s)',
+  wind_speed_hub_ms DECIMAL(7,3) NULL COMMENT '轮毂高度风速(m/s)',
+  hourly_generation_kwh DECIMAL(14,4) NOT NULL COMMENT '小时发电量(kWh)',
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uk_wind_result_station_config_time (station_id, config_hash, forecast_time),
+  INDEX idx_wind_result_station_time (station_id, forecast_time),
+  CONSTRAINT fk_wind_result_station FOREIGN KEY (station_id) REFERENCES station(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='风电预测结果表';
+
+-- 已保存的预测结果：每次保存记录参数哈希、时间范围和所用气象数据的版本，
+-- 相同参数、范围被覆盖且气象数据未变化的请求直接读取结果表
+CREATE TABLE IF NOT EXISTS forecast_result_run (
+  id BIGINT PRIMARY KEY AUTO_INCREMENT,
+  kind VARCHAR(16) NOT NULL COMMENT '结果类型 pv/wind/pv_yearly',
+  station_id BIGINT NOT NULL COMMENT '站点ID',
+  config_hash CHAR(32) NOT NULL COMMENT '预测参数哈希',
+  start_time DATETIME NOT NULL COMMENT '开始时间',
+  end_time DATETIME NOT NULL COMMENT '结束时间',
+  data_points INT NOT NULL COMMENT '结果行数',
+  weather_version CHAR(16) NOT NULL COMMENT '气象数据版本',
+  summary JSON NULL COMMENT '汇总信息',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  UNIQUE KEY uk_forecast_run (kind, station_id, config_hash, start_time, end_time),
+  CONSTRAINT fk_forecast_run_station FOREIGN KEY (station_id) REFERENCES station(id) ON DELETE CASCADE
+) ENGINE=InnoDB COMMENT='已保存的预测结果';
+
 
 
 
@@ -5,10 +5,17 @@
 """
 
 import os
+import re
 import csv
+import time
+import argparse
 import mysql.connector
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import chardet
+import rollups
 
 # 数据库配置
 DB_CONFIG = {
@@ -20,25 +27,45 @@ DB_CONFIG = {
     'charset': 'utf8mb4'
 }
 
+# 每批插入的行数（executemany 会合并为多行 INSERT）
+BATCH_SIZE = 2000
+
 # 文件映射
 FILE_MAPPING = {
-    "北京.csv": {"province": "北京", "station": "北京", "table": "weather_observation_beijing"},
-    "上海.csv": {"province": "上海", "station": "上海", "table": "weather_observation_shanghai"},
-    "天津.csv": {"province": "天津", "station": "天津", "table": "weather_observation_tianjin"},
-    "河北.csv": {"province": "河北", "station": "河北", "table": "weather_observation_hebei"},
-    "山西.csv": {"province": "山西", "station": "山西", "table": "weather_observation_shanxi"},
-    "内蒙古.csv": {"province": "内蒙古", "station": "内蒙古", "table": "weather_observation_neimenggu"},
-    "辽宁.csv": {"province": "辽宁", "station": "辽宁", "table": "weather_observation_liaoning"},
-    "吉林.csv": {"province": "吉林", "station": "吉林", "table": "weather_observation_jilin"},
-    "黑龙江.csv": {"province": "黑龙江", "station": "黑龙江", "table": "weather_observation_heilongjiang"},
+    "北京.csv": {"province": "北京", "station": "北京"},
+    "上海.csv": {"province": "上海", "station": "上海"},
+    "天津.csv": {"province": "天津", "station": "天津"},
+    "河北.csv": {"province": "河北", "station": "河北"},
+    "山西.csv": {"province": "山西", "station": "山西"},
+    "内蒙古.csv": {"province": "内蒙古", "station": "内蒙古"},
+    "辽宁.csv": {"province": "辽宁", "station": "辽宁"},
+    "吉林.csv": {"province": "吉林", "station": "吉林"},
+    "黑龙江.csv": {"province": "黑龙江", "station": "黑龙江"},
 }
 
-def detect_encoding(file_path):
-    """检测文件编码"""
+# 编码检测只读取文件开头的样本
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+# CSV列名，按数据库插入顺序排列（日期、时间之后的11个数值列）
+NUMERIC_COLUMNS = [
+    '气温℃', '湿度%', '气压hPa', '降水量mm/h', '经向风m/s', '纬向风m/s',
+    '地面风速m/s', '风向°', '地表水平辐射W/m^2', '法向直接辐射W/m^2', '散射辐射W/m^2'
+]
+
+def detect_encoding(file_path, sample_size=ENCODING_SAMPLE_BYTES):
+    """根据文件开头的样本检测文件编码"""
     with open(file_path, 'rb') as f:
-        raw_data = f.read()
-        result = chardet.detect(raw_data)
-        return result['encoding']
+        raw_data = f.read(sample_size)
+    
+    # 截断到最后一个完整行，避免半个多字节字符影响检测
+    if len(raw_data) == sample_size and b'\n' in raw_data:
+        raw_data = raw_data[:raw_data.rfind(b'\n') + 1]
+    
+    encoding = chardet.detect(raw_data)['encoding'] or 'utf-8'
+    # 样本里是 GB2312 不代表全文都是，用兼容的 GB18030 解码
+    if encoding.lower() in ('gb2312', 'gbk'):
+        encoding = 'gb18030'
+    return encoding
 
 def get_db_connection():
     """获取数据库连接"""
@@ -84,21 +111,184 @@ def clean_numeric_value(value):
     except (ValueError, TypeError):
         return None
 
-def import_csv_file(csv_file, province, station, table_name):
-    """导入单个CSV文件"""
+# 支持的日期格式：2022-01-01、2022/1/1；时间格式：00:00、00:00:00
+DATE_PATTERN = re.compile(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})')
+TIME_PATTERN = re.compile(r'(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?')
+
+@lru_cache(maxsize=8192)
+def parse_date(date_str):
+    """解析日期为当天零点，无法解析时返回None（结果缓存，同一天只解析一次）"""
+    match = DATE_PATTERN.fullmatch(date_str)
+    if not match:
+        return None
+    try:
+        return datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def parse_time_offset(time_str):
+    """解析时间为距零点的偏移量，无法解析时返回None；不含冒号视为零点"""
+    if ':' not in time_str:
+        return timedelta(0)
+    match = TIME_PATTERN.fullmatch(time_str)
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2))
+    second = int(match.group(3) or 0)
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    return timedelta(hours=hour, minutes=minute, seconds=second)
+
+def parse_timestamp(date_str, time_str):
+    """解析日期和时间列，无法解析时返回None"""
+    day_start = parse_date(date_str)
+    offset = parse_time_offset(time_str)
+    if day_start is None or offset is None:
+        return None
+    return day_start + offset
+
+def parse_number(text):
+    """快速解析数值：空值、nan、null、none 等返回None"""
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    # float('nan') 可以解析，但按缺测处理
+    return None if value != value else value
+
+class WeatherCsvReader:
+    """流式读取气象CSV文件
+    
+    边读边查找"日期,时间"列标题行，之后逐行产出 (行号, (ts, 11个数值列))，
+    内存占用与文件大小无关。无法解析的行计入 skipped。
+    """
+    
+    def __init__(self, csv_file, encoding=None):
+        self.csv_file = csv_file
+        self.encoding = encoding or detect_encoding(csv_file)
+        self.header_line = None
+        self.headers = None
+        self.skipped = 0
+        self._file = None
+        self._reader = None
+    
+    def __enter__(self):
+        self._file = open(self.csv_file, 'r', encoding=self.encoding, errors='ignore', newline='')
+        self._reader = csv.reader(self._file)
+        for row in self._reader:
+            cells = [cell.strip() for cell in row]
+            if '日期' in cells and '时间' in cells:
+                self.header_line = self._reader.line_num
+                self.headers = cells
+                break
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+    
+    def __iter__(self):
+        if self.headers is None:
+            return
+        headers = self.headers
+        width = len(headers)
+        date_index = headers.index('日期')
+        time_index = headers.index('时间')
+        # 缺失的列指向补齐的空白位置，解析为None
+        numeric_getter = itemgetter(*[
+            headers.index(name) if name in headers else width for name in NUMERIC_COLUMNS
+        ])
+        padding = [''] * (width + 1)
+        
+        for row in self._reader:
+            if not row:
+                continue
+            if len(row) != width + 1:
+                row = (row + padding)[:width + 1]
+            
+            ts = parse_timestamp(row[date_index].strip(), row[time_index].strip())
+            if ts is None:
+                self.skipped += 1
+                continue
+            
+            yield self._reader.line_num, (ts, *map(parse_number, numeric_getter(row)))
+
+# 导入检查点：与数据在同一事务中更新，中断后从最后提交的批次继续
+CHECKPOINT_SQL = """
+    INSERT INTO import_checkpoint (province_id, source_file, last_ts, rows_imported)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    source_file = VALUES(source_file),
+    last_ts = GREATEST(COALESCE(last_ts, VALUES(last_ts)), VALUES(last_ts)),
+    rows_imported = rows_imported + VALUES(rows_imported)
+"""
+
+# 省份的实际行数（只扫描该省份的分区），供系统状态接口直接读取
+ROW_COUNT_SQL = """
+    UPDATE import_checkpoint
+    SET row_count = (SELECT COUNT(*) FROM weather_observation WHERE province_id = %s)
+    WHERE province_id = %s
+"""
+
+# 汇总水位线：汇总表已覆盖到的 last_ts，与汇总表刷新在同一事务中推进
+ROLLUP_WATERMARK_SQL = """
+    UPDATE import_checkpoint SET rollup_ts = last_ts WHERE province_id = %s
+"""
+
+def rollup_start(cursor, province_id, first_new_ts):
+    """需要重新汇总的起始时间，不需要刷新时返回 (False, None)
+
+    检查点领先于汇总水位线（包括此前中断、已提交但未汇总的批次）时，
+    从水位线和本次首个新数据中较早的时间开始刷新；没有水位线时全部重新汇总。
+    """
+    cursor.execute("SELECT last_ts, rollup_ts FROM import_checkpoint WHERE province_id = %s", (province_id,))
+    result = cursor.fetchone()
+    if not result or result[0] is None:
+        return False, None
+    last_ts, rollup_ts = result
+    if rollup_ts is not None and rollup_ts >= last_ts and first_new_ts is None:
+        return False, None
+    if rollup_ts is None:
+        return True, None
+    return True, min(rollup_ts, first_new_ts) if first_new_ts is not None else rollup_ts
+
+def get_high_water_mark(cursor, province_id):
+    """获取已导入的最新观测时间（检查点优先，没有检查点时取表中最大时间）"""
+    cursor.execute("SELECT last_ts FROM import_checkpoint WHERE province_id = %s", (province_id,))
+    result = cursor.fetchone()
+    if result and result[0]:
+        return result[0]
+    cursor.execute("SELECT MAX(ts) FROM weather_observation WHERE province_id = %s", (province_id,))
+    result = cursor.fetchone()
+    return result[0] if result else None
+
+def flush_batch(conn, cursor, insert_sql, batch, checkpoint=None):
+    """批量写入一批数据，连同检查点一起提交"""
+    if batch:
+        cursor.executemany(insert_sql, batch)
+        if checkpoint:
+            province_id, source_file = checkpoint
+            last_ts = max(row[1] for row in batch)
+            cursor.execute(CHECKPOINT_SQL, (province_id, source_file, last_ts, len(batch)))
+        conn.commit()
+        batch.clear()
+
+def import_csv_file(csv_file, province, station, batch_size=BATCH_SIZE, full=False):
+    """导入单个CSV文件，成功时返回导入统计
+    
+    默认增量导入：跳过不晚于高水位线的行，其余行按 (province_id, ts) 唯一键
+    upsert，重复运行不会产生重复数据。full=True 时忽略高水位线重新导入整个文件。
+    """
     print(f"🔄 正在导入: {csv_file}")
     print(f"   省份: {province}")
     print(f"   站点: {station}")
-    print(f"   目标表: {table_name}")
-    
-    # 检测编码
-    encoding = detect_encoding(csv_file)
-    print(f"   编码: {encoding}")
     
-    # 获取数据库连接
+    # 获取数据库连接（并行导入时每个文件使用独立连接）
     conn = get_db_connection()
     if not conn:
-        return False
+        return None
+    
+    start_time = time.perf_counter()
     
     try:
         # 检查省份是否存在
@@ -107,139 +297,98 @@ def import_csv_file(csv_file, province, station, table_name):
         province_result = cursor.fetchone()
         if not province_result:
             print(f"   ❌ 省份 {province} 不存在，请先创建省份数据")
-            return False
+            return None
+        province_id = province_result[0]
         
-        # 读取CSV文件
-        with open(csv_file, 'r', encoding=encoding, errors='ignore') as f:
-            lines = f.readlines()
-            
-            # 找到真正的数据开始行（包含"日期,时间"的行）
-            data_start_line = 0
-            for i, line in enumerate(lines):
-                if '日期' in line and '时间' in line:
-                    data_start_line = i
-                    break
+        high_water_mark = None if full else get_high_water_mark(cursor, province_id)
+        print(f"   高水位线: {high_water_mark or '无（导入全部数据）'}")
+        checkpoint = (province_id, os.path.basename(csv_file))
+        
+        # 流式读取CSV文件
+        with WeatherCsvReader(csv_file) as reader:
+            print(f"   编码: {reader.encoding}")
             
-            if data_start_line == 0:
+            if reader.headers is None:
                 print("   ❌ 未找到数据开始行")
-                return False
-            
-            print(f"   列标题在第 {data_start_line + 1} 行")
-            print(f"   数据从第 {data_start_line + 2} 行开始")
-            
-            # 从数据开始行创建CSV读取器（跳过列标题行）
-            reader = csv.DictReader(lines[data_start_line:])
-            
-            # 获取列名
-            headers = reader.fieldnames
-            print(f"   列名: {headers}")
+                return None
             
-            # 调试：显示前几行数据
-            print("   前3行数据示例:")
-            for i, row in enumerate(reader):
-                if i >= 3:
-                    break
-                print(f"     行{i+1}: {dict(row)}")
-            
-            # 重新创建reader，因为上面已经消费了一些行
-            reader = csv.DictReader(lines[data_start_line:])
+            print(f"   列标题在第 {reader.header_line} 行")
+            print(f"   数据从第 {reader.header_line + 1} 行开始")
+            print(f"   列名: {reader.headers}")
             
             # 准备插入语句
-            cursor = conn.cursor()
+            insert_sql = """
+                INSERT INTO weather_observation 
+                (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, 
+                 meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, 
+                 surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                temp_c = VALUES(temp_c), humidity = VALUES(humidity),
+                pressure_hpa = VALUES(pressure_hpa), precip_mm = VALUES(precip_mm),
+                meridional_wind_ms = VALUES(meridional_wind_ms), zonal_wind_ms = VALUES(zonal_wind_ms),
+                wind_speed_ms = VALUES(wind_speed_ms), wind_dir_deg = VALUES(wind_dir_deg),
+                surface_radiation_wm2 = VALUES(surface_radiation_wm2),
+                normal_direct_radiation_wm2 = VALUES(normal_direct_radiation_wm2),
+                scattered_radiation_wm2 = VALUES(scattered_radiation_wm2)
+            """
+            batch = []
             insert_count = 0
-            skip_count = 0
+            existing_count = 0
+            first_new_ts = None
             
             print(f"   开始处理数据行...")
             
-            for row_num, row in enumerate(reader, 1):
-                try:
-                    # 解析时间
-                    date_str = row.get('日期', '')
-                    time_str = row.get('时间', '')
-                    
-                    if not date_str or not time_str:
-                        continue
-                    
-                    # 尝试解析时间格式
-                    try:
-                        if '/' in date_str:
-                            date_parts = date_str.split('/')
-                            if len(date_parts) == 3:
-                                year, month, day = date_parts
-                                date_obj = datetime(int(year), int(month), int(day))
-                            else:
-                                continue
-                        else:
-                            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                        
-                        # 处理时间
-                        if ':' in time_str:
-                            time_parts = time_str.split(':')
-                            if len(time_parts) >= 2:
-                                hour, minute = int(time_parts[0]), int(time_parts[1])
-                                second = int(time_parts[2]) if len(time_parts) > 2 else 0
-                                ts = datetime.combine(date_obj.date(), datetime.min.time().replace(hour=hour, minute=minute, second=second))
-                            else:
-                                ts = date_obj
-                        else:
-                            ts = date_obj
-                    except:
-                        continue
-                    
-                    # 提取所有13列数据（根据实际CSV列名）
-                    temp_c = clean_numeric_value(row.get('气温℃'))
-                    humidity = clean_numeric_value(row.get('湿度%'))
-                    pressure_hpa = clean_numeric_value(row.get('气压hPa'))
-                    precip_mm = clean_numeric_value(row.get('降水量mm/h'))
-                    meridional_wind_ms = clean_numeric_value(row.get('经向风m/s'))
-                    zonal_wind_ms = clean_numeric_value(row.get('纬向风m/s'))
-                    wind_speed_ms = clean_numeric_value(row.get('地面风速m/s'))
-                    wind_dir_deg = clean_numeric_value(row.get('风向°'))
-                    surface_radiation_wm2 = clean_numeric_value(row.get('地表水平辐射W/m^2'))
-                    normal_direct_radiation_wm2 = clean_numeric_value(row.get('法向直接辐射W/m^2'))
-                    scattered_radiation_wm2 = clean_numeric_value(row.get('散射辐射W/m^2'))
-                    
-                    # 获取省份ID
-                    cursor.execute("SELECT id FROM province WHERE name = %s", (province,))
-                    province_result = cursor.fetchone()
-                    if not province_result:
-                        print(f"   ❌ 省份 {province} 不存在")
-                        continue
-                    province_id = province_result[0]
-                    
-                    # 插入数据到对应的地区表（包含所有13列字段）
-                    cursor.execute(f"""
-                        INSERT INTO {table_name} 
-                        (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, 
-                         meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg, 
-                         surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (province_id, ts, temp_c, humidity, pressure_hpa, precip_mm, 
-                          meridional_wind_ms, zonal_wind_ms, wind_speed_ms, wind_dir_deg,
-                          surface_radiation_wm2, normal_direct_radiation_wm2, scattered_radiation_wm2))
-                    
-                    insert_count += 1
-                    
-                    if insert_count % 5000 == 0:
-                        print(f"   📊 已导入 {insert_count} 条记录...")
-                        conn.commit()
-                        
-                except Exception as e:
-                    skip_count += 1
-                    if skip_count <= 5:  # 只显示前5个错误
-                        print(f"   ⚠️  跳过第{row_num}行: {e}")
-                    elif skip_count == 6:
-                        print(f"   ⚠️  还有更多错误行被跳过...")
+            for line_num, values in reader:
+                # 已导入过的行直接跳过
+                if high_water_mark is not None and values[0] <= high_water_mark:
+                    existing_count += 1
                     continue
+                
+                # 调试：显示前几行数据
+                if insert_count + len(batch) < 3:
+                    print(f"     第{line_num}行: {values}")
+                
+                batch.append((province_id,) + values)
+                if first_new_ts is None or values[0] < first_new_ts:
+                    first_new_ts = values[0]
+                
+                if len(batch) >= batch_size:
+                    insert_count += len(batch)
+                    flush_batch(conn, cursor, insert_sql, batch, checkpoint)
+                    if insert_count % (batch_size * 5) == 0:
+                        print(f"   📊 {province} 已导入 {insert_count} 条记录...")
+            
+            insert_count += len(batch)
+            flush_batch(conn, cursor, insert_sql, batch, checkpoint)
+            skip_count = reader.skipped
             
-            conn.commit()
-            print(f"   ✅ 成功导入 {insert_count} 条记录")
-            print(f"   ⚠️  跳过 {skip_count} 条无效记录")
-            return True
+            # 刷新受影响月份的汇总表和系统状态使用的行数，同时推进汇总水位线
+            refresh, since = rollup_start(cursor, province_id, first_new_ts)
+            if refresh:
+                rollups.refresh_rollups(cursor, province_id, since)
+                cursor.execute(ROW_COUNT_SQL, (province_id, province_id))
+                cursor.execute(ROLLUP_WATERMARK_SQL, (province_id,))
+                conn.commit()
+            
+            elapsed = time.perf_counter() - start_time
+            rows_per_sec = insert_count / elapsed if elapsed > 0 else 0.0
+            print(f"   ✅ {province} 成功导入 {insert_count} 条记录 "
+                  f"({elapsed:.2f} 秒, {rows_per_sec:.0f} 行/秒)")
+            print(f"   ⏭️  {province} 已存在 {existing_count} 条记录（跳过）")
+            print(f"   ⚠️  {province} 跳过 {skip_count} 条无效记录")
+            return {
+                'file': os.path.basename(csv_file),
+                'rows': insert_count,
+                'existing': existing_count,
+                'skipped': skip_count,
+                'seconds': elapsed,
+                'rows_per_sec': rows_per_sec
+            }
             
     except Exception as e:
-        print(f"   ❌ 导入失败: {e}")
-        return False
+        print(f"   ❌ {province} 导入失败: {e}")
+        return None
     finally:
         conn.close()
 
@@ -261,12 +410,21 @@ def find_csv_files(directory="data"):
         return []
 
 def main():
+    parser = argparse.ArgumentParser(description="简化版气象数据导入工具")
+    parser.add_argument('--data-dir', default='data', help='CSV文件所在目录')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='并行导入的文件数（每个文件使用独立的数据库连接）')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='每批插入的行数')
+    parser.add_argument('--full', action='store_true',
+                        help='忽略高水位线，重新导入整个文件（已存在的行会被覆盖更新）')
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("🌤️  简化版气象数据导入工具")
     print("=" * 60)
     
     # 查找CSV文件
-    csv_files = find_csv_files()
+    csv_files = find_csv_files(args.data_dir)
     
     if not csv_files:
         print("❌ 在data目录中未找到支持的CSV文件")
@@ -277,30 +435,45 @@ def main():
         filename = os.path.basename(file)
         print(f"   - {filename}")
     
+    workers = max(1, min(args.workers, len(csv_files)))
     print("\n" + "=" * 60)
-    print("开始导入数据...")
+    mode = "全量" if args.full else "增量"
+    print(f"开始{mode}导入数据（并行 {workers} 个文件，每批 {args.batch_size} 行）...")
     print("=" * 60)
     
-    success_count = 0
+    start_time = time.perf_counter()
+    results = []
     error_count = 0
     
-    for csv_file in csv_files:
-        filename = os.path.basename(csv_file)
-        mapping = FILE_MAPPING[filename]
-        province = mapping["province"]
-        station = mapping["station"]
-        table_name = mapping["table"]
-        
-        print(f"\n{'='*20} {filename} {'='*20}")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for csv_file in csv_files:
+            mapping = FILE_MAPPING[os.path.basename(csv_file)]
+            future = executor.submit(import_csv_file, csv_file, mapping["province"],
+                                     mapping["station"], args.batch_size, args.full)
+            futures[future] = csv_file
         
-        if import_csv_file(csv_file, province, station, table_name):
-            success_count += 1
-        else:
-            error_count += 1
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"   ❌ {os.path.basename(futures[future])} 导入失败: {e}")
+                result = None
+            if result:
+                results.append(result)
+            else:
+                error_count += 1
+    
+    elapsed = time.perf_counter() - start_time
+    total_rows = sum(r['rows'] for r in results)
     
     print("\n" + "=" * 60)
     print("🎉 导入完成!")
-    print(f"✅ 成功导入: {success_count} 个文件")
+    for r in sorted(results, key=lambda r: r['file']):
+        print(f"   {r['file']:<12} {r['rows']:>8} 行  {r['seconds']:>7.2f} 秒  {r['rows_per_sec']:>9.0f} 行/秒"
+              f"  (已存在 {r['existing']} 行)")
+    print(f"✅ 成功导入: {len(results)} 个文件，共 {total_rows} 条记录"
+          f"（{elapsed:.2f} 秒, {total_rows / elapsed if elapsed > 0 else 0:.0f} 行/秒）")
     print(f"❌ 失败: {error_count} 个文件")
     print("=" * 60)
 
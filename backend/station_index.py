@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+站点索引模块
+
+站点坐标和名称保存在内存索引中，附近站点查询和站点搜索不再扫描 station 表：
+    - 空间索引：站点坐标按经纬度网格（每格 cell_deg 度）分组
+        半径查询     按球面距离算出经纬度包围盒，只检查包围盒覆盖的网格中的站点，
+                     再用 haversine 公式计算实际距离
+        最近 N 个站点 从较小半径开始查询，站点不足时扩大半径
+    - 名称索引：站点名称和省份的单字、双字（n-gram）倒排表，关键词的所有
+      n-gram 的站点集合求交后再核对子串，与 LIKE '%关键词%' 的匹配结果相同
+索引随站点元数据快照（metadata_registry）一起构建，站点变化后重建。
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# 地球平均半径（公里）
+EARTH_RADIUS_KM = 6371.0088
+
+# 半个地球周长：超过该半径即包含全部站点
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+# 最近站点查询的初始半径及每次扩大的倍数
+NEAREST_START_KM = 50.0
+NEAREST_GROWTH = 4.0
+
+
+def haversine_km(lng1, lat1, lng2, lat2):
+    """球面距离（公里），参数为度，支持 NumPy 数组"""
+    lng1, lat1, lng2, lat2 = map(np.radians, (lng1, lat1, lng2, lat2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def ngrams(text: str) -> Set[str]:
+    """文本的单字和相邻双字集合"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _query_grams(keyword: str) -> Iterable[str]:
+    # 关键词的双字已能确定候选集合；单字关键词使用单字倒排表
+    if len(keyword) == 1:
+        return [keyword]
+    return {keyword[i:i + 2] for i in range(len(keyword) - 1)}
+
+
+def bounding_box(lng: float, lat: float, radius_km: float) -> Optional[Tuple[float, float, float, float]]:
+    """与 (lng, lat) 球面距离不超过 radius_km 的点所在的经纬度范围
+
+    返回 (lng_min, lng_max, lat_min, lat_max)；范围跨越极点或 ±180° 经线时返回 None。
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    lat_min, lat_max = lat - dlat, lat + dlat
+    if lat_min <= -90 or lat_max >= 90:
+        return None
+    dlng = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+    lng_min, lng_max = lng - dlng, lng + dlng
+    if lng_min < -180 or lng_max > 180:
+        return None
+    return lng_min, lng_max, lat_min, lat_max
+
+
+class StationIndex:
+    """站点坐标的网格索引和名称的 n-gram 索引（构建后只读）"""
+
+    def __init__(self, rows: List[Dict], version=None, cell_deg: float = 1.0):
+        self.version = version
+        self.cell_deg = cell_deg
+        self.stations = [
+            {'id': row['id'], 'name': row['name'], 'province': row['province'],
+             'lng': float(row['lng']), 'lat': float(row['lat'])}
+            for row in rows
+        ]
+        self.lng = np.array([station['lng'] for station in self.stations], dtype=float)
+        self.lat = np.array([station['lat'] for station in self.stations], dtype=float)
+
+        # 按网格排序，每个网格对应排序后下标数组中的一段
+        cell_x = np.floor(self.lng / cell_deg).astype(np.int64)
+        cell_y = np.floor(self.lat / cell_deg).astype(np.int64)
+        self._order = np.lexsort((cell_y, cell_x))
+        keys = list(zip(cell_x[self._order].tolist(), cell_y[self._order].tolist()))
+        self._cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        for position, key in enumerate(keys):
+            start, _ = self._cells.get(key, (position, position))
+            self._cells[key] = (start, position + 1)
+
+        # 名称和省份（忽略大小写）的 n-gram 倒排表
+        self._names = [station['name'].casefold() for station in self.stations]
+        self._provinces = [station['province'].casefold() for station in self.stations]
+        self._grams: Dict[str, Set[int]] = {}
+        for index, (name, province) in enumerate(zip(self._names, self._provinces)):
+            for gram in ngrams(name) | ngrams(province):
+                self._grams.setdefault(gram, set()).add(index)
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def _candidates(self, box: Optional[Tuple[float, float, float, float]]) -> np.ndarray:
+        """包围盒覆盖的网格中的站点下标"""
+        if box is None:
+            return np.arange(len(self.stations))
+        lng_min, lng_max, lat_min, lat_max = box
+        x0, x1 = math.floor(lng_min / self.cell_deg), math.floor(lng_max / self.cell_deg)
+        y0, y1 = math.floor(lat_min / self.cell_deg), math.floor(lat_max / self.cell_deg)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            # 包围盒覆盖的网格比有站点的网格还多时，直接按坐标过滤
+            mask = ((self.lng >= lng_min) & (self.lng <= lng_max)
+                    & (self.lat >= lat_min) & (self.lat <= lat_max))
+            return np.flatnonzero(mask)
+        slices = [
+            self._order[slice(*self._cells[(x, y)])]
+            for x in range(x0, x1 + 1) for y in range(y0, y1 + 1) if (x, y) in self._cells
+        ]
+        return np.concatenate(slices) if slices else np.zeros(0, dtype=np.int64)
+
+    def within(self, lng: float, lat: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """距离不超过 radius_km 的站点，返回按距离排序的 (下标, 距离)"""
+        box = bounding_box(lng, lat, radius_km) if radius_km < MAX_DISTANCE_KM else None
+        candidates = self._candidates(box)
+        distances = haversine_km(lng, lat, self.lng[candidates], self.lat[candidates])
+        keep = distances <= radius_km
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind='stable')
+        return candidates[order], distances[order]
+
+    def nearest(self, lng: float, lat: float, limit: int,
+                radius_km: Optional[float] = None) -> List[Dict]:
+        """最近的 limit 个站点（可限定半径），附带 distance_km"""
+        if radius_km is not None:
+            indices, distances = self.within(lng, lat, radius_km)
+        else:
+            # 半径内已有 limit 个站点时，半径外的站点不可能更近
+            radius = NEAREST_START_KM
+            while True:
+                indices, distances = self.within(lng, lat, radius)
+                if len(indices) >= limit or radius >= MAX_DISTANCE_KM:
+                    break
+                radius *= NEAREST_GROWTH
+        return [
+            {**self.stations[index], 'distance_km': round(distance, 3)}
+            for index, distance in zip(indices[:limit].tolist(), distances[:limit].tolist())
+        ]
+
+    def _rank(self, index: int, keyword: str) -> Optional[int]:
+        """匹配等级：名称完全相同 < 名称前缀 < 名称包含 < 省份相同 < 省份包含；不匹配返回 None"""
+        name, province = self._names[index], self._provinces[index]
+        if name == keyword:
+            return 0
+        if name.startswith(keyword):
+            return 1
+        if keyword in name:
+            return 2
+        if province == keyword:
+            return 3
+        if keyword in province:
+            return 4
+        return None
+
+    def search(self, keyword: str, limit: int) -> List[Dict]:
+        """按名称或省份搜索站点（子串匹配），按匹配等级、名称长度、ID 排序"""
+        keyword = keyword.strip().casefold()
+        if not keyword:
+            return self.stations[:limit]
+        postings = sorted((self._grams.get(gram, set()) for gram in _query_grams(keyword)), key=len)
+        candidates = set.intersection(*postings) if postings[0] else set()
+        ranked = []
+        for index in candidates:
+            rank = self._rank(index, keyword)
+            if rank is not None:
+                ranked.append((rank, len(self._names[index]), self.stations[index]['id'], index))
+        ranked.sort()
+        return [self.stations[index] for *_, index in ranked[:limit]]
+
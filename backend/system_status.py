@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+系统状态快照模块
+
+健康检查请求只读取内存中的状态快照，数据统计由 loader 定期刷新：
+快照超过刷新间隔后由下一次请求在后台触发刷新，请求本身不等待数据库。
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+
+class StatusMonitor:
+    """定期刷新的系统状态快照"""
+
+    def __init__(self, loader: Callable[[], Dict], refresh_interval: float = 30.0):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._data: Dict = {}
+        self._error: Optional[str] = None
+        self._refreshed_at: Optional[float] = None
+        self._refreshed_wall: Optional[datetime] = None
+        self._refreshing = False
+        self._refresh_count = 0
+        self._refresh_time = 0.0
+
+    @property
+    def ready(self) -> bool:
+        """是否已有快照（首次请求需要同步刷新）"""
+        return self._refreshed_at is not None
+
+    def begin_refresh(self) -> bool:
+        """快照已过期且没有正在进行的刷新时占用刷新权，返回是否需要刷新"""
+        with self._lock:
+            if self._refreshing:
+                return False
+            if (self._refreshed_at is not None
+                    and time.monotonic() - self._refreshed_at < self.refresh_interval):
+                return False
+            self._refreshing = True
+            return True
+
+    def refresh(self):
+        """执行 loader 更新快照（阻塞，应在数据库线程池中调用）"""
+        with self._lock:
+            self._refreshing = True
+        start = time.perf_counter()
+        try:
+            data, error = self.loader(), None
+        except Exception as e:
+            # HTTPException 的说明在 detail 中
+            data, error = None, str(getattr(e, 'detail', None) or e) or type(e).__name__
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if data is not None:
+                self._data = data
+            self._error = error
+            self._refreshed_at = time.monotonic()
+            self._refreshed_wall = datetime.now()
+            self._refreshing = False
+            self._refresh_count += 1
+            self._refresh_time += elapsed
+
+    def snapshot(self) -> Dict:
+        """最近一次的统计数据及其刷新时间、错误信息"""
+        with self._lock:
+            age = time.monotonic() - self._refreshed_at if self._refreshed_at is not None else None
+            return {
+                **self._data,
+                'error': self._error,
+                'refreshed_at': self._refreshed_wall.isoformat() if self._refreshed_wall else None,
+                'age_s': round(age, 3) if age is not None else None,
+                'refresh_interval_s': self.refresh_interval,
+                'refreshes': self._refresh_count,
+                'avg_refresh_ms': round(self._refresh_time / self._refresh_count * 1000, 3)
+                if self._refresh_count else 0.0,
+            }
@@ -0,0 +1,97 @@
+"""Parity tests: float64 array path vs. the Decimal reference path.
+
+``power_curve_array`` and ``hourly_generation_array`` must agree with the
+per-hour ``hourly_power_kw`` reference to within ``POWER_CURVE_RTOL`` times the
+rated capacity (see wind_calculator.py).
+"""
+
+import numpy as np
+import pytest
+
+from wind_calculator import POWER_CURVE_RTOL, WindCalculator
+
+calculator = WindCalculator()
+
+# (cut_in, rated, cut_out, rated_capacity_kw)
+CURVES = [
+    (3.0, 12.0, 25.0, 2000.0),
+    (2.5, 11.3, 22.0, 1500.0),
+    (3.5, 13.0, 13.0, 850.0),
+]
+
+# Degenerate curves: rated equal to / below cut-in
+DEGENERATE_CURVES = [
+    (5.0, 5.0, 20.0, 1000.0),
+    (6.0, 4.0, 20.0, 1000.0),
+]
+
+
+def reference(speeds, cut_in, rated, cut_out, capacity):
+    return np.array([
+        calculator.hourly_power_kw(v, cut_in, rated, cut_out, capacity) for v in speeds
+    ])
+
+
+def curve_speeds(cut_in, rated, cut_out):
+    """Speeds covering every branch of the curve, including the exact edges."""
+    return np.concatenate([
+        [0.0, cut_in / 2, np.nextafter(cut_in, 0)],               # below cut-in
+        [cut_in],                                                  # at cut-in
+        np.linspace(cut_in, max(rated, cut_in), 37)[1:-1],         # cubic ramp
+        [rated],                                                   # at rated
+        np.linspace(max(rated, cut_in), cut_out, 11)[1:-1],        # rated plateau
+        [cut_out],                                                 # exactly at cut-out
+        [np.nextafter(cut_out, np.inf), cut_out + 0.5, 40.0],      # above cut-out
+    ])
+
+
+def assert_matches(actual, expected, capacity):
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=POWER_CURVE_RTOL * capacity)
+
+
+@pytest.mark.parametrize('cut_in, rated, cut_out, capacity', CURVES + DEGENERATE_CURVES)
+def test_power_curve_array_matches_decimal_reference(cut_in, rated, cut_out, capacity):
+    speeds = curve_speeds(cut_in, rated, cut_out)
+    actual = calculator.power_curve_array(speeds, cut_in, rated, cut_out, capacity)
+    assert_matches(actual, reference(speeds, cut_in, rated, cut_out, capacity), capacity)
+
+
+def test_power_curve_branches():
+    cut_in, rated, cut_out, capacity = CURVES[0]
+    power = calculator.power_curve_array(
+        [cut_in - 0.1, cut_in, (cut_in + rated) / 2, rated, 20.0, cut_out, cut_out + 0.1],
+        cut_in, rated, cut_out, capacity
+    )
+    assert power[0] == 0.0                       # below cut-in
+    assert power[1] == pytest.approx(0.0, abs=POWER_CURVE_RTOL * capacity)
+    assert 0.0 < power[2] < capacity             # cubic ramp
+    assert power[3] == pytest.approx(capacity)   # rated
+    assert power[4] == capacity                  # plateau
+    assert power[5] == capacity                  # exactly at cut-out still produces
+    assert power[6] == 0.0                       # above cut-out
+
+
+@pytest.mark.parametrize('cut_in, rated, cut_out, capacity', DEGENERATE_CURVES)
+def test_degenerate_curve(cut_in, rated, cut_out, capacity):
+    speeds = np.array([cut_in - 0.5, cut_in, cut_in + 0.5, cut_out, cut_out + 0.5])
+    actual = calculator.power_curve_array(speeds, cut_in, rated, cut_out, capacity)
+    np.testing.assert_array_equal(actual, [0.0, capacity, capacity, capacity, 0.0])
+    assert_matches(actual, reference(speeds, cut_in, rated, cut_out, capacity), capacity)
+
+
+@pytest.mark.parametrize('cut_in, rated, cut_out, capacity', CURVES + DEGENERATE_CURVES)
+@pytest.mark.parametrize('hub_height_m, num_turbines', [(10.0, 1), (80.0, 3), (0.0, 2)])
+def test_hourly_generation_array_matches_decimal_reference(cut_in, rated, cut_out, capacity,
+                                                           hub_height_m, num_turbines):
+    rng = np.random.default_rng(7)
+    wind_10m = np.concatenate([rng.uniform(0.0, 30.0, 500), [np.nan, 0.0, -1.0]])
+    wind_hub, generation = calculator.hourly_generation_array(
+        wind_10m, hub_height_m, capacity, cut_in, rated, cut_out, num_turbines
+    )
+
+    expected_hub = np.array([
+        calculator.adjust_wind_to_height(None if np.isnan(v) else v, hub_height_m) for v in wind_10m
+    ])
+    np.testing.assert_allclose(wind_hub, expected_hub, rtol=1e-12)
+    expected = reference(expected_hub, cut_in, rated, cut_out, capacity) * num_turbines
+    assert_matches(generation, expected, capacity * num_turbines)
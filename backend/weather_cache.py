@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+气象时间序列缓存模块
+
+按省份ID缓存整条小时级气象序列，序列以紧凑的 NumPy 数组保存，
+按时间范围的请求直接在缓存数组上切片。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+
+
+def to_datetime64(value) -> np.datetime64:
+    """把日期字符串或datetime转换为秒精度的datetime64"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip())
+    return np.datetime64(value, 's')
+
+
+def _float_column(rows: List[Dict], name: str) -> np.ndarray:
+    return np.fromiter(
+        (np.nan if row.get(name) is None else float(row[name]) for row in rows),
+        dtype=float, count=len(rows)
+    )
+
+
+class WeatherSeries:
+    """按时间排序的小时级气象序列（NULL 以 NaN 表示）"""
+
+    __slots__ = ('ts', 'surface_radiation_wm2', 'temp_c', 'wind_speed_ms', 'version')
+
+    def __init__(self, ts, surface_radiation_wm2, temp_c, wind_speed_ms, version=None):
+        self.ts = ts
+        self.surface_radiation_wm2 = surface_radiation_wm2
+        self.temp_c = temp_c
+        self.wind_speed_ms = wind_speed_ms
+        self.version = version
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict], version=None) -> 'WeatherSeries':
+        """由查询结果构建；地面风速缺测时用经向/纬向风分量合成"""
+        ts = np.array([row['ts'] for row in rows], dtype='datetime64[s]')
+        wind_speed = _float_column(rows, 'wind_speed_ms')
+        missing = np.isnan(wind_speed)
+        if missing.any():
+            u = np.nan_to_num(_float_column(rows, 'zonal_wind_ms'))
+            v = np.nan_to_num(_float_column(rows, 'meridional_wind_ms'))
+            wind_speed[missing] = np.sqrt(u[missing] ** 2 + v[missing] ** 2)
+        return cls(
+            ts=ts,
+            surface_radiation_wm2=_float_column(rows, 'surface_radiation_wm2'),
+            temp_c=_float_column(rows, 'temp_c'),
+            wind_speed_ms=wind_speed,
+            version=version
+        )
+
+    def __len__(self):
+        return len(self.ts)
+
+    @property
+    def nbytes(self) -> int:
+        return (self.ts.nbytes + self.surface_radiation_wm2.nbytes
+                + self.temp_c.nbytes + self.wind_speed_ms.nbytes)
+
+    def slice(self, start, end) -> 'WeatherSeries':
+        """取 [start, end] 闭区间（与 SQL BETWEEN 一致），返回数组视图"""
+        lo = np.searchsorted(self.ts, to_datetime64(start), side='left')
+        hi = np.searchsorted(self.ts, to_datetime64(end), side='right')
+        return WeatherSeries(
+            ts=self.ts[lo:hi],
+            surface_radiation_wm2=self.surface_radiation_wm2[lo:hi],
+            temp_c=self.temp_c[lo:hi],
+            wind_speed_ms=self.wind_speed_ms[lo:hi],
+            version=self.version
+        )
+
+    def timestamps_iso(self) -> List[str]:
+        """ISO 格式的时间戳列表（与 datetime.isoformat() 相同）"""
+        return np.datetime_as_string(self.ts, unit='s').tolist()
+
+
+class WeatherSeriesCache:
+    """按内存大小淘汰的 LRU 气象序列缓存
+
+    loader(key) 返回整条序列的查询结果；version_loader() 返回 {key: 数据版本}，
+    由导入工具维护的检查点生成，最多每 version_check_interval 秒查询一次，
+    版本变化的序列在下次访问时重新加载。
+    """
+
+    def __init__(self,
+                 loader: Callable[[Hashable], List[Dict]],
+                 version_loader: Optional[Callable[[], Dict]] = None,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 version_check_interval: float = 30.0):
+        self.loader = loader
+        self.version_loader = version_loader
+        self.max_bytes = max_bytes
+        self.version_check_interval = version_check_interval
+
+        self._entries: 'OrderedDict[Hashable, WeatherSeries]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+        self._generation = 0
+        self._key_generations: Dict[Hashable, int] = {}
+
+        self._versions: Dict = {}
+        self._versions_checked_at = None
+
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._load_time = 0.0
+
+    def version_check_due(self) -> bool:
+        """是否需要重新查询数据版本（需要时 version() 会访问数据库）"""
+        return self.version_loader is not None and (
+            self._versions_checked_at is None
+            or time.monotonic() - self._versions_checked_at >= self.version_check_interval
+        )
+
+    def _current_versions(self, refresh: bool = True) -> Dict:
+        if self.version_loader is None or not refresh:
+            return self._versions
+        now = time.monotonic()
+        with self._lock:
+            due = (self._versions_checked_at is None
+                   or now - self._versions_checked_at >= self.version_check_interval)
+            if due:
+                # 先占住检查时间，避免并发请求同时查询版本
+                self._versions_checked_at = now
+        if due:
+            try:
+                versions = self.version_loader()
+            except Exception:
+                versions = self._versions
+            with self._lock:
+                self._versions = versions
+        return self._versions
+
+    def version(self, key: Hashable, refresh: bool = True):
+        """数据版本：导入检查点版本 + 本进程内的失效次数
+
+        refresh=False 时只使用上次查询到的检查点，不访问数据库。
+        """
+        return (self._current_versions(refresh).get(key), self._generation,
+                self._key_generations.get(key, 0))
+
+    def get(self, key: Hashable) -> WeatherSeries:
+        """获取整条序列，未缓存或版本已变化时从数据库加载"""
+        version = self.version(key)
+        with self._lock:
+            series = self._entries.get(key)
+            if series is not None and series.version == version:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return series
+            if series is not None:
+                self._stale += 1
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # 同一序列只由一个线程加载，其余线程等待后直接命中
+        with load_lock:
+            with self._lock:
+                series = self._entries.get(key)
+                if series is not None and series.version == version:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return series
+                self._misses += 1
+
+            start = time.perf_counter()
+            series = WeatherSeries.from_rows(self.loader(key), version=version)
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._load_time += elapsed
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old.nbytes
+                self._entries[key] = series
+                self._bytes += series.nbytes
+                while self._bytes > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= evicted.nbytes
+                    self._evictions += 1
+            return series
+
+    def get_range(self, key: Hashable, start, end) -> WeatherSeries:
+        """获取 [start, end] 时间范围内的序列（缓存数组的切片）"""
+        return self.get(key).slice(start, end)
+
+    def invalidate(self, key: Hashable = None):
+        """使某条序列（或全部序列）失效，并立即重新检查数据版本"""
+        with self._lock:
+            if key is None:
+                count = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                self._generation += 1
+            else:
+                old = self._entries.pop(key, None)
+                count = 1 if old is not None else 0
+                if old is not None:
+                    self._bytes -= old.nbytes
+                self._key_generations[key] = self._key_generations.get(key, 0) + 1
+            self._invalidations += count
+            self._versions_checked_at = None
+        return count
+
+    def stats(self) -> Dict:
+        """缓存统计"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'stale_reloads': self._stale,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                'load_time_ms': round(self._load_time * 1000, 3),
+            }